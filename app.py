@@ -1,21 +1,25 @@
 import streamlit as st
 import datetime
 import os
-import json
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from io import BytesIO
 from logic.data_manager import (
-    veriyi_yukle, veriyi_kaydet, havuz_yukle, havuz_kaydet, 
-    tesis_faktor_yukle, tesis_faktor_kaydet
+    veriyi_kaydet, havuz_yukle, havuz_kaydet, 
+    tesis_faktor_yukle, tesis_faktor_kaydet, santralleri_yukle, qc_gecmisi_yukle,
+    list_projects, list_trials, load_project,
+    havuz_sutunlari, havuz_sikistir, havuz_modeli, model_registry
 )
+from logic.constants import MATERIALS
 from logic.engineering import (
-    calculate_passing, calculate_theoretical_mpa, evaluate_mix_compliance, 
+    calculate_theoretical_mpa, evaluate_mix_compliance, 
     classify_plant, get_std_limits
 )
-from logic.ai_model import train_prediction_model, predict_strength_ai, generate_suggestions
+from logic.ai_model import predict_strength_ai, generate_suggestions
 from logic.report_generator import generate_kgm_raporu
+from logic.excel_export import export_workbook
+from logic.gradation_analytics import compare_trials
+from logic.strength_model import fit_strength_model
 from logic.state_manager import init_session_state, SessionStateInitializer
 from logic.modular_tabs import render_tab_1, render_tab_2, render_tab_3, render_tab_4, render_tab_5, render_tab_management, render_tab_ocak
 from logic.auth_manager import check_login, register_user
@@ -88,10 +92,7 @@ if 'active_plant' not in st.session_state:
     st.markdown("<style>section[data-testid='stSidebar'] {display: none;}</style>", unsafe_allow_html=True)
     user_info = st.session_state['user_info']
     
-    plants_db = {}
-    if os.path.exists("data/plants.json"):
-        with open("data/plants.json", "r", encoding="utf-8") as f:
-            plants_db = json.load(f)
+    plants_db = santralleri_yukle()
             
     # SuperAdmin istisnası: Tüm santrallere erişim sağla
     if user_info.get('role') == 'SuperAdmin':
@@ -275,7 +276,6 @@ from logic.engineering import SIEVE_SETS, CONCRETE_RULES
 hedef_sinif = st.session_state.get('hedef_sinif', 'C30/37')
 dmax_val = st.session_state.get('dmax_val', 31.5)
 elek_serisi = SIEVE_SETS.get(dmax_val, SIEVE_SETS[31.5])
-materials = ["No:2 (15-25)", "No:1 (5-15)", "K.Kum (0-5)", "D.Kum (0-7)"]
 
 # CONCRETE_RULES engineering.py'dan import edildi.
 
@@ -287,15 +287,11 @@ KGM Teknik Şartnamesi Kısım 16: Beton ve Betonarme İşleri
 
 def get_global_qc_history(include_pool=True):
     active_p = st.session_state.get('active_plant', 'merkez')
-    all_data = veriyi_yukle(plant_id=active_p)
-    global_hist = []
-    for p_name, p_data in all_data.items():
-        if isinstance(p_data, dict) and "qc_history" in p_data:
-            global_hist.extend(p_data["qc_history"])
+    global_hist = qc_gecmisi_yukle(plant_id=active_p)
     
     if include_pool:
         # Global AI Havuzunu da ekle (Yeni santraller için kritik)
-        pool_data = havuz_yukle()
+        pool_data = havuz_yukle(readonly=True)
         # Pool verilerinde predicted_mpa eksik olabilir, 
         # ancak classify_plant zaten predicted_mpa varsa diff hesaplar.
         global_hist.extend(pool_data)
@@ -317,8 +313,8 @@ if st.session_state.get('pending_proj_redirect'):
         t_req = st.session_state.pop('pending_trial_redirect')
         st.session_state[f"trial_selector_{active_p}_{p_req}"] = t_req
 
-all_data = veriyi_yukle(plant_id=active_p)
-project_list = sorted(list(all_data.keys()))
+# Listeler manifestten gelir; proje gövdeleri okunmaz
+project_list = sorted(p["name"] for p in list_projects(active_p))
 if not project_list: project_list = ["Yeni Proje"]
 
 # 1. Proje Seçim Kontrolü
@@ -328,10 +324,10 @@ if sel_key not in st.session_state or st.session_state[sel_key] not in project_l
 current_sel = st.session_state[sel_key]
 
 # 2. Deneme Seçim Kontrolü
-p_data = all_data.get(current_sel, {})
 trial_list = ["Ana Reçete"]
-if isinstance(p_data, dict) and "trials" in p_data:
-    trial_list = sorted(list(p_data["trials"].keys()))
+trial_names = list_trials(active_p, current_sel)
+if trial_names is not None:
+    trial_list = sorted(trial_names)
 
 trial_sel_key = f"trial_selector_{active_p}_{current_sel}"
 if trial_sel_key not in st.session_state or st.session_state[trial_sel_key] not in trial_list:
@@ -442,7 +438,7 @@ with st.sidebar:
 
     st.markdown("---")
     st.subheader("🏗️ Şantiye Bilgileri")
-    plant_val = all_data.get(proje, {}).get("plant_name", "KGM-91 Santral")
+    plant_val = (load_project(active_p, proje, readonly=True) or {}).get("plant_name", "KGM-91 Santral")
     tesis_adi = st.text_input("Santral / Tesis Adı", value=plant_val)
     hedef_sinif = st.selectbox("Hedef Beton Sınıfı", list(CONCRETE_RULES.keys()))
     # Ocak ve Litoloji İlişkisi
@@ -586,7 +582,7 @@ with tab2:
         hedef_sinif=hedef_sinif,
         litoloji=litoloji,
         elek_serisi=elek_serisi,
-        materials=materials,
+        materials=MATERIALS,
         active_mats=active_mats,
         current_rhos=current_rhos,
         current_was=current_was,
@@ -599,7 +595,7 @@ with tab2:
 
 with tab_comp:
     st.subheader("🔬 Deneme Karşılaştırma ve Elek Analizi")
-    p_data_comp = all_data.get(proje, {})
+    p_data_comp = load_project(active_p, proje, readonly=True) or {}
     if isinstance(p_data_comp, dict) and "trials" in p_data_comp:
         trials = p_data_comp["trials"]
         
@@ -614,44 +610,10 @@ with tab_comp:
         fig_comp.add_trace(go.Scatter(x=elek_serisi, y=alt_std, name="Alt Limit", line=dict(color='red', dash='dash')))
         fig_comp.add_trace(go.Scatter(x=elek_serisi, y=ust_std, name="Üst Limit", line=dict(color='red', dash='dash')))
 
-        all_passing_data = {}
-        all_retained_data = {}
-        
-        for t_name, t_val in trials.items():
-            t_ratios = t_val.get("p", [25, 25, 25, 25])
-            if sum(t_ratios) <= 0: continue # Boş denemeleri gösterme
-            
-            # Her deneme için karışım gradasyonunu hesapla
-            t_active = t_val.get("active", [True, True, True, True])
-            t_ri = t_val.get("ri", {}) # Bu aslında 'kalan' gramaj verisidir
-            t_m1s = t_val.get("m1s", [4000.0, 4000.0, 2000.0, 2000.0])
-            t_elek = t_val.get("elek", elek_serisi) 
-            
-            # Her malzemenin kendi gradasyonunu (geçen %) hesapla (Kalandan Geçene Çevir)
-            trial_total_passing = np.zeros(len(t_elek))
-            
-            for i in range(4):
-                if t_active[i]:
-                    # i index veya mat_name olarak saklanmış olabilir
-                    mat_weights = t_ri.get(str(i)) or t_ri.get(materials[i], [0.0]*len(t_elek))
-                    m1_val = t_m1s[i] if i < len(t_m1s) else 2000.0
-                    
-                    # Eğer kaydedilen mat_weights uzunluğu t_elek ile uyumsuzsa düzeltebilmeliyiz
-                    if len(mat_weights) != len(t_elek):
-                        if len(mat_weights) < len(t_elek):
-                            mat_weights = list(mat_weights) + [0.0] * (len(t_elek) - len(mat_weights))
-                        else:
-                            mat_weights = mat_weights[:len(t_elek)]
-
-                    # Kalandan Geçene Çevir
-                    mat_passing = calculate_passing(m1_val, mat_weights)
-                    
-                    # Karışım gradasyonuna (oranıyla) ekle
-                    trial_total_passing += np.array(mat_passing) * (t_ratios[i] / 100.0)
-            
-            all_passing_data[t_name] = {"passing": trial_total_passing, "elek": t_elek}
-            all_retained_data[t_name] = t_ri
-            fig_comp.add_trace(go.Scatter(x=t_elek, y=trial_total_passing, name=t_name, mode='lines+markers'))
+        # Tüm denemeler mevcut elek serisine taşınır (farklı seriyle kaydedilenler dahil)
+        comp_names, comp_passing = compare_trials(trials, elek_serisi)
+        for t_name, trial_total_passing in zip(comp_names, comp_passing):
+            fig_comp.add_trace(go.Scatter(x=elek_serisi, y=trial_total_passing, name=t_name, mode='lines+markers'))
 
         fig_comp.update_layout(
             xaxis=dict(
@@ -677,17 +639,9 @@ with tab_comp:
             
             for i, e_size in enumerate(elek_serisi):
                 row = {"Elek (mm)": e_size, "Şartname": f"%{s_alt_b[i]:.1f}"}
-                for t_name, t_info in all_passing_data.items():
-                    t_passing = t_info["passing"]
-                    t_elek = t_info["elek"]
-                    
-                    # Bu denemede bu elek boyutu var mı bul
-                    try:
-                        idx = list(t_elek).index(e_size)
-                        val = t_passing[idx]
-                        row[t_name] = f"%{val:.1f}"
-                    except ValueError:
-                        row[t_name] = "-" # Elek bu denemede yoksa
+                for t_name, t_passing in zip(comp_names, comp_passing):
+                    val = t_passing[i]
+                    row[t_name] = "-" if np.isnan(val) else f"%{val:.1f}" # NaN: elek denemenin en küçük eleğinden küçük
                 elek_rows.append(row)
             st.dataframe(pd.DataFrame(elek_rows), use_container_width=True, hide_index=True)
             
@@ -735,18 +689,19 @@ if is_super_admin:
         with tab_ai_train:
             st.subheader("🧠 Global AI Eğitim Merkezi")
             st.info("Bu bölümdeki veriler tüm santrallerden gelen kırım sonuçlarını içerir.")
-            pool_data = havuz_yukle()
+            pool_data = havuz_yukle(readonly=True)
             if pool_data:
                 df_pool = pd.DataFrame(pool_data)
                 st.write(f"Sistemdeki Toplam Eğitim Datası: {len(df_pool)}")
                 if st.button("🚀 Modeli Yeniden Eğit ve Bülten Yayınla"):
                     with st.spinner("Model optimize ediliyor ve AI Bülteni hazırlanıyor..."):
-                        # 1. Eğitim
-                        train_prediction_model(pool_data)
+                        # 1. Eğitim (havuz değişmediyse kayıtlı model kullanılır)
+                        pool_cols = havuz_sutunlari()
+                        pool_model = havuz_modeli()
                         
                         # 2. AI Analizi ve Bülten Oluşturma
-                        avg_mpa = sum([float(r.get('d28',0)) for r in pool_data]) / len(pool_data)
-                        total_rec = len(pool_data)
+                        avg_mpa = float(pool_cols.filled("d28").mean())
+                        total_rec = pool_cols.n
                         
                         analysis_prompt = f"""
                         Sistemdeki tüm santrallerden gelen toplam {total_rec} adet kırım ve malzeme verisini analiz ettik.
@@ -784,8 +739,59 @@ if is_super_admin:
                         except Exception as e:
                             st.warning(f"Model eğitildi ancak bülten oluşturulamadı: {e}")
                         
-                        st.success("Yeni model başarıyla eğitildi!")
+                        if pool_model:
+                            st.success(f"Model v{pool_model['version']} hazır (R² %{pool_model['r2']*100:.1f}, {pool_model['n']} kayıt).")
+                        else:
+                            st.warning("Model için yeterli geçerli kayıt yok.")
+
+                # Model sürümleri: karşılaştırma ve geri alma
+                registry = model_registry()
+                versions = registry.versions()
+                if versions:
+                    with st.expander(f"🗂️ Model Sürümleri ({len(versions)})"):
+                        current_model = registry.load()
+                        if current_model and current_model["pinned"]:
+                            st.warning(f"v{current_model['version']} sabitlendi; yeni veriler otomatik eğitimi tetiklemiyor.")
+                            if st.button("🔓 En Güncel Veriye Dön", key="model_unpin"):
+                                registry.unpin()
+                                st.rerun()
+                        df_versions = pd.DataFrame(versions).set_index("version").drop(columns="file")
+                        df_versions["r2"] = (df_versions["r2"] * 100).round(1)
+                        coeff_rows = {}
+                        for v in versions[-5:]:
+                            m = registry.load(v["version"])
+                            if m: coeff_rows[f"v{v['version']}"] = dict(zip(m["features"] + ["sabit"], m["coeffs"] + [m["intercept"]]))
+                        st.dataframe(df_versions.rename(columns={"created": "Tarih", "r2": "R² (%)", "n": "Geçerli Kayıt",
+                                                                 "count": "Havuz"}), use_container_width=True)
+                        st.caption("Son 5 sürümün katsayıları")
+                        st.dataframe(pd.DataFrame(coeff_rows).round(4), use_container_width=True)
+                        rb_version = st.selectbox("Geri alınacak sürüm", [v["version"] for v in reversed(versions)],
+                                                  format_func=lambda v: f"v{v}", key="model_rollback_v")
+                        if st.button("⏪ Bu Sürüme Geri Al", key="model_rollback"):
+                            registry.rollback(rb_version)
+                            st.success(f"v{rb_version} güncel model yapıldı.")
+                            st.rerun()
+                # Gelişmiş model: türetilmiş özellikler + düzenlileştirme, örneklem dışı hata
+                with st.expander("🧪 Gelişmiş Model (Ridge / Elastic-Net, k-katlı CV)"):
+                    st.caption("S/Ç, bağlayıcı, agrega oranları ve litoloji özellikleriyle; α ve λ 5 katlı çapraz doğrulamayla seçilir.")
+                    if st.button("🔬 Gelişmiş Modeli Eğit", key="strength_model_fit"):
+                        with st.spinner("Çapraz doğrulama yapılıyor..."):
+                            st.session_state["strength_model"] = fit_strength_model(havuz_sutunlari(), workers=os.cpu_count())
+                    sm = st.session_state.get("strength_model")
+                    if sm:
+                        m1, m2, m3 = st.columns(3)
+                        m1.metric("CV RMSE", f"{sm['cv_rmse']:.2f} MPa", f"{sm['cv_rmse'] - sm['ols_cv_rmse']:+.2f} (EKK'ya göre)", delta_color="inverse")
+                        m2.metric("Sade EKK CV RMSE", f"{sm['ols_cv_rmse']:.2f} MPa")
+                        m3.metric("α / λ", f"{sm['alpha']:.1f} / {sm['lambda']:.2g}")
+                        st.caption(f"{sm['n']} kayıt, {sm['folds']} kat | eğitim RMSE {sm['train_rmse']:.2f} MPa, R² %{sm['r2']*100:.1f}")
+                        st.dataframe(pd.DataFrame({"Özellik": sm["features"] + ["sabit"], "Katsayı": sm["coeffs"] + [sm["intercept"]]}).round(4),
+                                     use_container_width=True, hide_index=True)
+                    elif "strength_model" in st.session_state:
+                        st.warning("Model için yeterli geçerli kayıt yok.")
                 st.dataframe(df_pool.tail(10))
+                if st.button("🗜️ Havuz Günlüğünü Sıkıştır"):
+                    folded = havuz_sikistir()
+                    st.success(f"{folded} günlük kaydı anlık görüntüye katlandı.")
             else:
                 st.warning("Henüz global havuzda veri birikmemiş.")
                 
@@ -814,16 +820,18 @@ if is_super_admin:
 # Excel Rapor Download
 with st.sidebar:
     st.markdown("---")
+    excel_scope = st.radio("Excel Kapsamı", ["Bu Proje", "Tüm Santral"], horizontal=True, key="excel_scope")
     if st.button("📥 EXCEL RAPOR İNDİR"):
-        # Excel oluşturan fonksiyon
-        def create_excel_lite():
-            output = BytesIO()
-            workbook = pd.ExcelWriter(output, engine='xlsxwriter')
-            pd.DataFrame({"Parametre": ["Proje", "Tesis"], "Değer": [proje, tesis_adi]}).to_excel(workbook, sheet_name='Rapor')
-            workbook.close()
-            output.seek(0)
-            return output
-        st.download_button("Dosyayı İndir", create_excel_lite(), file_name=f"{proje}.xlsx")
+        # İçerik özetiyle önbellekli: veri değişmediyse dosya yeniden üretilmez
+        active_p = st.session_state.get('active_plant', 'merkez')
+        scope_project = (proje or None) if excel_scope == "Bu Proje" else None
+        with st.spinner("Excel raporu hazırlanıyor..."):
+            xlsx = export_workbook(
+                active_p, scope_project, snapshot=st.session_state.get('mix_snapshot'),
+                pool_cols=havuz_sutunlari(), dmax=st.session_state.get('dmax_val', 31.5),
+                curve_type=st.session_state.get('curve_type_val', 'B (İdeal)'))
+        st.download_button("Dosyayı İndir", xlsx, file_name=f"{scope_project or active_p}.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
 # --- TETİKLENEN KAYDETME İŞLEMİ ---
 if st.session_state.get('trigger_save'):
@@ -832,21 +840,9 @@ if st.session_state.get('trigger_save'):
     active_p = st.session_state.get('active_plant', 'merkez')
     
     # Mevcut veriyi oku
-    existing_all = veriyi_yukle(plant_id=active_p)
-    proj_obj = existing_all.get(p_name, {"trials": {}, "qc_history": [], "active_trial": t_name})
+    proj_obj = load_project(active_p, p_name) or {"trials": {}, "qc_history": [], "active_trial": t_name}
     
-    # 1. Migration: Eğer proje objesi eski formattaysa (trials yoksa)
-    if "trials" not in proj_obj:
-        old_data = proj_obj.copy()
-        proj_obj = {
-            "trials": {"Ana Reçete": old_data},
-            "qc_history": old_data.get("qc_history", []),
-            "active_trial": "Ana Reçete"
-        }
-        if "qc_history" in proj_obj["trials"]["Ana Reçete"]: 
-            del proj_obj["trials"]["Ana Reçete"]["qc_history"]
-
-    # 2. Yeni Deneme Verisini Hazırla
+    # 1. Yeni Deneme Verisini Hazırla
     trial_data = {
         "rhos": current_rhos, "was": current_was, "ri": all_ri_values, 
         "las": [st.session_state.get(f"la_{i}", 0.0) for i in range(4)],
@@ -866,12 +862,12 @@ if st.session_state.get('trigger_save'):
         "passing": st.session_state.get('computed_passing', {})
     }
     
-    # 3. Güncelle ve Kaydet
-    proj_obj["trials"][t_name] = trial_data
+    # 2. Güncelle ve Kaydet
+    proj_obj.setdefault("trials", {})[t_name] = trial_data
     proj_obj["active_trial"] = t_name
     veriyi_kaydet(p_name, proj_obj, plant_id=active_p)
     
-    # 4. State Sync (Güvenli Yöntem: Bir sonraki run'da yakalanacak)
+    # 3. State Sync (Güvenli Yöntem: Bir sonraki run'da yakalanacak)
     st.session_state['pending_proj_redirect'] = p_name
     st.session_state['pending_trial_redirect'] = t_name
     st.session_state['trigger_save'] = False
@@ -1,48 +1,143 @@
 import numpy as np
 
+from logic.pool_columns import PoolColumns
+
+FEATURES = ("cement", "water", "ash", "air", "admixture")
+MIN_SAMPLES = 5
+
+def design_matrix(cols):
+    """
+    Eğitime giren satırların (X, y) dizileri: d28 > 0, çimento >= 100, su >= 50.
+    Eksik kül/hava/katkı 0 kabul edilir.
+    """
+    cem, wat, d28 = cols["cement"], cols["water"], cols["d28"]
+    # Eksik (NaN) çimento/su/dayanım karşılaştırmalarda False olur ve elenir
+    mask = (d28 > 0) & (cem >= 100) & (wat >= 50)
+    X = np.column_stack([cem[mask], wat[mask]] + [cols.filled(k)[mask] for k in FEATURES[2:]])
+    return X, d28[mask]
+
+class RegressionStats:
+    """
+    Doğrusal dayanım modelinin yeterli istatistikleri: A = [X, 1] için AᵀA,
+    Aᵀy, n, Σy ve Σy². Yeni kayıt O(F²) ile eklenir, model (F+1) boyutlu
+    normal denklemlerden çözülür; R² de aynı birikimlerden hesaplanır
+    (RSS = Σy² − wᵀAᵀy). İstatistikler toplanabilir: proje, santral ve
+    küresel kapsamlar merge ile birleştirilir.
+    seen: işlenen (elenenler dahil) kayıt sayısı; kaynakla tutarlılık denetimi için.
+    """
+
+    def __init__(self, n_features=len(FEATURES)):
+        k = n_features + 1
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.n = 0
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+        self.seen = 0
+
+    def update(self, X, y):
+        """(N, F) X ve (N,) y satırlarını ekler."""
+        X = np.atleast_2d(np.asarray(X, float))
+        y = np.asarray(y, float).reshape(-1)
+        if len(y) == 0: return self
+        A = np.column_stack([X, np.ones(len(y))])
+        self.xtx += A.T @ A
+        self.xty += A.T @ y
+        self.n += len(y)
+        self.sum_y += float(y.sum())
+        self.sum_y2 += float(y @ y)
+        return self
+
+    def update_columns(self, cols):
+        self.update(*design_matrix(cols))
+        self.seen += cols.n
+        return self
+
+    def update_records(self, records):
+        """QC / havuz kayıtlarını ekler (geçersizler elenir, seen yine artar)."""
+        return self.update_columns(PoolColumns.from_records(records))
+
+    @classmethod
+    def from_columns(cls, cols):
+        return cls().update_columns(cols)
+
+    def merge(self, *others):
+        """Bu ve verilen istatistiklerin toplamı (yeni nesne)."""
+        out = RegressionStats(len(self.xty) - 1)
+        for s in (self, *others):
+            if s is None: continue
+            out.xtx += s.xtx; out.xty += s.xty
+            out.n += s.n; out.sum_y += s.sum_y; out.sum_y2 += s.sum_y2; out.seen += s.seen
+        return out
+
+    def _solve_scaled(self):
+        # Ölçeklenmiş normal denklemler (çimento² ~1e5 ile 1 arasındaki koşul farkını giderir)
+        d = np.sqrt(np.diag(self.xtx))
+        d[d == 0] = 1.0
+        M = self.xtx / np.outer(d, d)
+        b = self.xty / d
+        try:
+            w = np.linalg.solve(M, b) / d
+        except np.linalg.LinAlgError:
+            # Tekil (örn. hep sıfır kül): en küçük normlu çözüm, lstsq ile aynı
+            w = np.linalg.lstsq(M, b, rcond=None)[0] / d
+        rss = max(self.sum_y2 - 2 * w @ self.xty + w @ self.xtx @ w, 0.0)
+        return w, rss, M, d
+
+    def solve(self):
+        """(coeffs, intercept, r2); MIN_SAMPLES'tan az geçerli kayıtta (None, None, 0.0)."""
+        if self.n < MIN_SAMPLES:
+            return None, None, 0.0
+        w, rss, _, _ = self._solve_scaled()
+        tss = self.sum_y2 - self.sum_y ** 2 / self.n
+        r2_score = 1 - rss / tss if tss > 1e-9 * max(self.sum_y2, 1.0) else 0.0
+        return w[:-1], w[-1], r2_score
+
+    def fit(self):
+        """
+        solve() + tahmin aralığı için belirsizlik: {"coeffs", "intercept", "r2",
+        "n", "cov", "sigma2", "dof"}. cov = σ²·(AᵀA)⁺ katsayıların ([X, 1]
+        sırasıyla) kovaryansı, σ² = RSS / dof, dof = n − rank. Yetersiz veride None.
+        """
+        coeffs, intercept, r2_score = self.solve()
+        if coeffs is None:
+            return None
+        w, rss, M, d = self._solve_scaled()
+        dof = self.n - int(np.linalg.matrix_rank(M))
+        sigma2 = rss / dof if dof > 0 else 0.0
+        cov = sigma2 * np.linalg.pinv(M) / np.outer(d, d)
+        return {"coeffs": [float(c) for c in coeffs], "intercept": float(intercept), "r2": float(r2_score),
+                "n": self.n, "cov": cov.tolist(), "sigma2": float(sigma2), "dof": int(dof)}
+
+    # --- DİSK (JSON) ---
+    def to_dict(self):
+        return {"xtx": self.xtx.tolist(), "xty": self.xty.tolist(), "n": self.n,
+                "sum_y": self.sum_y, "sum_y2": self.sum_y2, "seen": self.seen}
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data: return None
+        out = cls(len(data["xty"]) - 1)
+        out.xtx = np.asarray(data["xtx"], float)
+        out.xty = np.asarray(data["xty"], float)
+        out.n, out.seen = int(data["n"]), int(data.get("seen", data["n"]))
+        out.sum_y, out.sum_y2 = float(data["sum_y"]), float(data["sum_y2"])
+        return out
+
 def train_prediction_model(qc_history):
     """
     QC geçmişini kullanarak lineer regresyon modeli eğitir.
+    qc_history kayıt listesi / iteratörü, PoolColumns (havuz_sutunlari) ya da
+    hazır RegressionStats (bkz. data_manager.*_model_istatistikleri) olabilir.
     Returns: (coeffs, intercept, r2_score)
     """
-    X = []
-    y = []
-    valid_count = 0
-    for record in qc_history:
-        if not all(k in record for k in ['cement', 'water']) or record.get('d28', 0) <= 0:
-            continue
-            
-        cem = float(record.get('cement', 0))
-        wat = float(record.get('water', 0))
-        ash = float(record.get('ash', 0))
-        air = float(record.get('air', 0))
-        chem = float(record.get('admixture', 0))
-        
-        if cem < 100 or wat < 50: continue
-        
-        row = [cem, wat, ash, air, chem]
-        X.append(row)
-        y.append(float(record['d28']))
-        valid_count += 1
-
-    if valid_count < 5:
-        return None, None, 0.0
-
     try:
-        X_arr = np.array(X)
-        y_arr = np.array(y)
-        A = np.c_[X_arr, np.ones(X_arr.shape[0])]
-        result = np.linalg.lstsq(A, y_arr, rcond=None)
-        coeffs = result[0]
-        
-        w_full = coeffs
-        y_pred = A.dot(w_full)
-        rss = np.sum((y_arr - y_pred) ** 2)
-        mean_y = np.mean(y_arr)
-        tss = np.sum((y_arr - mean_y) ** 2)
-        r2_score = 1 - (rss / tss) if tss > 0 else 0.0
-        
-        return coeffs[:-1], coeffs[-1], r2_score
+        if isinstance(qc_history, RegressionStats):
+            stats = qc_history
+        else:
+            cols = qc_history if isinstance(qc_history, PoolColumns) else PoolColumns.from_records(qc_history)
+            stats = RegressionStats.from_columns(cols)
+        return stats.solve()
     except Exception as e:
         print(f"Model error: {e}")
         return None, None, 0.0
@@ -52,6 +147,26 @@ def predict_strength_ai(model_coeffs, intercept, inputs):
     val = np.dot(inputs, model_coeffs) + intercept
     return max(0, val)
 
+def predict_batch(model, X, level=0.95):
+    """
+    (N, F) reçete matrisini tek matris çarpımıyla puanlar (model: kayıt
+    defteri / RegressionStats.fit / strength_model sözlüğü).
+    Returns: (pred, half) - (N,) tahmin (negatifler 0) ve yeni bir döküm için
+    level güvenli tahmin aralığının yarı genişliği t·√(σ² + aᵀ·cov·a), a = [x, 1].
+    Modelde kovaryans yoksa half NaN'dır.
+    """
+    X = np.atleast_2d(np.asarray(X, float))
+    pred = np.maximum(0, X @ np.asarray(model["coeffs"], float) + model["intercept"])
+    if model.get("cov") is None or not model.get("dof"):
+        return pred, np.full(len(pred), np.nan)
+    from scipy.stats import t
+    cov = np.asarray(model["cov"], float)
+    F = X.shape[1]
+    # aᵀ·cov·a satır satır: X kısmı + sabit terimle çapraz ve kendi varyansı
+    var = ((X @ cov[:F, :F]) * X).sum(axis=1) + 2 * X @ cov[:F, F] + cov[F, F]
+    half = t.ppf(0.5 + level / 2, model["dof"]) * np.sqrt(np.maximum(var, 0) + model["sigma2"])
+    return pred, half
+
 def generate_suggestions(target_mpa, pred_mpa, inputs, model_coeffs):
     if model_coeffs is None: return []
     
@@ -0,0 +1,131 @@
+import copy
+import json
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+
+from logic.file_cache import file_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_ANY = object()
+
+
+class VersionConflict(Exception):
+    """Dosya, okunduğu sürümden sonra başka bir oturum tarafından değiştirildi."""
+
+
+def file_version(path):
+    """Dosyanın sürüm damgası (mtime_ns, boyut, inode); dosya yoksa None."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+LOCK_NAME = ".write.lock"
+
+@contextmanager
+def file_lock(path, timeout=30.0):
+    """
+    path'in bulunduğu klasör için süreçler/oturumlar arası danışma (advisory)
+    kilidi. Klasör başına tek kilit dosyası (.write.lock) kullanılır: kilit
+    yalnızca karşılaştır-ve-değiştir anında tutulduğundan yazarlar birbirini
+    uzun süre bekletmez ve silinen dosyalar için kilit dosyası birikmez.
+    Aynı klasörde iç içe kilit alınmamalıdır.
+    """
+    lock_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(lock_dir, exist_ok=True)
+    lock_path = os.path.join(lock_dir, LOCK_NAME)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"{path} kilidi {timeout} sn içinde alınamadı.")
+                time.sleep(0.002)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path):
+    if os.name == "nt": return
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, obj, indent=4, expected_version=_ANY):
+    """
+    JSON'u geçici dosyaya yazar, fsync eder ve hedefin üzerine yeniden adlandırır;
+    okuyanlar hiçbir zaman yarım yazılmış dosya görmez. expected_version verilirse
+    (file_version çıktısı, dosya yoksa None) dosya o sürümde değilse
+    VersionConflict fırlatır. indent=None kompakt (boşluksuz) yazar. Yeni sürümü döner.
+    """
+    path = os.path.abspath(path)
+    separators = (",", ":") if indent is None else None
+    payload = json.dumps(obj, ensure_ascii=False, indent=indent, separators=separators)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(path))
+    try:
+        # Uzun süren serileştirme ve yazma kilit dışında; kilit yalnızca karşılaştır-değiştir için
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        with file_lock(path):
+            if expected_version is not _ANY and file_version(path) != expected_version:
+                raise VersionConflict(path)
+            os.replace(tmp_path, path)
+            _fsync_dir(path)
+            file_cache.invalidate(path)
+            return file_version(path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+
+
+def update_json(path, mutate, default=None, retries=50, indent=4):
+    """
+    İyimser oku-değiştir-yaz. mutate(data) verinin özel bir kopyasını alır ve
+    yazılacak nesneyi döner (None dönerse yazılmaz). Araya başka bir yazma
+    girerse güncel veriyle yeniden denenir; güncelleme kaybolmaz.
+    Yazılan nesneyi (ya da None) döner.
+    """
+    for attempt in range(retries):
+        version = file_version(path)
+        data = file_cache.read_json(path, None)
+        if data is None: data = copy.deepcopy(default)
+        new = mutate(data)
+        if new is None:
+            return None
+        try:
+            atomic_write_json(path, new, indent=indent, expected_version=version)
+            return new
+        except VersionConflict:
+            time.sleep(random.uniform(0, 0.002 * (attempt + 1)))
+    raise VersionConflict(f"{path}: {retries} denemede güncellenemedi.")
@@ -1,7 +1,8 @@
-import json
-import os
 import hashlib
 
+from logic.atomic_io import atomic_write_json, update_json
+from logic.file_cache import file_cache
+
 USERS_FILE = "users.json"
 
 def hash_password(password):
@@ -9,26 +10,23 @@ def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 def load_users():
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r", encoding="utf-8") as f:
-            users = json.load(f)
-            # Backward compatibility
-            modified = False
-            for u in users:
-                if "status" not in users[u]:
-                    users[u]["status"] = "active"
-                    modified = True
-                if "assigned_plants" not in users[u]:
-                    # Varsayılan olarak Merkez santrali ata
-                    users[u]["assigned_plants"] = ["merkez"]
-                    modified = True
-            if modified: save_users(users)
-            return users
-    return {}
+    users = file_cache.read_json(USERS_FILE, None)
+    if users is None: return {}
+    # Backward compatibility
+    modified = False
+    for u in users:
+        if "status" not in users[u]:
+            users[u]["status"] = "active"
+            modified = True
+        if "assigned_plants" not in users[u]:
+            # Varsayılan olarak Merkez santrali ata
+            users[u]["assigned_plants"] = ["merkez"]
+            modified = True
+    if modified: save_users(users)
+    return users
 
 def save_users(users):
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(users, f, ensure_ascii=False, indent=4)
+    atomic_write_json(USERS_FILE, users)
 
 def check_login(username, password):
     users = load_users()
@@ -45,14 +43,15 @@ def check_login(username, password):
     return None
 
 def add_user(username, password, role="User", full_name="", status="active", assigned_plants=None):
-    users = load_users()
-    if username in users: return False, "Bu kullanıcı zaten mevcut."
-    users[username] = {
-        "password": hash_password(password),
-        "role": role, "full_name": full_name, "status": status,
-        "assigned_plants": assigned_plants if assigned_plants else ["merkez"]
-    }
-    save_users(users)
+    def mutate(users):
+        if username in users: return None
+        users[username] = {
+            "password": hash_password(password),
+            "role": role, "full_name": full_name, "status": status,
+            "assigned_plants": assigned_plants if assigned_plants else ["merkez"]
+        }
+        return users
+    if update_json(USERS_FILE, mutate, {}) is None: return False, "Bu kullanıcı zaten mevcut."
     return True, "Kullanıcı eklendi."
 
 def register_user(username, password, full_name):
@@ -60,24 +59,24 @@ def register_user(username, password, full_name):
 
 def update_user(username, role=None, status=None, full_name=None, assigned_plants=None):
     """Mevcut bir kullanıcının bilgilerini günceller."""
-    users = load_users()
-    if username not in users:
+    def mutate(users):
+        if username not in users: return None
+        if role: users[username]["role"] = role
+        if status: users[username]["status"] = status
+        if full_name: users[username]["full_name"] = full_name
+        if assigned_plants is not None: users[username]["assigned_plants"] = assigned_plants
+        return users
+    if update_json(USERS_FILE, mutate, {}) is None:
         return False, "Kullanıcı bulunamadı."
-    
-    if role: users[username]["role"] = role
-    if status: users[username]["status"] = status
-    if full_name: users[username]["full_name"] = full_name
-    if assigned_plants is not None: users[username]["assigned_plants"] = assigned_plants
-    
-    save_users(users)
     return True, f"{username} başarıyla güncellendi."
 
 def delete_user(username):
-    users = load_users()
-    if username in users:
-        if username == "hsyndymz": # Ana admin silinemez
-            return False, "Ana yönetici silinemez!"
+    if username == "hsyndymz": # Ana admin silinemez
+        return False, "Ana yönetici silinemez!"
+    def mutate(users):
+        if username not in users: return None
         del users[username]
-        save_users(users)
+        return users
+    if update_json(USERS_FILE, mutate, {}) is not None:
         return True, "Kullanıcı silindi."
     return False, "Kullanıcı bulunamadı."
@@ -4,6 +4,8 @@ import json
 from typing import Any, Optional, Dict, Callable
 from functools import wraps
 from logic.logger import logger
+from logic.file_cache import file_cache
+from logic.memo import clear_all as clear_memos, memo_stats
 
 class SimpleCache:
     """Basit bir cache sistemi için"""
@@ -132,6 +134,8 @@ def render_cache_controls():
         with col_clear1:
             if st.button("🗑️ Tümünü Temizle", key="clear_all_cache"):
                 cache.clear()
+                file_cache.invalidate()
+                clear_memos()
                 session_cache_clear()
                 st.success("✅ Cache temizlendi!")
                 st.rerun()
@@ -147,7 +151,9 @@ def render_cache_controls():
         if st.sidebar.checkbox("📊 Cache Stats"):
             st.sidebar.json({
                 "memory_cache_size": cache.size(),
-                "session_cache_keys": len([k for k in st.session_state.keys() if k.startswith("cache_")])
+                "session_cache_keys": len([k for k in st.session_state.keys() if k.startswith("cache_")]),
+                "file_cache": file_cache.stats(),
+                "memo": memo_stats()
             })
 
 # Cache invalidation için event handlers
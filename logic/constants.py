@@ -0,0 +1,7 @@
+"""
+Modüller arasında paylaşılan sabitler. Ağır bağımlılığı yoktur; depolama ve
+geçiş katmanı da (logic.migrate) güvenle içe aktarabilir.
+"""
+
+# Agrega fraksiyonları (ekran, rapor, ri/passing anahtarları ve p1..p4 sırası)
+MATERIALS = ("No:2 (15-25)", "No:1 (5-15)", "K.Kum (0-5)", "D.Kum (0-7)")
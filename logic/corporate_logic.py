@@ -10,7 +10,7 @@ def get_corp_performance_stats():
     corp_data = []
 
     for p_id, p_info in plants.items():
-        projects = veriyi_yukle(p_id)
+        projects = veriyi_yukle(p_id, readonly=True)
         
         total_samples = 0
         all_diffs = []
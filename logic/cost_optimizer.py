@@ -0,0 +1,134 @@
+"""
+En düşük maliyetli reçete (TS EN 206 / KTŞ kısıtları altında).
+
+Değişkenler 1 m³ için çimento C, su W, uçucu kül F (kg) ve agrega
+fraksiyonlarının mutlak hacimleri v1..v4 (L). Bu seçimle tüm kısıtlar
+doğrusaldır ve problem bir LP olur (scipy linprog / HiGHS):
+
+    * mutlak hacim: C/3.15 + W + F/2.25 + katkı/1.12 + Σv = 1000 − 10·hava
+    * S/Ç: W ≤ wc_lim · (C + 0.35 F); wc_lim = min(sınıf, çevresel etki,
+      dayanım) - dayanım sınırı teorik formülün tersinden gelir
+      (37·0.55/wc · hava cezası · saha · litoloji ≥ hedef + pay)
+    * max(sınıf, çevresel etki) minimum çimento ≤ C ≤ max_cement (agrega
+      hacmi sıfıra inmesin diye üst sınır da gerekir)
+    * gradasyon zarfı: her elekte alt ≤ Σ v_i·P_ij / Σv ≤ üst
+      (Σ v_i (alt_j − P_ij) ≤ 0 biçiminde, homojen doğrusal)
+
+Birden çok çimento tipi fiyatı verilirse her tip için ayrı LP çözülür ve en
+ucuzu seçilir. Sonuçlar girdilerin SHA-1 özetiyle süreç genelindeki
+logic.memo önbelleğine alınır.
+"""
+import pickle
+
+import numpy as np
+from scipy.optimize import linprog
+
+from logic.engineering import (
+    CONCRETE_RULES, EXPOSURE_CLASSES, LITHOLOGY_FACTORS, RHO_ADMIXTURE, RHO_ASH, RHO_CEMENT,
+    UNIT_COSTS, calculate_theoretical_mpa, get_std_limits,
+)
+from logic.memo import LRUMemo, stable_hash
+
+ASH_K = 0.35        # uçucu kül etkinlik katsayısı (efektif S/Ç ile aynı)
+MIN_GRADING_SIEVE = 0.1  # mix sekmesindeki gradasyon denetimi gibi filler elekleri hariç
+CACHE_SIZE = 32
+
+_cache = LRUMemo("optimize_cost", CACHE_SIZE)
+
+def _strength_wc_limit(target_mpa, air, site_factor, lith_factor):
+    # calculate_theoretical_mpa'nın tersi: 37·0.55/wc · (1 − ceza) · faktörler ≥ hedef
+    penalty = (air - 1.5) * 5.0 if air > 1.5 else 0.0
+    return 37.0 * 0.55 * (1 - penalty / 100.0) * site_factor * lith_factor / target_mpa
+
+def _solve_lp(prices, cement_price, limits, passing, envelope, rhos, air, adm_pct, water_range, ash_range, active):
+    lo_env, hi_env = envelope
+    adm_per_c = adm_pct / 100.0
+    # x = [C, W, F, v1..v4]
+    cost = np.concatenate([
+        [cement_price + adm_per_c * prices["admixture"], prices["water"], prices["ash"]],
+        rhos * np.asarray(prices["aggregates"], float),
+    ])
+    a_eq = np.concatenate([[1 / RHO_CEMENT + adm_per_c / RHO_ADMIXTURE, 1.0, 1 / RHO_ASH], np.ones(4)])[None, :]
+    b_eq = [1000.0 - air * 10]
+    rows = [np.concatenate([[-limits["wc"], 1.0, -limits["wc"] * ASH_K], np.zeros(4)])]
+    for j in range(passing.shape[1]):
+        rows.append(np.concatenate([np.zeros(3), lo_env[j] - passing[:, j]]))
+        rows.append(np.concatenate([np.zeros(3), passing[:, j] - hi_env[j]]))
+    bounds = [(limits["min_cem"], limits["max_cem"]), tuple(water_range), tuple(ash_range)]
+    bounds += [(0, None) if a else (0, 0) for a in active]
+    res = linprog(cost, A_ub=np.array(rows), b_ub=np.zeros(len(rows)), A_eq=a_eq, b_eq=b_eq,
+                  bounds=bounds, method="highs")
+    return res
+
+def optimize_cost(target_class, exposure_class, passing, sieves, dmax=31.5, rhos=(2.7,) * 4,
+                  unit_costs=None, cement_prices=None, air=1.5, admixture_pct=0.0,
+                  water_range=(150.0, 200.0), ash_range=(0.0, 0.0), max_cement=500.0, site_factor=1.0,
+                  lithology=None, strength_margin=0.0, active=(True,) * 4, envelope=("A (Alt)", "C (Üst)")):
+    """
+    passing: (4, S) malzeme geçen % (sieves sırasında); envelope: alt sınır
+    için A, üst sınır için C eğrisi (STD_GRADING_DB). cement_prices:
+    {çimento tipi: TL/kg}; verilmezse unit_costs["cement"].
+    {"status": "optimal" | "infeasible", "cement", "water", "ash", "admixture_kg",
+    "p" (4, %), "m_kg" (4), "wc", "pred_mpa", "cost", "cement_type", "limits"} döner.
+    """
+    prices = dict(UNIT_COSTS)
+    prices.update(unit_costs or {})
+    cement_prices = dict(cement_prices or {"Varsayılan": prices["cement"]})
+    key = stable_hash(target_class=target_class, exposure_class=exposure_class, passing=np.asarray(passing, float),
+                     sieves=list(sieves), dmax=dmax, rhos=list(rhos), prices=prices, cement_prices=cement_prices,
+                     air=air, admixture_pct=admixture_pct, water_range=list(water_range), ash_range=list(ash_range),
+                     max_cement=max_cement, site_factor=site_factor, lithology=lithology, strength_margin=strength_margin,
+                     active=list(active), envelope=list(envelope))
+    blob = _cache.get(key)
+    if blob is not None:
+        return pickle.loads(blob)
+
+    rules = CONCRETE_RULES.get(target_class, CONCRETE_RULES["C30/37"])
+    exp = EXPOSURE_CLASSES.get(exposure_class, EXPOSURE_CLASSES["XC3"])
+    target_mpa = rules["min_mpa"] + strength_margin
+    lith = LITHOLOGY_FACTORS.get(lithology, 1.0)
+    wc_strength = _strength_wc_limit(target_mpa, air, site_factor, lith)
+    limits = {
+        "wc": min(rules["max_wc"], exp["max_wc"], wc_strength),
+        "wc_strength": wc_strength,
+        "min_cem": max(rules["min_cem"], exp["min_cem"]),
+        "max_cem": max_cement,
+        "target_mpa": target_mpa,
+    }
+
+    sieves = list(sieves)
+    keep = [j for j, s in enumerate(sieves) if s >= MIN_GRADING_SIEVE]
+    lo_env = np.asarray(get_std_limits(dmax, envelope[0], sieves)[0], float)[keep]
+    hi_env = np.asarray(get_std_limits(dmax, envelope[1], sieves)[1], float)[keep]
+    P = np.asarray(passing, float)[:, keep]
+    rhos = np.asarray(rhos, float)
+
+    best = None
+    for cem_type, cem_price in cement_prices.items():
+        res = _solve_lp(prices, cem_price, limits, P, (lo_env, hi_env), rhos, air, admixture_pct,
+                        water_range, ash_range, active)
+        if res.status == 0 and (best is None or res.fun < best[1].fun):
+            best = (cem_type, res)
+
+    if best is None:
+        result = {"status": "infeasible", "limits": limits,
+                  "message": "Kısıtları sağlayan reçete yok (gradasyon zarfı, su ya da kül aralığını genişletin)."}
+    else:
+        cem_type, res = best
+        c, w, f = res.x[:3]
+        v = res.x[3:]
+        v_total = v.sum()
+        result = {
+            "status": "optimal", "cement_type": cem_type, "limits": limits,
+            "cement": float(c), "water": float(w), "ash": float(f), "admixture_kg": float(c * admixture_pct / 100),
+            "p": (v / v_total * 100).tolist() if v_total > 0 else [0.0] * 4,
+            "m_kg": (v * rhos).tolist(),
+            "wc": float(w / (c + ASH_K * f)), "cost": float(res.fun),
+        }
+        result["pred_mpa"] = float(calculate_theoretical_mpa(result["wc"], air) * site_factor * lith)
+
+    _cache.put(key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+    return result
+
+def clear_cache():
+    _cache.clear()
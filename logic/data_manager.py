@@ -1,28 +1,64 @@
+import hashlib
 import json
 import os
+import threading
+
+from logic.ai_model import RegressionStats
+from logic.atomic_io import atomic_write_json, update_json
+from logic.file_cache import file_cache
+from logic.memo import stable_hash
+from logic.migrate import migrate_plant
+from logic.model_registry import ModelRegistry
+from logic.pool_columns import PoolColumns
+from logic.strength_gain import fit_gain, gain_stats, merge_gain
+from logic.storage import STORAGE_BACKEND, create_storage, logger
 
 DATA_DIR = "data"
 PLANTS_FILE = os.path.join(DATA_DIR, "plants.json")
 
+# --- DEPOLAMA MOTORU ---
+# JSON dosya okumaları logic.file_cache üzerinden (yol, mtime, boyut) anahtarlı
+# önbellekten gelir; istatistikler için file_cache.stats().
+# "sharded" (varsayılan, proje başına dosya + manifest), "json" (santral başına
+# tek dosya) veya "sqlite". SQLite için önce JSON verileri aktarılmalıdır:
+#   python -m logic.sqlite_storage --data-dir data
+# Seçim STORAGE_BACKEND ortam değişkeniyle (logic.storage.STORAGE_BACKEND).
+# Yükleme yolu kanonik şemayı (logic.migrate) varsayar: "sharded" bunu bölme
+# sırasında, SQLite aktarım sırasında yapar; "json" motorunda ve henüz
+# bölünmemiş (eski tek dosyalı) santrallerde eski projeler ilk açılışta, motor
+# kullanıma verilmeden önce yerinde kanonikleştirilir. Dosya düzeni değişmez:
+# bölme yalnızca "python -m logic.migrate --backend sharded" ile yapılır.
+_storage = None
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        store = create_storage(STORAGE_BACKEND, DATA_DIR)
+        if store.name in ("json", "sharded"):
+            for plant_id in store.known_plants():
+                if store.name == "sharded" and not store._legacy(plant_id): continue
+                report = migrate_plant(store, plant_id, compact=False)
+                if report:
+                    logger.info("%s: %d proje kanonik şemaya getirildi", plant_id, len(report))
+        _storage = store
+    return _storage
+
+def set_storage(backend):
+    """Aktif depolama motorunu değiştirir (testler ve geçiş araçları için)."""
+    global _storage
+    _storage = backend
+
 def santralleri_yukle():
-    if os.path.exists(PLANTS_FILE):
-        with open(PLANTS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"merkez": {"name": "Merkez Santral", "location": "Şanlıurfa"}}
+    return get_storage().load_plants()
 
 def santral_kaydet(p_id, p_data):
-    plants = santralleri_yukle()
-    plants[p_id] = p_data
-    with open(PLANTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(plants, f, ensure_ascii=False, indent=4)
+    get_storage().save_plant(p_id, p_data)
 
 def santral_sil(p_id):
     plants = santralleri_yukle()
     if p_id in plants:
         if p_id == "merkez": return False, "Merkez santral silinemez."
-        del plants[p_id]
-        with open(PLANTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(plants, f, ensure_ascii=False, indent=4)
+        get_storage().delete_plant(p_id)
         return True, "Santral silindi."
     return False, "Santral bulunamadı."
 
@@ -32,86 +68,284 @@ def get_db_path(plant_id="merkez"):
     return os.path.join(DATA_DIR, f"projects_{plant_id}.json")
 
 def veriyi_kaydet(isim, data, plant_id="merkez"):
-    db_file = get_db_path(plant_id)
-    projeler = {}
-    if os.path.exists(db_file):
-        with open(db_file, "r", encoding="utf-8") as f: projeler = json.load(f)
-    projeler[isim] = data
-    with open(db_file, "w", encoding="utf-8") as f: json.dump(projeler, f, ensure_ascii=False, indent=4)
-
-def veriyi_yukle(plant_id="merkez"):
-    db_file = get_db_path(plant_id)
-    if os.path.exists(db_file):
-        with open(db_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    get_storage().save_project(plant_id or "merkez", isim, data)
+
+def veriyi_yukle(plant_id="merkez", readonly=False):
+    """
+    Santralin projelerini döner. readonly=True ise önbellekteki paylaşılan
+    sözlük döner (kopyalama yok); yalnızca okuyan çağıranlar kullanmalıdır.
+    """
+    return get_storage().load_projects(plant_id or "merkez", readonly=readonly)
+
+def load_project(plant_id, name, readonly=False):
+    """
+    Yalnızca istenen projeyi okur (yoksa None). Veri kanonik şemadadır
+    (bkz. logic.migrate); yükleme sırasında dönüştürme yapılmaz.
+    """
+    return get_storage().load_project(plant_id or "merkez", name, readonly=readonly)
+
+def list_projects(plant_id="merkez"):
+    """
+    Proje özetleri (name, trials, active_trial, qc_count, modified).
+    sharded/sqlite motorlarında proje gövdeleri okunmaz; kenar çubuğu için.
+    """
+    return get_storage().list_projects(plant_id or "merkez")
+
+def list_trials(plant_id, project):
+    """Projenin deneme isimleri; proje yoksa veya eski formattaysa None."""
+    return get_storage().list_trials(plant_id or "merkez", project)
 
 def projesi_sil(isim, plant_id="merkez"):
-    db_file = get_db_path(plant_id)
-    projeler = {}
-    if os.path.exists(db_file):
-        with open(db_file, "r", encoding="utf-8") as f: projeler = json.load(f)
-    if isim in projeler:
-        del projeler[isim]
-        with open(db_file, "w", encoding="utf-8") as f: json.dump(projeler, f, ensure_ascii=False, indent=4)
-        return True
-    return False
+    return get_storage().delete_project(plant_id or "merkez", isim)
+
+def qc_kaydi_ekle(isim, kayit, plant_id="merkez"):
+    """Projenin qc_history listesine tek kayıt ekler (proje yoksa oluşturur)."""
+    get_storage().append_qc_record(plant_id or "merkez", isim, kayit)
+    _model_istatistik_ekle(plant_id or "merkez", {isim: [kayit]})
+
+def qc_toplu_ekle(kayitlar, plant_id="merkez", havuz_kayitlari=()):
+    """
+    {proje: [kayıt, ...]} QC kayıtlarını santral başına tek yazmada ekler;
+    havuz_kayitlari aynı çağrıda AI havuzuna eklenir (bkz. logic.qc_import).
+    """
+    get_storage().append_qc_batch(plant_id or "merkez", kayitlar, havuz_kayitlari)
+    _model_istatistik_ekle(plant_id or "merkez", kayitlar)
+
+def qc_gecmisi_yukle(plant_id="merkez"):
+    """Santraldeki tüm projelerin QC kayıtlarını tek liste olarak döner."""
+    return get_storage().load_qc_history(plant_id or "merkez")
 
 # --- AI EĞİTİM HAVUZU (GLOBAL) ---
 # Havuz hala KÜRESEL kalıyor (Tüm santrallerin ortak aklı)
 POOL_FILE = os.path.join(DATA_DIR, "ai_training_pool.json")
 
 def havuz_kaydet(data_list):
-    with open(POOL_FILE, "w", encoding="utf-8") as f:
-        json.dump(data_list, f, ensure_ascii=False, indent=4)
+    get_storage().save_pool(data_list)
+
+def havuz_yukle(readonly=False):
+    return get_storage().load_pool(readonly=readonly)
+
+def havuz_ekle(kayit):
+    """Havuza tek kayıt ekler; tüm listeyi okuyup yeniden yazmaz."""
+    get_storage().append_pool(kayit)
+
+def havuz_iter():
+    """Havuz kayıtlarını akış halinde döner (model eğitimi için)."""
+    return get_storage().iter_pool()
+
+def havuz_sikistir():
+    """Havuz ekleme günlüğünü anlık görüntüye katlar. Katlanan kayıt sayısını döner."""
+    return get_storage().compact_pool()
+
+# Kolon görünümü: (motor, PoolColumns, cursor, RegressionStats, parmak izi)
+_pool_columns = None
+_pool_columns_lock = threading.Lock()
+
+def _pool_stats_path(columns_path):
+    return os.path.splitext(columns_path)[0] + "_stats.json"
+
+def _load_pool_stats(path, cursor):
+    data = file_cache.read_json(_pool_stats_path(path), None) if path else None
+    if isinstance(data, dict) and data.get("cursor") == cursor and data.get("fingerprint"):
+        return RegressionStats.from_dict(data.get("stats")), data["fingerprint"]
+    return None, None
+
+_EMPTY_DIGEST = hashlib.sha1(b"").hexdigest()
+
+def _chain_hash(digest, records):
+    # Kayıt başına zincirleme özet: artımlı ekleme ile baştan hesap aynı sonucu verir
+    h = bytes.fromhex(digest)
+    for r in records:
+        h = hashlib.sha1(h + json.dumps(r, sort_keys=True, ensure_ascii=False).encode()).digest()
+    return h.hex()
+
+def _havuz_guncelle():
+    global _pool_columns
+    store = get_storage()
+    path = store.pool_columns_path()
+    with _pool_columns_lock:
+        stats = digest = None
+        if _pool_columns and _pool_columns[0] is store:
+            _, cols, cursor, stats, digest = _pool_columns
+        elif path:
+            cols, cursor = PoolColumns.load(path)
+            if cols is not None: stats, digest = _load_pool_stats(path, cursor)
+        else:
+            cols, cursor = None, None
+
+        # Parmak izi kayıtlardan gelir; disk istatistikleri yoksa baştan okunur
+        tail = store.read_pool_since(cursor) if cols is not None and digest else None
+        if tail is None:
+            records, cursor = store.read_pool_with_cursor()
+            cols, changed = PoolColumns.from_records(records), True
+            stats, digest = RegressionStats.from_columns(cols), _chain_hash(_EMPTY_DIGEST, records)
+        else:
+            records, new_cursor = tail
+            changed = new_cursor != cursor
+            if records:
+                cols = cols.extend(records)
+                stats = stats.merge().update_records(records)  # paylaşılan nesne değiştirilmez
+                digest = _chain_hash(digest, records)
+            cursor = new_cursor
+
+        if changed and path and cursor is not None:
+            cols.save(path, cursor)
+            atomic_write_json(_pool_stats_path(path), {"cursor": cursor, "stats": stats.to_dict(),
+                                                       "fingerprint": digest}, indent=None)
+        _pool_columns = (store, cols, cursor, stats, digest)
+        return cols, stats, digest
+
+def havuz_sutunlari():
+    """
+    Havuzun kolon bazlı görünümünü (PoolColumns) döner. Görünüm .npz olarak
+    diskte de tutulur; havuza kayıt eklendiyse yalnızca yeni satırlar okunup
+    eklenir, sıkıştırma / sıfırlama sonrası baştan kurulur.
+    """
+    return _havuz_guncelle()[0]
+
+def havuz_istatistikleri():
+    """
+    Küresel kapsam: havuzun regresyon yeterli istatistikleri (RegressionStats).
+    Kolon görünümüyle birlikte artımlı güncellenir ve yanında
+    (ai_training_pool_stats.json) saklanır.
+    """
+    return _havuz_guncelle()[1]
+
+def havuz_parmak_izi():
+    """Havuzun parmak izi: {"hash": kayıt zinciri SHA-1, "count": kayıt sayısı}."""
+    cols, _, digest = _havuz_guncelle()
+    return {"hash": digest, "count": cols.n}
+
+# --- AI MODEL KAYIT DEFTERİ (data/models/) ---
+def model_registry():
+    return ModelRegistry(os.path.join(getattr(get_storage(), "data_dir", DATA_DIR), "models"))
+
+def havuz_modeli():
+    """
+    Küresel havuz modelinin güncel sürümü (dict: coeffs, intercept, r2, n,
+    features, fingerprint, version). Havuz değişmediyse diskteki model döner;
+    değiştiyse yeterli istatistiklerden yeniden eğitilip yeni sürüm olarak
+    kaydedilir. Yeterli veri yoksa None.
+    """
+    cols, stats, digest = _havuz_guncelle()
+    return model_registry().ensure(stats, {"hash": digest, "count": cols.n})
+
+# --- AI MODEL İSTATİSTİKLERİ (PROJE / SANTRAL KAPSAMI) ---
+# Santral başına tek dosya: {proje: {"tail": son kaydın özeti, "stats": {...},
+# "gain": {çimento tipi: [Σa², Σab, Σb², n]}}} (gain: logic.strength_gain).
+# QC eklemeleri kayıt başına O(F²) ile işlenir; proje başka yoldan değiştiyse
+# (kayıt silme vb.) seen / tail uyuşmaz ve proje geçmişinden yeniden kurulur.
+def get_model_stats_path(plant_id="merkez"):
+    return os.path.join(getattr(get_storage(), "data_dir", DATA_DIR), f"model_stats_{plant_id}.json")
+
+def _tail_key(history):
+    return stable_hash(history[-1]) if history else None
+
+def _model_istatistik_ekle(plant_id, kayitlar):
+    def mutate(entries):
+        changed = False
+        for isim, records in kayitlar.items():
+            entry = entries.get(isim)
+            if not entry or "gain" not in entry or not records: continue  # ilk okumada kurulur
+            stats = RegressionStats.from_dict(entry["stats"]).update_records(records)
+            entries[isim] = {"tail": _tail_key(records), "stats": stats.to_dict(),
+                             "gain": merge_gain(entry["gain"], gain_stats(records))}
+            changed = True
+        return entries if changed else None
+    update_json(get_model_stats_path(plant_id), mutate, {}, indent=None)
+
+def _proje_istatistigi(entries, isim, history):
+    entry = entries.get(isim)
+    if entry and "gain" in entry and entry["stats"].get("seen") == len(history) and entry.get("tail") == _tail_key(history):
+        return RegressionStats.from_dict(entry["stats"]), False
+    stats = RegressionStats.from_columns(PoolColumns.from_records(history))
+    entries[isim] = {"tail": _tail_key(history), "stats": stats.to_dict(), "gain": gain_stats(history)}
+    return stats, True
+
+def proje_model_istatistikleri(isim, plant_id="merkez", qc_history=None):
+    """
+    Proje kapsamı RegressionStats. qc_history verilmezse proje okunur; kayıtlı
+    istatistik geçmişle uyuşmuyorsa yeniden kurulup kaydedilir.
+    """
+    plant_id = plant_id or "merkez"
+    if qc_history is None:
+        qc_history = (load_project(plant_id, isim, readonly=True) or {}).get("qc_history", [])
+    path = get_model_stats_path(plant_id)
+    entries = file_cache.read_json(path, {})
+    stats, changed = _proje_istatistigi(entries, isim, qc_history)
+    if changed:
+        update_json(path, lambda e: {**e, isim: entries[isim]}, {}, indent=None)
+    return stats
+
+def _santral_girdileri(plant_id):
+    """
+    Santraldeki projelerin güncel istatistik girdileri. Kayıt sayısı (qc_count)
+    değişmiş projeler okunup yeniden kurulur, diğerleri dosyadan gelir.
+    """
+    path = get_model_stats_path(plant_id)
+    entries = file_cache.read_json(path, {})
+    current, rebuilt = [], {}
+    for summary in list_projects(plant_id):
+        isim = summary["name"]
+        entry = entries.get(isim)
+        if not (entry and "gain" in entry and entry["stats"].get("seen") == summary.get("qc_count", 0)):
+            history = (load_project(plant_id, isim, readonly=True) or {}).get("qc_history", [])
+            _proje_istatistigi(entries, isim, history)
+            entry = rebuilt[isim] = entries[isim]
+        current.append(entry)
+    if rebuilt:
+        update_json(path, lambda e: {**e, **rebuilt}, {}, indent=None)
+    return current
+
+def santral_model_istatistikleri(plant_id="merkez"):
+    """Santral kapsamı: proje istatistiklerinin toplamı."""
+    total = RegressionStats()
+    for entry in _santral_girdileri(plant_id or "merkez"):
+        total = total.merge(RegressionStats.from_dict(entry["stats"]))
+    return total
+
+def santral_dayanim_gelisimi(plant_id="merkez"):
+    """
+    Santralin çimento tipi başına dayanım gelişim parametreleri (fit_gain).
+    Proje toplamları QC eklemesiyle artımlı güncellenir; burada yalnızca
+    toplanıp çözülür.
+    """
+    return fit_gain(merge_gain(*(e["gain"] for e in _santral_girdileri(plant_id or "merkez"))))
 
-def havuz_yukle():
-    if os.path.exists(POOL_FILE):
-        with open(POOL_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+def dayanim_gelisimi_tum_santraller():
+    """{(santral, çimento tipi): parametreler}; tüm gruplar tek fit_gain çağrısında."""
+    sums = {}
+    for plant_id in santralleri_yukle() or {"merkez": {}}:
+        for entry in _santral_girdileri(plant_id):
+            sums = merge_gain(sums, {(plant_id, t): v for t, v in entry["gain"].items()})
+    return fit_gain(sums)
 
 # --- SANTRAL / TESİS FAKTÖRLERİ (SANTRAL BAZLI) ---
 def get_factor_path(plant_id="merkez"):
     return os.path.join(DATA_DIR, f"factors_{plant_id}.json")
 
 def tesis_faktor_yukle(tesis_adi, plant_id="merkez"):
-    f_path = get_factor_path(plant_id)
-    if os.path.exists(f_path):
-        with open(f_path, "r", encoding="utf-8") as f:
-            faz = json.load(f)
-            return faz.get(tesis_adi, 1.0)
-    return 1.0
+    return get_storage().load_factor(plant_id, tesis_adi, 1.0)
 
 def tesis_faktor_kaydet(tesis_adi, deger, plant_id="merkez"):
-    f_path = get_factor_path(plant_id)
-    faz = {}
-    if os.path.exists(f_path):
-        with open(f_path, "r", encoding="utf-8") as f:
-            faz = json.load(f)
-    faz[tesis_adi] = deger
-    with open(f_path, "w", encoding="utf-8") as f:
-        json.dump(faz, f, ensure_ascii=False, indent=4)
+    get_storage().save_factor(plant_id, tesis_adi, deger)
 
 # --- AI TEKNİK BÜLTEN (KÜRESEL PAYLAŞIM) ---
 SHARED_INSIGHTS_FILE = os.path.join(DATA_DIR, "shared_insights.json")
 
 def shared_insight_kaydet(insight):
-    insights = shared_insight_yukle()
-    insights.append(insight)
-    # Son 15 bülten kaydını tutalım
-    with open(SHARED_INSIGHTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(insights[-15:], f, ensure_ascii=False, indent=4)
+    def mutate(insights):
+        insights.append(insight)
+        # Son 15 bülten kaydını tutalım
+        return insights[-15:]
+    update_json(SHARED_INSIGHTS_FILE, mutate, [])
 
 def shared_insight_yukle():
-    if os.path.exists(SHARED_INSIGHTS_FILE):
-        with open(SHARED_INSIGHTS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return file_cache.read_json(SHARED_INSIGHTS_FILE, [])
 
 def shared_insight_sil(index):
-    insights = shared_insight_yukle()
-    if 0 <= index < len(insights):
+    def mutate(insights):
+        if not 0 <= index < len(insights): return None
         del insights[index]
-        with open(SHARED_INSIGHTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(insights, f, ensure_ascii=False, indent=4)
+        return insights
+    update_json(SHARED_INSIGHTS_FILE, mutate, [])
@@ -0,0 +1,140 @@
+"""
+Tasarım uzayı taraması: çimento / su / uçucu kül / hava için ızgara ya da
+Latin hiperküp (LHS) reçeteleri tek seferde değerlendirilir.
+
+Her reçete için: efektif S/Ç, teorik dayanım x litoloji x saha faktörü,
+(varsa) AI regresyon tahmini ve %95 tahmin aralığı, uygunluk durumu / ihlal bitleri ve 1 m³
+maliyeti. Hesap tamamen dizi işlemidir (proportion_mixes +
+evaluate_compliance_batch); çok büyük taramalar işlem havuzunda parçalara
+bölünür. Sonuç, mix sekmesindeki kontur/ısı haritaları için DataFrame'dir.
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from logic.ai_model import predict_batch
+from logic.engineering import (
+    LITHOLOGY_FACTORS, UNIT_COSTS, evaluate_compliance_batch, proportion_mixes,
+)
+
+SWEEP_VARS = ("cement", "water", "ash", "air")
+DEFAULT_BOUNDS = {"cement": (250.0, 450.0), "water": (140.0, 200.0), "ash": (0.0, 100.0), "air": (1.0, 6.0)}
+POOL_MIN_ROWS = 200_000  # bunun altında tek çekirdek işlem havuzundan hızlı
+
+def _bounds(bounds):
+    merged = dict(DEFAULT_BOUNDS)
+    merged.update(bounds or {})
+    return merged
+
+def grid_designs(bounds=None, steps=21):
+    """
+    Kartezyen ızgara. bounds: {değişken: (alt, üst)} ya da sabit için tek
+    sayı; steps: değişken başına nokta sayısı (int ya da sözlük).
+    """
+    axes = []
+    for var, b in _bounds(bounds).items():
+        if np.isscalar(b):
+            axes.append(np.array([float(b)]))
+        else:
+            n = steps.get(var, 1) if isinstance(steps, dict) else steps
+            axes.append(np.linspace(b[0], b[1], n) if n > 1 else np.array([float(b[0])]))
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return pd.DataFrame({var: m.ravel() for var, m in zip(SWEEP_VARS, mesh)})
+
+def lhs_designs(n, bounds=None, seed=0):
+    """n noktalı Latin hiperküp; sabit (tek sayı) sınırlar değişmez."""
+    rng = np.random.default_rng(seed)
+    cols = {}
+    for var, b in _bounds(bounds).items():
+        if np.isscalar(b):
+            cols[var] = np.full(n, float(b))
+            continue
+        # Her katmandan bir nokta, katman sırası değişkenler arasında bağımsız karıştırılır
+        u = (rng.permutation(n) + rng.random(n)) / n
+        cols[var] = b[0] + u * (b[1] - b[0])
+    return pd.DataFrame(cols)
+
+def theoretical_mpa(wc, air):
+    """calculate_theoretical_mpa'nın dizi sürümü."""
+    wc, air = np.asarray(wc, float), np.asarray(air, float)
+    base = np.divide(37.0 * 0.55, wc, out=np.zeros(np.broadcast(wc, air).shape), where=wc > 0)
+    penalty = np.where(air > 1.5, (air - 1.5) * 5.0, 0.0)
+    return np.maximum(0, base * (1 - penalty / 100.0))
+
+def recipe_cost(mix, cement, water, ash, unit_costs=None):
+    """proportion_mixes çıktısından 1 m³ malzeme maliyeti (TL)."""
+    costs = dict(UNIT_COSTS)
+    costs.update(unit_costs or {})
+    return (cement * costs["cement"] + water * costs["water"] + ash * costs["ash"]
+            + mix["admixture_kg"] * costs["admixture"] + mix["m_kg"] @ np.asarray(costs["aggregates"], float))
+
+def _evaluate_chunk(designs, base):
+    n = len(designs)
+    cement, water = designs["cement"].to_numpy(float), designs["water"].to_numpy(float)
+    ash, air = designs["ash"].to_numpy(float), designs["air"].to_numpy(float)
+    mix = proportion_mixes(
+        np.broadcast_to(np.asarray(base.get("p", (25, 25, 25, 25)), float), (n, 4)),
+        cement, water, ash, air, base.get("admixture_pct", 0.0),
+        rhos=base.get("rhos", (2.7,) * 4), was=base.get("was", (0.0,) * 4),
+        moists=base.get("moists", (0.0,) * 4), las=base.get("las", (0.0,) * 4),
+        mbs=base.get("mbs", (0.0,) * 4), active=base.get("active", (True,) * 4),
+    )
+    wc = mix["wc_eff"]
+    factor = base.get("site_factor", 1.0) * LITHOLOGY_FACTORS.get(base.get("lithology"), 1.0)
+    pred = theoretical_mpa(wc, air) * factor
+
+    ai_model = base.get("ai_model")
+    if ai_model is None and base.get("ai_coeffs") is not None:
+        ai_model = {"coeffs": base["ai_coeffs"], "intercept": base.get("ai_intercept", 0.0)}
+    if ai_model is not None:
+        X = np.column_stack([cement, water, ash, air, mix["admixture_kg"]])
+        ai, ai_pi = predict_batch(ai_model, X)
+    else:
+        ai = ai_pi = np.full(n, np.nan)
+
+    comp = evaluate_compliance_batch(pd.DataFrame({
+        "class": base.get("target_class", "C30/37"), "exposure_class": base.get("exposure_class", "XC3"),
+        "asr_status": base.get("asr_status", "Düzeltme Gerekmiyor"),
+        "grading_violation": bool(base.get("grading_violation", False)),
+        "grading_dev": float(base.get("grading_dev", 0.0)),
+        "wc": wc, "cement": cement, "pred_mpa": pred, "avg_la": mix["w_la"], "avg_mb": mix["w_mb"],
+    }))
+    out = designs.reset_index(drop=True).copy()
+    out["wc"] = wc
+    out["pred_mpa"] = pred
+    out["ai_mpa"] = ai
+    out["ai_pi"] = ai_pi
+    out["status"] = comp["status"]
+    out["flags"] = comp["flags"]
+    out["cost"] = recipe_cost(mix, cement, water, ash, base.get("unit_costs"))
+    return out
+
+def evaluate_designs(designs, base=None, workers=None, chunk_size=100_000):
+    """
+    designs: SWEEP_VARS sütunlu DataFrame (grid_designs / lhs_designs).
+    base: sabit girdiler - p (4 oran %), admixture_pct, rhos/was/moists/las/mbs,
+    active, target_class, exposure_class, asr_status, lithology, site_factor,
+    ai_model (kayıt defteri modeli; ya da ai_coeffs/ai_intercept), grading_violation/grading_dev, unit_costs.
+    workers > 1 ve satır sayısı POOL_MIN_ROWS üzerindeyse işlem havuzu kullanılır.
+    wc, pred_mpa, ai_mpa, ai_pi (%95 tahmin aralığı ±, kovaryanssız modelde NaN),
+    status (STATUS_*), flags, cost sütunları eklenmiş DataFrame döner.
+    """
+    base = base or {}
+    if not workers or workers <= 1 or len(designs) < POOL_MIN_ROWS:
+        return _evaluate_chunk(designs, base)
+    chunks = [designs.iloc[i:i + chunk_size] for i in range(0, len(designs), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_evaluate_chunk, chunks, itertools.repeat(base)))
+    return pd.concat(parts, ignore_index=True)
+
+def sweep(base=None, bounds=None, method="grid", steps=21, n=10_000, seed=0, workers=None):
+    """Tek çağrıda ızgara ya da LHS taraması (method: "grid" | "lhs")."""
+    if method == "lhs":
+        designs = lhs_designs(n, bounds, seed)
+    elif method == "grid":
+        designs = grid_designs(bounds, steps)
+    else:
+        raise ValueError(f"Bilinmeyen tarama yöntemi: {method}")
+    return evaluate_designs(designs, base, workers=workers)
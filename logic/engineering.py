@@ -1,5 +1,13 @@
+from functools import lru_cache
+from itertools import chain
+
 import numpy as np
-from scipy.optimize import minimize
+import pandas as pd
+
+from logic.gradation_analytics import gradation_metrics
+from logic.gradation_solver import solve_gradation
+from logic.memo import memoize
+from logic.pool_columns import PoolColumns
 
 # --- 2.1 KURAL MOTORU VERİTABANI (Decision Engine Rules) ---
 CONCRETE_RULES = {
@@ -47,6 +55,13 @@ LITHOLOGY_FACTORS = {
     "Granit": 1.02
 }
 
+# Varsayılan birim maliyetler (TL/kg) - tarama ve maliyet optimizasyonu için;
+# santral fiyatları çağrıda verilen sözlükle geçersiz kılınır
+UNIT_COSTS = {
+    "cement": 3.20, "water": 0.02, "ash": 1.10, "admixture": 35.0,
+    "aggregates": (0.38, 0.38, 0.30, 0.26),  # No:2, No:1, K.Kum, D.Kum
+}
+
 # TSE 802 Dmax Bağımlı Elek Serileri (Standart 13 Elek - Büyükten Küçüğe)
 SIEVE_SETS = {
     31.5: [40, 31.5, 22.4, 16, 11.2, 8, 4, 2, 1, 0.5, 0.25, 0.15, 0.063],
@@ -80,48 +95,75 @@ def calculate_passing(m1, weights):
     passing_pct = 100 - (cumulative_retained / m1 * 100)
     return np.clip(passing_pct, 0, 100)
 
+def _compile_grading_db(db):
+    """
+    STD_GRADING_DB'yi (dmax, eğri) başına NumPy dizilerine derler:
+    pozitif eleklerin log'u (artan), alt/üst değerleri, en büyük elek ve
+    en küçük anahtarın (0.0) değerleri.
+    """
+    compiled = {}
+    for dmax, curves in db.items():
+        for curve, table in curves.items():
+            keys = np.array(sorted(table), dtype=float)
+            lo = np.array([table[k][0] for k in sorted(table)], dtype=float)
+            hi = np.array([table[k][1] for k in sorted(table)], dtype=float)
+            pos = keys > 0
+            compiled[(dmax, curve)] = (np.log(keys[pos]), lo[pos], hi[pos], keys[-1], lo[0], hi[0])
+    return compiled
+
+_STD_TABLES = _compile_grading_db(STD_GRADING_DB)
+
+def _envelope(table, sieves):
+    # Log uzayında tek np.interp; tablo dışı uçlar eski davranışla aynı:
+    # en büyük elekten büyük -> 100, en küçük pozitif elekten küçük -> onun değeri,
+    # <= 0 -> 0.0 anahtarının değeri. Bilinmeyen dmax/eğri -> 100.
+    if table is None:
+        full = np.full(len(sieves), 100.0)
+        return full, full.copy()
+    log_x, lo, hi, top, lo0, hi0 = table
+    positive = sieves > 0
+    log_e = np.log(np.where(positive, sieves, 1.0))
+    alt = np.where(positive, np.interp(log_e, log_x, lo), lo0)
+    ust = np.where(positive, np.interp(log_e, log_x, hi), hi0)
+    above = sieves > top
+    alt[above] = 100.0
+    ust[above] = 100.0
+    return alt, ust
+
+@lru_cache(maxsize=256)
+def _std_limits_cached(dmax, curve_type, sieves):
+    alt, ust = _envelope(_STD_TABLES.get((dmax, curve_type)), np.asarray(sieves, dtype=float))
+    alt.flags.writeable = False
+    ust.flags.writeable = False
+    return alt, ust
+
 def get_std_limits(dmax, curve_type, elek_serisi):
-    limits_dict = STD_GRADING_DB.get(dmax, {}).get(curve_type, {})
-    std_sieves = sorted(list(limits_dict.keys()), reverse=True)
-    
-    alt_points = []
-    ust_points = []
-    
-    for e in elek_serisi:
-        if e in limits_dict:
-            alt_points.append(limits_dict[e][0])
-            ust_points.append(limits_dict[e][1])
-            continue
-            
-        s1, s2 = None, None
-        for s in std_sieves:
-            if s > e: s1 = s
-            else: s2 = s; break
-        
-        if s1 is not None and s2 is not None:
-            log_e, log_s1, log_s2 = np.log(e), np.log(s1), np.log(s2)
-            denom = log_s2 - log_s1
-            
-            if denom != 0:
-                ratio = (log_e - log_s1) / denom
-                # Alt Limit
-                y1, y2 = limits_dict[s1][0], limits_dict[s2][0]
-                alt_points.append(y1 + ratio * (y2 - y1))
-                # Üst Limit
-                y1, y2 = limits_dict[s1][1], limits_dict[s2][1]
-                ust_points.append(y1 + ratio * (y2 - y1))
-            else:
-                alt_points.append(limits_dict[s1][0])
-                ust_points.append(limits_dict[s1][1])
-            
-        elif s1 is None: 
-            alt_points.append(100.0); ust_points.append(100.0)
-        elif s2 is None:
-             alt_points.append(limits_dict[s1][0]); ust_points.append(limits_dict[s1][1])
+    """Elek serisi için TS 802 alt/üst limit listeleri ((dmax, eğri, elekler) başına önbellekli)."""
+    alt, ust = _std_limits_cached(dmax, curve_type, tuple(elek_serisi))
+    return alt.tolist(), ust.tolist()
 
-    return alt_points, ust_points
+def get_std_limits_batch(dmax, curve_type, sieve_series):
+    """
+    Birden çok elek serisi için limitler tek np.interp çağrısıyla:
+    [(alt, ust), ...] (NumPy dizileri) döner.
+    """
+    lengths = [len(s) for s in sieve_series]
+    if not lengths: return []
+    flat = np.fromiter(chain.from_iterable(sieve_series), dtype=float, count=sum(lengths))
+    alt, ust = _envelope(_STD_TABLES.get((dmax, curve_type)), flat)
+    ends = np.cumsum(lengths).tolist()
+    return [(alt[e - n:e], ust[e - n:e]) for n, e in zip(lengths, ends)]
 
-def optimize_mix(target_curve_type, dmax, active_mats, all_passing_dfs, elek_serisi, materials):
+@memoize("optimize_mix", maxsize=128)
+def optimize_mix(target_curve_type, dmax, active_mats, all_passing_dfs, elek_serisi, materials,
+                 sieve_weights=None, warm_start=None):
+    """
+    Aktif malzemelerin oranlarını (% toplam 100) hedef eğrinin orta çizgisine
+    ağırlıklı en küçük kareler anlamında en yakın olacak şekilde bulur.
+    sieve_weights: elek başına ağırlık (varsayılan 1); warm_start: aktif
+    malzemelerin mevcut oranları. Kesin aktif küme çözücüsü kullanılır.
+    Sonuç girdilerin özetiyle süreç genelinde önbelleklenir (logic.memo).
+    """
     alt, ust = get_std_limits(dmax, target_curve_type, elek_serisi)
     target_y = (np.array(alt) + np.array(ust)) / 2 
     
@@ -134,30 +176,17 @@ def optimize_mix(target_curve_type, dmax, active_mats, all_passing_dfs, elek_ser
         vals = all_passing_dfs.get(mat_name, [0]*len(elek_serisi))
         A.append(vals)
         
-    A = np.array(A).T 
+    A = np.array(A, dtype=float).T 
     
-    def cost_fn(weights):
-        mix_grading = np.dot(A, weights)
-        # Kareler toplamı hatası + Mühendislik kısıtı (Kum oranı cezası)
-        error = np.sum((mix_grading - target_y)**2)
-        return error
-
-    n = len(active_indices)
-    init_guess = [100/n] * n
+    # Sınırlar: %0 - %100 arası, ancak kum (0-5 veya 0-7) için min %25 kısıtı (Gerçekçi olması için)
+    lo = [25.0 if "Kum" in materials[idx] else 0.0 for idx in active_indices]
+    hi = [100.0] * len(active_indices)
     
-    # Kısıtlar: Toplam %100 olmalı
-    cons = [{'type': 'eq', 'fun': lambda x:  np.sum(x) - 100}]
-    
-    # Sınırlar: %0 - %100 arası, ancak kum (0-5 veya 0-7) için min %30 kısıtı ekleyelim (Gerçekçi olması için)
-    bnds = []
-    for idx in active_indices:
-        mat_lower = 0.0
-        # Eğer malzeme adında "Kum" geçiyorsa, genellikle en az %25-30 gerekir.
-        if "Kum" in materials[idx]: mat_lower = 25.0
-        bnds.append((mat_lower, 100.0))
-    
-    res = minimize(cost_fn, init_guess, method='SLSQP', bounds=tuple(bnds), constraints=cons)
-    return res.x if res.success else None
+    try:
+        res = solve_gradation(A, target_y, lo, hi, weights=sieve_weights, x0=warm_start, total=100.0)
+    except ValueError:
+        return None
+    return res["x"]
 
 def evaluate_mix_compliance(mix_data):
     target_class = mix_data.get("class", "C30/37")
@@ -229,6 +258,167 @@ def evaluate_mix_compliance(mix_data):
         "rationales": rationales
     }
 
+# Toplu uygunluk: her kontrol bir bit; mesajlar yalnızca gösterilen satırlar için üretilir
+V_EXP_WC, V_EXP_CEM, V_CLASS_WC, V_STRENGTH, V_GRADING, V_LA, V_MB = (1 << i for i in range(7))
+W_ASR = 1 << 7
+VIOLATION_BITS = V_EXP_WC | V_EXP_CEM | V_CLASS_WC | V_STRENGTH | V_GRADING | V_LA | V_MB
+CHECK_LABELS = {
+    V_EXP_WC: "Durabilite W/C", V_EXP_CEM: "Durabilite Çimento", V_CLASS_WC: "Sınıf W/C",
+    V_STRENGTH: "Dayanım", V_GRADING: "Gradasyon", V_LA: "LA", V_MB: "MB", W_ASR: "ASR",
+}
+STATUS_GREEN, STATUS_YELLOW, STATUS_RED = 0, 1, 2
+STATUS_NAMES = ("GREEN", "YELLOW", "RED")
+
+_COMPLIANCE_DEFAULTS = {
+    "class": "C30/37", "exposure_class": "XC3", "wc": 0.0, "cement": 0.0, "pred_mpa": 0.0,
+    "asr_status": "Düzeltme Gerekmiyor", "grading_violation": False, "grading_dev": 0.0,
+    "avg_la": 0.0, "avg_mb": 0.0,
+}
+
+def _categories(df, key):
+    # Kategorik sütunu bir kez kodlar; boş hücre ve eksik sütun varsayılan kategoriye düşer
+    default = _COMPLIANCE_DEFAULTS[key]
+    if key not in df.columns:
+        return np.zeros(len(df), dtype=np.intp), [default]
+    codes, uniques = pd.factorize(df[key])
+    uniques = list(uniques) + [default]
+    return np.where(codes < 0, len(uniques) - 1, codes), uniques
+
+def _lookup(categories, table, key, default):
+    # Sözlük araması satır başına değil, benzersiz değer başına yapılır
+    codes, uniques = categories
+    return np.array([table.get(u, table[default])[key] for u in uniques], dtype=float)[codes]
+
+def _column(df, key):
+    # Eksik sütun ya da boş hücre, tekil sürümdeki .get varsayılanını alır
+    default = _COMPLIANCE_DEFAULTS[key]
+    if key not in df.columns:
+        return np.full(len(df), default, dtype=type(default))
+    col = df[key]
+    if isinstance(default, bool):
+        return col.where(col.notna(), default).astype(bool).to_numpy()
+    return pd.to_numeric(col, errors="coerce").to_numpy(dtype=float, na_value=default)
+
+def evaluate_compliance_batch(df):
+    """
+    evaluate_mix_compliance'ın dizi sürümü. df: tekil sürümün anahtarlarıyla
+    aynı sütunlara sahip DataFrame (ya da sütun sözlüğü); eksik sütun ve boş
+    hücreler tekil sürümün varsayılanlarını alır.
+    {"status": int8 (STATUS_*), "flags": uint16 bit maskesi (V_* ihlal,
+    W_ASR uyarı)} döner. Metinler için compliance_details kullanılır.
+    """
+    if not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame(df)
+    cls, exp = _categories(df, "class"), _categories(df, "exposure_class")
+    wc, cement, pred = _column(df, "wc"), _column(df, "cement"), _column(df, "pred_mpa")
+
+    flags = np.zeros(len(df), dtype=np.uint16)
+    def mark(mask, bit):
+        np.bitwise_or(flags, mask.astype(np.uint16) * np.uint16(bit), out=flags)
+
+    mark(wc > _lookup(exp, EXPOSURE_CLASSES, "max_wc", "XC3"), V_EXP_WC)
+    mark(cement < _lookup(exp, EXPOSURE_CLASSES, "min_cem", "XC3"), V_EXP_CEM)
+    mark(wc > _lookup(cls, CONCRETE_RULES, "max_wc", "C30/37") + 0.02, V_CLASS_WC)
+    mark(pred < _lookup(cls, CONCRETE_RULES, "min_mpa", "C30/37") - 2.0, V_STRENGTH)
+    mark(_column(df, "grading_violation") & (_column(df, "grading_dev") > 5.0), V_GRADING)
+    mark(_column(df, "avg_la") > 35.0, V_LA)
+    mark(_column(df, "avg_mb") > 1.5, V_MB)
+    codes, uniques = _categories(df, "asr_status")
+    mark(np.array([isinstance(u, str) and "Reaktif" in u for u in uniques], dtype=bool)[codes], W_ASR)
+
+    status = np.where(flags & VIOLATION_BITS, STATUS_RED,
+                      np.where(flags & W_ASR, STATUS_YELLOW, STATUS_GREEN)).astype(np.int8)
+    return {"status": status, "flags": flags}
+
+def compliance_labels(flags):
+    """Bit maskesini kısa kontrol adlarına çevirir (tablo gösterimi için)."""
+    return [label for bit, label in CHECK_LABELS.items() if int(flags) & bit]
+
+def compliance_details(df, rows):
+    """
+    Yalnızca istenen (konumsal) satırlar için evaluate_mix_compliance çıktısını
+    üretir; {satır: karar} döner. Mesajlar tekil sürümle birebir aynıdır.
+    """
+    frame = df if isinstance(df, pd.DataFrame) else pd.DataFrame(df)
+    keys = [k for k in _COMPLIANCE_DEFAULTS if k in frame.columns]
+    details = {}
+    for i in rows:
+        row = frame.iloc[int(i)][keys]
+        details[int(i)] = evaluate_mix_compliance(row[row.notna()].to_dict())
+    return details
+
+# --- MUTLAK HACİM DOZAJ ÇEKİRDEĞİ (N reçete x 4 fraksiyon) ---
+RHO_CEMENT, RHO_WATER, RHO_ASH, RHO_ADMIXTURE = 3.15, 1.0, 2.25, 1.12
+
+def blend_passing(fractions, passing):
+    """(N, 4) oran (%) x (4, S) malzeme geçen % -> (N, S) karışım geçen %."""
+    return np.atleast_2d(np.asarray(fractions, float)) @ np.asarray(passing, float) / 100.0
+
+PROPORTION_FIELDS = (
+    "vol_cement", "vol_water", "vol_ash", "vol_air", "vol_admixture", "vol_agg", "admixture_kg",
+    "m_kg", "total_agg_kg", "wc_eff", "weighted_wa", "wa_liters", "water_correction", "batch_water",
+    "m_batch", "moist_water", "w_la", "w_mb", "passing", "retained", "filler", "sand", "cf", "wf",
+)
+
+def proportion_dtype(n_sieves):
+    fields = []
+    for name in PROPORTION_FIELDS:
+        if name in ("m_kg", "m_batch"): fields.append((name, "f8", (4,)))
+        elif name in ("passing", "retained"): fields.append((name, "f8", (n_sieves,)))
+        else: fields.append((name, "f8"))
+    return np.dtype(fields)
+
+def proportion_mixes(fractions, cement, water, ash=0.0, air=1.0, admixture_pct=0.0,
+                     rhos=(2.7,) * 4, was=(0.0,) * 4, moists=(0.0,) * 4, las=(0.0,) * 4, mbs=(0.0,) * 4,
+                     active=(True,) * 4, passing=None, sieves=()):
+    """
+    Mutlak hacim yöntemiyle 1 m³ dozaj. fractions: (N, 4) agrega oranı (%);
+    bağlayıcı girdileri skaler ya da N uzunluğunda; malzeme özellikleri 4 ya da
+    (N, 4). passing (4, S) ve sieves verilirse gradasyon göstergeleri de hesaplanır.
+    Alanları dizi olan (N,) yapılı bir numpy dizisi döner (PROPORTION_FIELDS).
+    """
+    p = np.atleast_2d(np.asarray(fractions, float))
+    n = len(p)
+    col = lambda v: np.broadcast_to(np.asarray(v, float), (n,))
+    mat = lambda v: np.broadcast_to(np.asarray(v, float), (n, 4))
+    cement, water, ash, air, adm_pct = col(cement), col(water), col(ash), col(air), col(admixture_pct)
+    rhos, was, moists, las, mbs = mat(rhos), mat(was), mat(moists), mat(las), mat(mbs)
+    active = np.broadcast_to(np.asarray(active, bool), (n, 4))
+    n_sieves = len(sieves) if passing is not None else 0
+
+    out = np.zeros(n, dtype=proportion_dtype(n_sieves))
+    out["admixture_kg"] = cement * adm_pct / 100
+    out["vol_cement"] = cement / RHO_CEMENT
+    out["vol_water"] = water / RHO_WATER
+    out["vol_ash"] = ash / RHO_ASH
+    out["vol_air"] = air * 10
+    out["vol_admixture"] = out["admixture_kg"] / RHO_ADMIXTURE
+    out["vol_agg"] = 1000 - (out["vol_cement"] + out["vol_water"] + out["vol_ash"] + out["vol_air"] + out["vol_admixture"])
+    m_kg = out["vol_agg"][:, None] * (p / 100) * rhos
+    out["m_kg"] = m_kg
+    out["total_agg_kg"] = m_kg.sum(axis=1)
+    binder = cement + 0.35 * ash
+    out["wc_eff"] = np.divide(water, binder, out=np.full(n, 0.6), where=cement > 0)
+
+    # Su emme telafisi (SSD) ve rutubete göre kantar düzeltmesi (yalnızca aktif malzemeler)
+    out["weighted_wa"] = (was * p).sum(axis=1) / 100
+    out["wa_liters"] = out["weighted_wa"] / 100 * out["total_agg_kg"]
+    out["water_correction"] = np.where(active, m_kg * (was - moists) / 100.0, 0.0).sum(axis=1)
+    out["batch_water"] = water + out["water_correction"]
+    out["m_batch"] = np.where(active, m_kg * (1 + (moists - was) / 100.0), 0.0)
+    out["moist_water"] = np.where(active, m_kg * moists / 100.0, 0.0).sum(axis=1)
+    out["w_la"] = (las * p).sum(axis=1) / 100
+    out["w_mb"] = (mbs * p).sum(axis=1) / 100
+
+    if n_sieves:
+        out["passing"] = blend_passing(p, passing)
+        for name, values in gradation_metrics(out["passing"], sieves, cement).items():
+            out[name] = values
+    return out
+
+# Tek reçete (mix sekmesi) için: aynı girdiyle tekrar çalıştırmada hesap yapılmaz
+proportion_mixes_cached = memoize("proportion_mixes", maxsize=256)(proportion_mixes)
+
 # --- 4. MÜHENDİSLİK AI MOTORU ---
 
 def calculate_theoretical_mpa(wc_ratio, air_content):
@@ -294,19 +484,19 @@ def classify_plant(records):
     else: return "🔴 C Sınıfı (Riskli)", "red"
 
 def best_wc_estimate(records, target_class):
-    good_wcs = []
     target_mpa = 30
     if "C30" in target_class: target_mpa = 37
     elif "C25" in target_class: target_mpa = 30
     elif "C35" in target_class: target_mpa = 45
     elif "C40" in target_class: target_mpa = 50
     
-    for r in records:
-        m = float(r.get('d28', 0)); w = float(r.get('water', 0)); c = float(r.get('cement', 0))
-        if m >= target_mpa and c > 0 and w > 0:
-            wc = w / c
-            if 0.3 < wc < 0.8: good_wcs.append(wc)
-    return round(sum(good_wcs)/len(good_wcs), 3) if good_wcs else None
+    # records: kayıt listesi ya da PoolColumns (havuz_sutunlari)
+    cols = records if isinstance(records, PoolColumns) else PoolColumns.from_records(records)
+    m, w, c = cols["d28"], cols["water"], cols["cement"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wc = w / c
+    good = (m >= target_mpa) & (c > 0) & (w > 0) & (wc > 0.3) & (wc < 0.8)
+    return round(float(wc[good].mean()), 3) if good.any() else None
 
 def qc_analysis_engine(expected_mpa, measured_mpa, wc_ratio, air_content, fines_ratio, curing_condition="Normal"):
     reasons = []
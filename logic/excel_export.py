@@ -0,0 +1,253 @@
+"""
+Çok sayfalı Excel raporu (xlsxwriter, constant_memory).
+
+Sayfalar: Özet, Reçete, Elek Analizi (fraksiyon bazında), Karışım Geçen
+(+ grafik), QC Geçmişi (+ grafik), Havuz (+ grafik) ve Uygunluk. Tek proje
+ya da tüm santral için üretilir.
+
+constant_memory modunda her sayfa satır satır diske akıtılır; QC kayıtları
+proje proje okunduğundan on binlerce satırlık santrallerde bellek sınırlı
+kalır. Üretilen dosya içerik özetiyle (proje verisi + havuz kesiti + karar)
+önbelleğe alınır; veri değişmediği sürece tekrar indirmeler yeniden üretmez.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import xlsxwriter
+
+from logic.constants import MATERIALS
+from logic.engineering import get_std_limits
+from logic.gradation_analytics import trial_gradation
+
+QC_COLUMNS = (
+    ("date", "Tarih"), ("no", "No"), ("target_mpa", "Hedef (MPa)"), ("cement", "Çimento"),
+    ("water", "Su"), ("ash", "Kül"), ("admixture", "Katkı"), ("air", "Hava %"), ("slump", "Slump"),
+    ("d7", "d7 (MPa)"), ("d28", "d28 (MPa)"), ("predicted_mpa", "Tahmin (MPa)"),
+)
+POOL_COLUMNS = (
+    ("date", "Tarih"), ("cement", "Çimento"), ("water", "Su"), ("ash", "Kül"), ("air", "Hava %"),
+    ("admixture", "Katkı"), ("d28", "d28 (MPa)"), ("lithology", "Litoloji"), ("class", "Sınıf"),
+)
+MAX_CHART_SERIES = 10
+CACHE_SIZE = 4
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# --- HESAPLAMA ---
+def _num(value):
+    """Excel hücresi için sayı; sayı değilse metin, boşsa None."""
+    if value is None or value == "": return None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return None if isinstance(value, float) and np.isnan(value) else float(value)
+    return str(value)
+
+
+# --- İÇERİK ÖZETİ ---
+def _iter_projects(store, plant_id, project):
+    names = [project] if project else [p["name"] for p in store.list_projects(plant_id)]
+    for name in names:
+        p_data = store.load_project(plant_id, name, readonly=True)
+        if isinstance(p_data, dict):
+            yield name, p_data
+
+def _pool_extract(pool_cols, limit):
+    if pool_cols is None or pool_cols.n == 0: return None
+    start = max(pool_cols.n - limit, 0)
+    return {name: pool_cols[name][start:] for name, _ in POOL_COLUMNS}
+
+def content_hash(store, plant_id, project=None, snapshot=None, pool=None, dmax=31.5, curve_type="B (İdeal)"):
+    """Raporun girdilerinin SHA-1 özeti; aynı girdiler aynı dosyayı üretir."""
+    h = hashlib.sha1()
+    h.update(json.dumps([plant_id, project, dmax, curve_type], ensure_ascii=False).encode())
+    for name, p_data in _iter_projects(store, plant_id, project):
+        h.update(json.dumps([name, p_data], ensure_ascii=False, sort_keys=True, default=str).encode())
+    if snapshot:
+        h.update(json.dumps({k: snapshot.get(k) for k in ("project_name", "decision", "recipe", "mix_data")},
+                            ensure_ascii=False, sort_keys=True, default=str).encode())
+    if pool:
+        for name, _ in POOL_COLUMNS:
+            col = pool[name]
+            h.update(col.astype(str).tobytes() if col.dtype.kind == "M" else col.tobytes())
+    return h.hexdigest()
+
+
+# --- YAZMA ---
+class _Sheet:
+    """constant_memory: satırlar yalnızca artan sırada yazılabilir."""
+
+    def __init__(self, ws, header, fmt):
+        self.ws = ws
+        self.row = 0
+        if header:
+            self.write(header, fmt)
+
+    def write(self, values, fmt=None):
+        # Tip başına doğrudan çağrı: genel write()'ın tür ayrıştırması atlanır
+        ws, row = self.ws, self.row
+        for col, value in enumerate(values):
+            if value is None: continue
+            if isinstance(value, str): ws.write_string(row, col, value, fmt)
+            else: ws.write_number(row, col, value, fmt)
+        self.row += 1
+
+
+def build_workbook(store, plant_id, project=None, snapshot=None, pool=None, dmax=31.5,
+                   curve_type="B (İdeal)"):
+    """Çalışma kitabını üretir ve .xlsx baytlarını döner (önbelleksiz)."""
+    output = BytesIO()
+    wb = xlsxwriter.Workbook(output, {"constant_memory": True, "nan_inf_to_errors": True})
+    bold = wb.add_format({"bold": True, "bg_color": "#2C3E50", "font_color": "white"})
+    num = wb.add_format({"num_format": "0.00"})
+
+    # Sayfa sırası oluşturma sırasıdır; Özet en son doldurulur
+    ws_summary = wb.add_worksheet("Özet")
+    recipe = _Sheet(wb.add_worksheet("Reçete"), ["Proje", "Deneme", "Aktif", "Çimento", "Su", "S/Ç", "Katkı %",
+                                                  "Kül", "Hava %", *MATERIALS, "Çevre Sınıfı", "ASR"], bold)
+    sieves = _Sheet(wb.add_worksheet("Elek Analizi"), ["Proje", "Deneme", "Elek (mm)", *MATERIALS, "Karışım"], bold)
+    ws_curve = wb.add_worksheet("Karışım Geçen")
+    qc = _Sheet(wb.add_worksheet("QC Geçmişi"), ["Proje"] + [t for _, t in QC_COLUMNS], bold)
+    ws_pool = wb.add_worksheet("Havuz")
+    ws_decision = wb.add_worksheet("Uygunluk")
+
+    curves = []  # [(etiket, elek, karışım)] Karışım Geçen sayfası için
+    n_projects = n_trials = 0
+    d28_sum = d28_n = 0
+    for name, p_data in _iter_projects(store, plant_id, project):
+        n_projects += 1
+        active_trial = p_data.get("active_trial")
+        for t_name, trial in (p_data.get("trials") or {}).items():
+            if not isinstance(trial, dict): continue
+            n_trials += 1
+            cim, su = trial.get("cim"), trial.get("su")
+            ratios = list(trial.get("p", [])) + [None] * 4
+            recipe.write([name, t_name, "✓" if t_name == active_trial else "", _num(cim), _num(su),
+                          _num(su / cim) if cim and su else None, _num(trial.get("kat")), _num(trial.get("ucucu")),
+                          _num(trial.get("hava")), *[_num(r) for r in ratios[:4]],
+                          trial.get("exp_class"), trial.get("asr_stat")])
+            elek, fractions, combined = trial_gradation(trial)
+            for j, e in enumerate(elek):
+                sieves.write([name, t_name, _num(e), *[_num(fractions[m][j]) if m in fractions else None
+                                                       for m in MATERIALS], _num(combined[j])], None)
+            if elek and sum(trial.get("p", [])) > 0:
+                curves.append((f"{name} / {t_name}" if not project else t_name, elek, combined))
+        # QC kayıtları proje proje akıtılır
+        for rec in p_data.get("qc_history", []):
+            if not isinstance(rec, dict): continue
+            qc.write([name] + [_num(rec.get(k)) for k, _ in QC_COLUMNS])
+            d28 = rec.get("d28")
+            if isinstance(d28, (int, float)) and d28 > 0:
+                d28_sum += d28; d28_n += 1
+
+    # Karışım Geçen: deneme başına (Elek, Geçen) kolon çifti; seriler farklı elek setleri taşıyabilir
+    alt, ust = get_std_limits(dmax, curve_type, curves[0][1]) if curves else ([], [])
+    blocks = [("Alt Limit", curves[0][1], alt), ("Üst Limit", curves[0][1], ust)] if curves else []
+    blocks += curves
+    ws_curve.write_row(0, 0, [h for label, _, _ in blocks for h in ("Elek (mm)", label)], bold)
+    for r in range(max((len(e) for _, e, _ in blocks), default=0)):
+        for b, (_, elek, values) in enumerate(blocks):
+            if r < len(elek):
+                ws_curve.write_number(r + 1, 2 * b, float(elek[r]))
+                ws_curve.write_number(r + 1, 2 * b + 1, float(values[r]), num)
+    if curves:
+        chart = wb.add_chart({"type": "scatter", "subtype": "straight_with_markers"})
+        for b, (label, elek, _) in enumerate(blocks[:MAX_CHART_SERIES + 2]):
+            series = {"name": label, "categories": ["Karışım Geçen", 1, 2 * b, len(elek), 2 * b],
+                      "values": ["Karışım Geçen", 1, 2 * b + 1, len(elek), 2 * b + 1]}
+            if b < 2:
+                series.update({"line": {"color": "red", "dash_type": "dash"}, "marker": {"type": "none"}})
+            chart.add_series(series)
+        chart.set_title({"name": "Karışım Granülometrisi (TS 802)"})
+        chart.set_x_axis({"name": "Elek (mm)", "log_base": 10, "min": 0.05})
+        chart.set_y_axis({"name": "Geçen %", "min": 0, "max": 100})
+        chart.set_size({"width": 900, "height": 480})
+        ws_curve.insert_chart(0, 2 * len(blocks) + 1, chart)
+
+    if qc.row > 1:
+        chart = wb.add_chart({"type": "line"})
+        chart.add_series({"name": "d28", "values": ["QC Geçmişi", 1, 11, qc.row - 1, 11]})
+        chart.add_series({"name": "Tahmin", "values": ["QC Geçmişi", 1, 12, qc.row - 1, 12],
+                          "line": {"dash_type": "dash"}})
+        chart.set_title({"name": "28 Günlük Dayanım"})
+        chart.set_y_axis({"name": "MPa"})
+        qc.ws.insert_chart(1, len(QC_COLUMNS) + 2, chart)
+
+    # Havuz kesiti (kolon görünümünden, en yeni kayıtlar)
+    pool_sheet = _Sheet(ws_pool, [t for _, t in POOL_COLUMNS] + ["S/Ç"], bold)
+    if pool:
+        dates = np.datetime_as_string(pool["date"], unit="D")
+        wc = np.divide(pool["water"], pool["cement"], out=np.full(len(dates), np.nan), where=pool["cement"] > 0)
+        for i in range(len(dates)):
+            pool_sheet.write([None if dates[i] == "NaT" else dates[i]]
+                             + [_num(pool[k][i]) for k, _ in POOL_COLUMNS[1:]] + [_num(wc[i])])
+        chart = wb.add_chart({"type": "scatter"})
+        chart.add_series({"name": "Havuz", "categories": ["Havuz", 1, len(POOL_COLUMNS), len(dates), len(POOL_COLUMNS)],
+                          "values": ["Havuz", 1, 6, len(dates), 6], "marker": {"type": "circle", "size": 4}})
+        chart.set_title({"name": "S/Ç - d28 (AI Havuzu)"})
+        chart.set_x_axis({"name": "S/Ç", "min": 0.3})
+        chart.set_y_axis({"name": "d28 (MPa)"})
+        chart.set_legend({"none": True})
+        ws_pool.insert_chart(1, len(POOL_COLUMNS) + 2, chart)
+
+    # Uygunluk kararı: yalnızca aynı projenin hesaplanmış karışım görüntüsünden
+    decision_sheet = _Sheet(ws_decision, ["Alan", "Değer"], bold)
+    decision = (snapshot or {}).get("decision")
+    if decision and (not project or snapshot.get("project_name") == project):
+        decision_sheet.write(["Proje", snapshot.get("project_name")])
+        decision_sheet.write(["Durum", decision.get("status")])
+        decision_sheet.write(["Karar", decision.get("title")])
+        decision_sheet.write(["Açıklama", decision.get("main_msg")])
+        for key, label in (("violations", "İhlal"), ("warnings", "Uyarı"), ("rationales", "Gerekçe")):
+            for msg in decision.get(key, []):
+                decision_sheet.write([label, msg])
+    else:
+        decision_sheet.write(["Durum", "Karışım dizaynı hesaplanmadı"])
+
+    summary = _Sheet(ws_summary, ["Parametre", "Değer"], bold)
+    for row in (("Santral", plant_id), ("Proje", project or "Tüm projeler"),
+                ("Oluşturma", datetime.now().strftime("%Y-%m-%d %H:%M")),
+                ("Proje Sayısı", n_projects), ("Deneme Sayısı", n_trials), ("QC Kayıt", qc.row - 1),
+                ("Ortalama d28 (MPa)", round(d28_sum / d28_n, 2) if d28_n else None),
+                ("Havuz Kesiti", len(pool["d28"]) if pool else 0),
+                ("Karar", decision.get("title") if decision else None)):
+        summary.write(row)
+    ws_summary.set_column(0, 0, 22)
+    ws_summary.set_column(1, 1, 40)
+
+    wb.close()
+    return output.getvalue()
+
+
+def export_workbook(plant_id, project=None, snapshot=None, pool_cols=None, dmax=31.5,
+                    curve_type="B (İdeal)", pool_limit=5000, store=None):
+    """
+    Raporu önbellekten ya da üreterek döner (.xlsx baytları). project None ise
+    tüm santral. pool_cols (PoolColumns) verilirse en yeni pool_limit kaydı
+    Havuz sayfasına yazılır.
+    """
+    if store is None:
+        from logic.data_manager import get_storage
+        store = get_storage()
+    pool = _pool_extract(pool_cols, pool_limit)
+    key = content_hash(store, plant_id, project, snapshot, pool, dmax, curve_type)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    data = build_workbook(store, plant_id, project, snapshot, pool, dmax, curve_type)
+    with _cache_lock:
+        _cache[key] = data
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,125 @@
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+class _Entry:
+    __slots__ = ("key", "value", "blob")
+
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+        self.blob = None
+
+
+class FileCache:
+    """
+    Dosya okumaları için süreç içi önbellek.
+
+    Her kayıt (yol, mtime_ns, boyut, inode) ile anahtarlanır: dosya diskte
+    değişmediği sürece yeniden ayrıştırılmaz. Atomik yazmalar dosyayı yeniden
+    adlandırdığından inode, aynı zaman tikindeki yazmaları da yakalar.
+
+    Varsayılan olarak çağırana kopya verilir (pickle ile, JSON ayrıştırmasından
+    ~3 kat hızlı); copy=False ise paylaşılan nesne döner ve çağıran onu
+    DEĞİŞTİRMEMELİDİR.
+
+    Tahliye LRU'dur (isabet kaydı sona taşır). Kapasite max_entries
+    (varsayılan FILE_CACHE_ENTRIES ortam değişkeni, 64) ile reserve() ile
+    ayrılan yerlerin toplamıdır: proje başına dosya okuyan motorlar
+    (ShardedJsonStorage) santralin dosya sayısı kadar yer ayırır; böylece
+    büyük santrallerde tam geçişler birbirini tahliye etmez.
+    """
+
+    def __init__(self, max_entries=None):
+        self.base_entries = max_entries or int(os.getenv("FILE_CACHE_ENTRIES", "64"))
+        self._reserved = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self):
+        return self.base_entries + sum(self._reserved.values())
+
+    def reserve(self, owner, n):
+        """owner (ör. santral klasörü) için n kayıtlık yer ayırır; önceki ayrımın yerine geçer."""
+        with self._lock:
+            if self._reserved.get(owner) != n:
+                self._reserved[owner] = n
+                self._evict()
+
+    def _evict(self):
+        limit = self.max_entries
+        while len(self._entries) > limit:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _norm(path):
+        return os.path.abspath(path)
+
+    def load(self, path, loader, default=None, copy=True):
+        """Dosyayı loader(path) ile okur; değişmemişse önbellekten döner."""
+        path = self._norm(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return default
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.key == key:
+                self.hits += 1
+                self._entries.move_to_end(path)
+            else:
+                entry = None
+                self.misses += 1
+        if entry is None:
+            entry = _Entry(key, loader(path))
+            with self._lock:
+                self._entries[path] = entry
+                self._entries.move_to_end(path)
+                self._evict()
+
+        if not copy:
+            return entry.value
+        if entry.blob is None:
+            entry.blob = pickle.dumps(entry.value, pickle.HIGHEST_PROTOCOL)
+        return pickle.loads(entry.blob)
+
+    def read_json(self, path, default=None, copy=True):
+        return self.load(path, _load_json, default, copy)
+
+    def invalidate(self, path=None):
+        """Tek bir dosyanın (ya da path=None ise tümünün) önbelleğini siler."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._norm(path), None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# Global file cache instance
+file_cache = FileCache()
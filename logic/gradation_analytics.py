@@ -0,0 +1,216 @@
+"""
+Karışım gradasyonu göstergeleri: bireysel kalan % (8-18 kuralı), filler
+(<0.063 mm), kum (<4 mm) ve Shilstone irilik (CF) / işlenebilirlik (WF)
+faktörleri.
+
+Göstergeler elek konumuna değil elek boyutuna göre okunur: seride olmayan
+bir elek için geçen %, komşu eleklerden log-doğrusal ara değerle bulunur
+(seriden büyük elek -> 100, en küçük elekten küçük -> 0). Tüm hesap bir
+geçen matrisi (N eğri x S elek) üzerinde tek geçişte yapılır.
+
+snapshot_gradation, karışım görüntüsü (mix_snapshot) için sonucu görüntünün
+içine parmak iziyle saklar; rapor, arayüz panelleri ve AI istemi aynı
+sayıları yeniden hesaplamadan kullanır.
+
+resample_passing farklı elek serileriyle kaydedilmiş eğrileri ortak bir
+seriye taşır (log-boyutta monoton parçalı doğrusal ara değer); karşılaştırma
+sekmesi ve Excel raporu denemeleri bununla üst üste koyar.
+"""
+import hashlib
+
+import numpy as np
+
+from logic.constants import MATERIALS
+from logic.memo import LRUMemo, stable_hash
+
+FILLER_SIEVE = 0.063
+SAND_SIEVE = 4.0
+CF_SIEVE = 8.0   # Shilstone 9.5 mm'nin TS serisindeki karşılığı
+WF_SIEVE = 2.0   # Shilstone 2.36 mm'nin TS serisindeki karşılığı
+WF_REF_CEMENT = 335.0  # WF düzeltmesi: her 55 kg çimento için 2.5 puan
+
+def passing_at(passing, sieves, size):
+    """(N, S) geçen matrisinden size (mm) eleğinden geçen % (N,)."""
+    passing = np.atleast_2d(np.asarray(passing, float))
+    sieves = np.asarray(sieves, float)
+    out = np.zeros(len(passing))
+    keep = sieves > 0
+    if not keep.any(): return out
+    log_s = np.log(sieves[keep])
+    order = np.argsort(log_s)
+    log_s, curves = log_s[order], passing[:, keep][:, order]
+    x = np.log(size)
+    hit = np.flatnonzero(np.isclose(log_s, x, rtol=0, atol=1e-9))
+    if len(hit): return curves[:, hit[0]].copy()
+    if x > log_s[-1]: return np.full(len(passing), 100.0)
+    if x < log_s[0]: return out
+    j = int(np.searchsorted(log_s, x))
+    t = (x - log_s[j - 1]) / (log_s[j] - log_s[j - 1])
+    return curves[:, j - 1] + t * (curves[:, j] - curves[:, j - 1])
+
+def pad_curves(curves):
+    """
+    [(elekler, geçen), ...] farklı uzunluktaki eğrileri NaN ile doldurulmuş
+    (N, Smax) elek ve geçen matrislerine çevirir.
+    """
+    width = max((len(sv) for sv, _ in curves), default=0)
+    sieves = np.full((len(curves), width), np.nan)
+    passing = np.full((len(curves), width), np.nan)
+    for i, (sv, pv) in enumerate(curves):
+        n = min(len(sv), len(pv))
+        sieves[i, :n] = np.asarray(sv, float)[:n]
+        passing[i, :n] = np.asarray(pv, float)[:n]
+    return sieves, passing
+
+def resample_passing(passing, sieves, target_sieves, below=np.nan):
+    """
+    Geçen eğrilerini target_sieves serisine taşır: (N, S) geçen, (S,) ortak
+    ya da (N, S) satır başına elekler (NaN dolgu: pad_curves) -> (N, T).
+
+    Ara değer log(elek) üzerinde parçalı doğrusaldır; eğri önce elek boyutuna
+    göre monoton (büyük elekte geçen küçük elektekinden az olamaz) yapılır,
+    dolayısıyla sonuç da monotondur. Ortak elekler birebir aynı değeri alır.
+    Eğrinin en büyük eleğinden büyük elekler 100, en küçüğünden küçükler
+    below (ölçülmemiş; varsayılan NaN) olur.
+    """
+    passing = np.atleast_2d(np.asarray(passing, float))
+    sieves = np.broadcast_to(np.asarray(sieves, float), passing.shape)
+    target = np.asarray(target_sieves, float)
+    n, t = len(passing), len(target)
+    out = np.full((n, t), float(below))
+    if n == 0 or t == 0 or passing.shape[1] == 0:
+        return out
+
+    valid = (sieves > 0) & np.isfinite(sieves) & np.isfinite(passing)
+    log_s = np.where(valid, np.log(np.where(valid, sieves, 1.0)), np.inf)
+    order = np.argsort(log_s, axis=1, kind="stable")
+    log_s = np.take_along_axis(log_s, order, axis=1)
+    curves = np.take_along_axis(np.where(valid, passing, np.nan), order, axis=1)
+    curves = np.fmax.accumulate(curves, axis=1)  # artan elekte azalmayan geçen
+    count = valid.sum(axis=1)
+
+    x = np.log(np.where(target > 0, target, np.nan))
+    tol = 1e-9
+    j = (log_s[:, None, :] <= x[None, :, None] + tol).sum(axis=2)  # (N, T): x'e eşit/küçük elek sayısı
+    lo = np.clip(j - 1, 0, None)
+    hi = np.minimum(j, np.maximum(count - 1, 0)[:, None])
+    rows = np.arange(n)[:, None]
+    x_lo, x_hi = log_s[rows, lo], log_s[rows, hi]
+    p_lo, p_hi = curves[rows, lo], curves[rows, hi]
+    span = np.where(hi > lo, x_hi - x_lo, 1.0)
+    frac = np.where((hi > lo) & (np.abs(x - x_lo) > tol), (x - x_lo) / span, 0.0)
+    values = p_lo + frac * (p_hi - p_lo)
+
+    top = np.where(count > 0, log_s[np.arange(n), np.maximum(count - 1, 0)], -np.inf)[:, None]
+    inside = (j > 0) & np.isfinite(x)
+    out = np.where(inside, values, out)
+    out[(x[None, :] > top + tol) & (count[:, None] > 0)] = 100.0
+    return out
+
+def trial_gradation(trial, default_sieves=()):
+    """
+    Denemenin elek serisi, fraksiyon bazında geçen yüzdeleri ve karışım eğrisi:
+    ri (kalan gramaj) + m1 -> geçen % (calculate_passing ile aynı formül).
+    ri kaydı elek serisinden kısa/uzunsa sıfırla tamamlanır / kırpılır.
+    """
+    elek = list(trial.get("elek") or default_sieves)
+    ratios = trial.get("p", [25, 25, 25, 25])
+    active = trial.get("active", [True, True, True, True])
+    ri = trial.get("ri") or {}
+    m1s = trial.get("m1s", [4000.0, 4000.0, 2000.0, 2000.0])
+    fractions = {}
+    combined = np.zeros(len(elek))
+    for i, mat in enumerate(MATERIALS):
+        if i >= len(active) or not active[i]: continue
+        weights = list(ri.get(mat, []))[:len(elek)]
+        weights += [0.0] * (len(elek) - len(weights))
+        m1 = m1s[i] if i < len(m1s) else 2000.0
+        if m1 <= 0:
+            passing = np.full(len(elek), 100.0)
+        else:
+            passing = np.clip(100 - (np.cumsum(weights) / m1 * 100), 0, 100)
+        fractions[mat] = passing
+        combined += passing * (ratios[i] / 100.0 if i < len(ratios) else 0.0)
+    return elek, fractions, combined
+
+_trial_cache = LRUMemo("trial_gradation", maxsize=512)
+
+def _trial_curve(trial, default_sieves):
+    # Yalnızca gradasyonu belirleyen alanlar özetlenir (reçete değişikliği önbelleği bozmaz)
+    key = stable_hash({k: trial.get(k) for k in ("elek", "p", "active", "ri", "m1s")}, list(default_sieves))
+    curve = _trial_cache.get(key)
+    if curve is None:
+        elek, _, combined = trial_gradation(trial, default_sieves)
+        curve = (tuple(elek), combined)
+        combined.flags.writeable = False
+        _trial_cache.put(key, curve)
+    return curve
+
+def compare_trials(trials, target_sieves, default_sieves=None):
+    """
+    {deneme adı: deneme} -> (adlar, (N, T) karışım geçen matrisi) hedef elek
+    serisinde. Oranı boş denemeler atlanır. Deneme eğrileri içerik özetiyle
+    önbelleklenir; yeniden örnekleme tüm denemeler için tek çağrıdır.
+    """
+    default_sieves = target_sieves if default_sieves is None else default_sieves
+    names, curves = [], []
+    for name, trial in trials.items():
+        if sum(trial.get("p", [25, 25, 25, 25])) <= 0: continue
+        names.append(name)
+        curves.append(_trial_curve(trial, default_sieves))
+    sieves, passing = pad_curves(curves)
+    return names, resample_passing(passing, sieves, target_sieves)
+
+def retained_percent(passing):
+    """Yığışımlı geçenden bireysel kalan % (ilk elekte 100 - geçen)."""
+    passing = np.atleast_2d(np.asarray(passing, float))
+    prev = np.concatenate([np.full((len(passing), 1), 100.0), passing[:, :-1]], axis=1)
+    return np.maximum(0, prev - passing)
+
+def gradation_metrics(passing, sieves, cement=350.0):
+    """
+    N eğrinin tüm göstergeleri: {"retained": (N, S), "filler", "sand", "cf",
+    "wf": (N,)}. cement skaler ya da N uzunluğunda (WF düzeltmesi için).
+    """
+    passing = np.atleast_2d(np.asarray(passing, float))
+    sieves = list(sieves)
+    p_cf = passing_at(passing, sieves, CF_SIEVE)
+    p_wf = passing_at(passing, sieves, WF_SIEVE)
+    ret_cf, ret_wf = 100 - p_cf, 100 - p_wf
+    cement = np.asarray(cement, float)
+    return {
+        "retained": retained_percent(passing),
+        "filler": passing_at(passing, sieves, FILLER_SIEVE),
+        "sand": passing_at(passing, sieves, SAND_SIEVE),
+        "cf": np.divide(ret_cf * 100, ret_wf, out=np.zeros(len(passing)), where=ret_wf > 0),
+        "wf": p_wf + (cement - WF_REF_CEMENT) / 55 * 2.5,
+    }
+
+def _fingerprint(sieves, passing, cement):
+    h = hashlib.sha1(np.asarray(sieves, float).tobytes())
+    h.update(np.asarray(passing, float).tobytes())
+    h.update(np.float64(cement).tobytes())
+    return h.hexdigest()
+
+def snapshot_gradation(snapshot):
+    """
+    Karışım görüntüsünün göstergeleri (tek eğri, sade float/list). Sonuç
+    snapshot["gradation"] içinde parmak iziyle saklanır; elek, geçen ya da
+    çimento değişmedikçe yeniden hesaplanmaz.
+    """
+    sieves = snapshot.get("sieves") or []
+    passing = snapshot.get("passing") or []
+    cement = float((snapshot.get("recipe") or {}).get("çimento", 350) or 0)
+    key = _fingerprint(sieves, passing, cement)
+    cached = snapshot.get("gradation")
+    if isinstance(cached, dict) and cached.get("key") == key:
+        return cached
+    if len(sieves) and len(passing) == len(sieves):
+        m = gradation_metrics(passing, sieves, cement)
+        result = {name: float(v[0]) for name, v in m.items() if name != "retained"}
+        result["retained"] = m["retained"][0].tolist()
+    else:
+        result = {"retained": [], "filler": 0.0, "sand": 0.0, "cf": 0.0, "wf": 0.0}
+    result["key"] = key
+    snapshot["gradation"] = result
+    return result
@@ -0,0 +1,135 @@
+"""
+Agrega oranı (gradasyon) optimizasyonu için küçük, kesin QP çözücü.
+
+    min  Σ_j w_j · (Σ_i A_ji · x_i / total − t_j)²
+    s.t. Σ_i x_i = total,   lo_i ≤ x_i ≤ hi_i
+
+A: elek x malzeme geçen % matrisi, t: hedef eğri, w: elek ağırlıkları.
+Değişken sayısı en fazla birkaç malzeme olduğundan birincil aktif küme
+(primal active-set) yöntemi birkaç iterasyonda KKT koşullarını sağlayan
+kesin çözümü bulur; her adım küçük bir doğrusal sistemdir. Başlangıç
+noktası (warm start) verilirse kısıtlara izdüşürülüp oradan başlanır.
+Sonuç aynı girdi için her zaman aynıdır. Sayısal bir sorunda SciPy SLSQP
+yedek olarak çalışır; o da başarısız olursa son uygun iterasyon döner.
+"""
+import numpy as np
+
+_TOL = 1e-10
+
+
+def project_feasible(x0, lo, hi, total=1.0):
+    """
+    x0'ı {Σx = total, lo ≤ x ≤ hi} kümesine izdüşürür: Σ clip(x0 − τ) parça
+    parça doğrusal olduğundan τ kırılma noktaları arasında kesin bulunur.
+    """
+    lo, hi = np.asarray(lo, float), np.asarray(hi, float)
+    if lo.sum() > total + 1e-9 or hi.sum() < total - 1e-9:
+        raise ValueError("Sınırlar toplam kısıtıyla bağdaşmıyor (uygun çözüm yok).")
+    x0 = np.asarray(x0, float)
+    bps = np.sort(np.concatenate([x0 - hi, x0 - lo]))
+    sums = np.clip(x0[None, :] - bps[:, None], lo, hi).sum(axis=1)  # τ arttıkça azalır
+    k = int(np.searchsorted(-sums, -total))
+    if k == 0 or k == len(bps):
+        tau = bps[min(k, len(bps) - 1)]
+    else:
+        drop = sums[k - 1] - sums[k]
+        tau = bps[k] if drop <= 0 else bps[k - 1] + (sums[k - 1] - total) / drop * (bps[k] - bps[k - 1])
+    x = np.clip(x0 - tau, lo, hi)
+    # Yuvarlama artığını sınıra değmeyen ilk değişkene yükle (kesin toplam)
+    slack = np.flatnonzero((x > lo + _TOL) & (x < hi - _TOL))
+    i = slack[0] if len(slack) else int(np.argmax(hi - lo))
+    x[i] = np.clip(x[i] + total - x.sum(), lo[i], hi[i])
+    return x
+
+
+def _active_set(H, g, lo, hi, x, max_iter):
+    """min ½x'Hx − g'x, Σx = sabit, lo ≤ x ≤ hi; x uygun başlangıç."""
+    n = len(x)
+    # Değişken durumu: 0 serbest, -1 alt sınırda, +1 üst sınırda
+    state = [-1 if abs(x[i] - lo[i]) <= _TOL else 1 if abs(x[i] - hi[i]) <= _TOL else 0 for i in range(n)]
+    if 0 not in state:  # en az bir serbest değişken: toplam kısıtı onunla taşınır
+        state[int(np.argmax(hi - lo))] = 0
+    x = x.copy()
+
+    for it in range(1, max_iter + 1):
+        free = [i for i in range(n) if state[i] == 0]
+        k = len(free)
+        grad = H @ x - g
+        # Serbest değişkenlerde eşitlik kısıtlı Newton adımı: [H_FF 1; 1' 0][p; ν] = [−grad_F; 0]
+        kkt = np.ones((k + 1, k + 1))
+        kkt[:k, :k] = H[free][:, free]
+        kkt[k, k] = 0.0
+        rhs = np.zeros(k + 1)
+        rhs[:k] = -grad[free]
+        sol = np.linalg.solve(kkt, rhs).tolist()
+
+        if max(abs(v) for v in sol[:k]) <= 1e-12:
+            # Durağan nokta: çalışan kümedeki sınırların Lagrange çarpanları
+            nu, j, worst = sol[k], -1, -1e-9
+            for i in range(n):
+                if state[i]:
+                    mult = state[i] * -(grad[i] + nu)
+                    if mult < worst: j, worst = i, mult
+            if j < 0:
+                return x, it
+            state[j] = 0
+            continue
+
+        # Adım boyu: ilk engelleyen sınıra kadar
+        alpha, block = 1.0, -1
+        for i, p in zip(free, sol):
+            if p < -1e-15:
+                a = (lo[i] - x[i]) / p
+                if a < alpha: alpha, block, side = a, i, -1
+            elif p > 1e-15:
+                a = (hi[i] - x[i]) / p
+                if a < alpha: alpha, block, side = a, i, 1
+        alpha = max(alpha, 0.0)
+        for i, p in zip(free, sol):
+            x[i] += alpha * p
+        if block >= 0:
+            x[block] = hi[block] if side > 0 else lo[block]
+            state[block] = side
+    raise RuntimeError("Aktif küme iterasyon sınırına ulaştı.")
+
+
+def _cost(A, t, w, x, total):
+    r = A @ x / total - t
+    return float(w @ (r * r))
+
+def _result(A, t, w, x, total, iterations, method):
+    return {"x": x * total, "cost": _cost(A, t, w, x, 1.0), "iterations": iterations, "method": method}
+
+
+def solve_gradation(A, target, lo, hi, weights=None, x0=None, total=100.0, max_iter=100):
+    """
+    Ağırlıklı kareler toplamını toplam ve sınır kısıtları altında en aza indirir.
+    A (elek x malzeme), target (elek), lo/hi (malzeme, total ölçeğinde).
+    {"x": oranlar, "cost": ağırlıklı hata, "iterations", "method": "active-set" |
+    "slsqp" | "projected"} döner. Uygun çözüm yoksa ValueError fırlatır.
+    """
+    A = np.asarray(A, float)
+    t = np.asarray(target, float)
+    m, n = A.shape
+    w = np.ones(m) if weights is None else np.asarray(weights, float)
+    lo, hi = np.asarray(lo, float) / total, np.asarray(hi, float) / total
+    start = project_feasible(np.full(n, 1.0 / n) if x0 is None else np.asarray(x0, float) / total, lo, hi)
+
+    # Normal denklemler; yarı-tanımlı H için küçük ridge ile tek çözüm
+    Aw = A * w[:, None]
+    H = A.T @ Aw
+    g = Aw.T @ t
+    H += np.eye(n) * (1e-12 * max(np.trace(H), 1.0))
+    try:
+        x, iters = _active_set(H, g, lo, hi, start, max_iter)
+        return _result(A, t, w, x, total, iters, "active-set")
+    except (np.linalg.LinAlgError, RuntimeError):
+        pass
+
+    from scipy.optimize import minimize
+    res = minimize(lambda y: _cost(A, t, w, y, 1.0), start, method="SLSQP",
+                   bounds=list(zip(lo, hi)), constraints=[{"type": "eq", "fun": lambda y: y.sum() - 1.0}])
+    if res.success:
+        x = project_feasible(res.x, lo, hi)
+        return _result(A, t, w, x, total, int(res.nit), "slsqp")
+    return _result(A, t, w, start, total, 0, "projected")
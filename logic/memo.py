@@ -0,0 +1,124 @@
+"""
+İçerik özetiyle (content hash) anahtarlanan, sınırlı LRU hesap önbelleği.
+
+Streamlit her widget etkileşiminde betiği baştan çalıştırır; optimize_mix ve
+dozaj hesabı girdiler değişmese de yeniden yapılır. memoize ile sarılan
+fonksiyonların sonuçları argümanlarının kararlı SHA-1 özetiyle saklanır.
+Önbellek modül düzeyindedir, dolayısıyla aynı süreçteki tüm oturumlar
+paylaşır (kilitle korunur). Dönen değerler file_cache'teki gibi pickle
+kopyasıdır; çağıran değiştirse de önbellek bozulmaz. memo_stats() isabet
+oranlarını verir.
+"""
+import functools
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+_registry = {}
+
+def _default(o):
+    if isinstance(o, np.ndarray):
+        # Büyük diziler için tolist yerine ham bayt + şekil/tür
+        return {"__nd__": hashlib.sha1(np.ascontiguousarray(o).tobytes()).hexdigest(),
+                "dtype": str(o.dtype), "shape": list(o.shape)}
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, (set, frozenset)):
+        return sorted(o, key=str)
+    return str(o)
+
+def stable_hash(*args, **kwargs):
+    """
+    Argümanların kararlı SHA-1 özeti: sözlük sırası, tuple/list ve numpy
+    skaler türleri özeti değiştirmez (1 ile 1.0 farklıdır).
+    """
+    payload = json.dumps([args, kwargs], sort_keys=True, ensure_ascii=False, default=_default)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+class LRUMemo:
+    """Sınırlı LRU sözlük + isabet/ıskalama sayaçları (thread-safe)."""
+
+    def __init__(self, name, maxsize=128):
+        self.name, self.maxsize = name, maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        _registry[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._data),
+                "max_entries": self.maxsize,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+def memoize(name, maxsize=128):
+    """
+    Fonksiyonu içerik özetli LRU önbellekle sarar. Sonuç pickle'lanmış olarak
+    tutulur, her çağrıda yeni bir kopya döner. Sarılan fonksiyonun .memo özniteliği
+    LRUMemo nesnesidir.
+    """
+    memo = LRUMemo(name, maxsize)
+    missing = object()
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = stable_hash(*args, **kwargs)
+            blob = memo.get(key, missing)
+            if blob is missing:
+                value = fn(*args, **kwargs)
+                memo.put(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+                return value
+            return pickle.loads(blob)
+        wrapper.memo = memo
+        return wrapper
+    return decorator
+
+def memo_stats():
+    """Süreçteki tüm önbelleklerin {ad: stats} sözlüğü."""
+    return {name: memo.stats() for name, memo in _registry.items()}
+
+def clear_all():
+    for memo in _registry.values():
+        memo.clear()
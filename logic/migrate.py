@@ -0,0 +1,162 @@
+"""
+Proje verisini tek bir kanonik şemaya getiren bakım komutu.
+
+    python -m logic.migrate [--data-dir data] [--plant merkez] [--dry-run]
+
+Kanonik şema (proje başına):
+    {"trials": {<deneme>: {...}}, "qc_history": [...], "active_trial": <deneme>}
+
+    * trials anahtarı olmayan eski düz projeler "Ana Reçete" denemesine sarılır
+    * elek serisi büyükten küçüğe sıralıdır (passing / ri birlikte çevrilir)
+    * ri ve passing malzeme adıyla anahtarlanır (indeks "0".."3" değil)
+    * QC kayıtlarında dayanım yalnızca d28'dedir (eski measured_mpa kaldırılır)
+
+Dönüşüm idempotenttir; değişen projeler boşluksuz (kompakt) JSON olarak
+yeniden yazılır. Yükleme yolu bu şemayı varsayar ve dönüştürme yapmaz.
+"""
+import argparse
+import os
+import sys
+
+from logic.constants import MATERIALS
+
+DEFAULT_TRIAL = "Ana Reçete"
+
+
+def _ters_sirali(trial):
+    elek = trial.get("elek")
+    return isinstance(elek, list) and len(elek) > 1 and elek[0] < elek[-1]
+
+def _elek_sirasini_ters_cevir(trial):
+    # elek, passing ve ri birlikte çevrilir: 0.063->40 sırası 40->0.063 olur
+    trial["elek"] = trial["elek"][::-1]
+    for key in ("passing", "ri"):
+        if isinstance(trial.get(key), dict):
+            trial[key] = {m: v[::-1] if isinstance(v, list) else v for m, v in trial[key].items()}
+
+def _malzeme_anahtarli(values):
+    """Liste ya da "0".."3" indeksli sözlüğü malzeme adıyla anahtarlar; değişmediyse None."""
+    if isinstance(values, list):
+        return {MATERIALS[i]: v for i, v in enumerate(values[:len(MATERIALS)])}
+    if not isinstance(values, dict): return None
+    index_keys = [k for k in values if str(k).isdigit() and int(k) < len(MATERIALS)]
+    if not index_keys: return None
+    fixed = {k: v for k, v in values.items() if k not in index_keys}
+    for k in index_keys:
+        # İkisi birden varsa malzeme adlı (daha yeni) kayıt kazanır
+        fixed.setdefault(MATERIALS[int(k)], values[k])
+    return fixed
+
+def normalize_trial(trial):
+    """Deneme sözlüğünü yerinde kanonikleştirir; yapılan değişikliklerin listesini döner."""
+    changes = []
+    for key in ("ri", "passing"):
+        fixed = _malzeme_anahtarli(trial.get(key))
+        if fixed is not None:
+            trial[key] = fixed
+            changes.append(f"{key}: indeks -> malzeme adı")
+    if _ters_sirali(trial):
+        _elek_sirasini_ters_cevir(trial)
+        changes.append("elek sırası çevrildi")
+    return changes
+
+def normalize_qc_record(record):
+    """measured_mpa'yı d28'e taşır; değiştiyse True."""
+    if not isinstance(record, dict) or "measured_mpa" not in record: return False
+    measured = record.pop("measured_mpa")
+    if not record.get("d28"):
+        record["d28"] = measured
+    return True
+
+def normalize_project(p_data):
+    """
+    Projeyi kanonik şemaya getirir. (yeni_veri, değişiklikler) döner;
+    değişiklik yoksa aynı nesne döner. Girdi değiştirilmez.
+    """
+    if not isinstance(p_data, dict):
+        return p_data, []
+    project = {k: v for k, v in p_data.items()}
+    changes = []
+
+    if "trials" not in project:
+        trial = dict(project)
+        qc_history = trial.pop("qc_history", [])
+        project = {"trials": {DEFAULT_TRIAL: trial}, "qc_history": qc_history, "active_trial": DEFAULT_TRIAL}
+        changes.append(f"düz proje '{DEFAULT_TRIAL}' denemesine sarıldı")
+    else:
+        project["trials"] = dict(project["trials"] or {})
+        project.setdefault("qc_history", [])
+    if project.get("active_trial") not in project["trials"]:
+        project["active_trial"] = next(iter(project["trials"]), DEFAULT_TRIAL)
+        changes.append("active_trial düzeltildi")
+
+    for name, trial in list(project["trials"].items()):
+        if not isinstance(trial, dict): continue
+        trial = dict(trial)
+        trial_changes = normalize_trial(trial)
+        if trial_changes:
+            project["trials"][name] = trial
+            changes.extend(f"{name}: {c}" for c in trial_changes)
+
+    qc_history = [dict(r) if isinstance(r, dict) else r for r in project["qc_history"]]
+    moved = sum(normalize_qc_record(r) for r in qc_history)
+    if moved:
+        project["qc_history"] = qc_history
+        changes.append(f"{moved} QC kaydı: measured_mpa -> d28")
+
+    return (project, changes) if changes else (p_data, [])
+
+
+def migrate_plant(store, plant_id, dry_run=False, compact=True):
+    """
+    Santralin tüm projelerini kanonikleştirir ve {proje: [değişiklikler]}
+    raporunu döner. Değişen projeler yeniden yazılır; compact=True ise dosya
+    tabanlı motorlarda değişmeyen projeler de boşluksuz olarak yeniden yazılır.
+    """
+    report = {}
+    rewrite_all = compact and store.name != "sqlite"
+    for name, p_data in store.load_projects(plant_id, readonly=True).items():
+        fixed, changes = normalize_project(p_data)
+        if changes: report[name] = changes
+        if not dry_run and (changes or rewrite_all):
+            store.save_project(plant_id, name, fixed)
+    return report
+
+
+def main(argv=None):
+    from logic.storage import STORAGE_BACKEND, create_storage
+
+    parser = argparse.ArgumentParser(prog="python -m logic.migrate",
+                                     description="Proje dosyalarını kanonik şemaya getirir.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--backend", default=STORAGE_BACKEND)
+    parser.add_argument("--plant", action="append", help="Yalnızca bu santral(lar)")
+    parser.add_argument("--dry-run", action="store_true", help="Değişiklikleri yazmadan raporla")
+    parser.add_argument("--no-compact", action="store_true", help="Değişmeyen dosyaları yeniden yazma")
+    args = parser.parse_args(argv)
+
+    store = create_storage(args.backend, args.data_dir)
+    plants = args.plant or store.known_plants()
+    total = 0
+    for plant_id in plants:
+        if store.name == "sharded" and not args.dry_run:
+            # Eski tek dosyalı santraller yalnızca burada, açıkça bölünür
+            store.split_plant(plant_id)
+        source = store
+        if args.dry_run and store.name == "sharded" and not os.path.exists(store.manifest_path(plant_id)):
+            # Henüz bölünmemiş santral: dry-run bölme yapmasın, eski dosyadan okunsun
+            source = create_storage("json", args.data_dir)
+        report = migrate_plant(source, plant_id, dry_run=args.dry_run, compact=not args.no_compact)
+        total += len(report)
+        print(f"[{plant_id}] {len(report)} proje değişti")
+        for name, changes in report.items():
+            print(f"  - {name}")
+            for c in changes:
+                print(f"      {c}")
+    suffix = " (dry-run, yazılmadı)" if args.dry_run else ""
+    print(f"Toplam {total} proje kanonik şemaya getirildi{suffix}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
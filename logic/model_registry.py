@@ -0,0 +1,123 @@
+"""
+Sürümlü AI dayanım modeli kayıt defteri (data/models/).
+
+    index.json                 : {"current": sürüm, "pinned": bool, "versions": [özet, ...]}
+    model_<özet>_<adet>.json   : katsayılar, sabit, R², örnek sayısı, katsayı
+                                 kovaryansı (tahmin aralığı), özellik şeması
+                                 ve eğitim verisinin parmak izi
+
+Model dosyaları parmak iziyle adlandırılır (aynı havuz -> aynı dosya);
+sürüm numarası yalnızca indekste verilir. Güncel model iki küçük JSON
+okumasıdır ve file_cache'ten gelir. ensure() yalnızca havuzun parmak izi
+değiştiğinde yeniden eğitir; eski sürümler geri alma ve karşılaştırma için
+saklanır (en çok MAX_VERSIONS). rollback() bir sürümü sabitler: sabit
+kaldıkça yeni veri otomatik eğitimi tetiklemez, unpin() ile en güncel
+veriye dönülür.
+"""
+import os
+from datetime import datetime
+
+from logic.ai_model import FEATURES
+from logic.atomic_io import atomic_write_json, update_json
+from logic.file_cache import file_cache
+
+MAX_VERSIONS = 50
+
+_EMPTY_INDEX = {"current": None, "pinned": False, "versions": []}
+
+
+class ModelRegistry:
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+
+    def _file_name(self, fingerprint):
+        return f"model_{fingerprint['hash'][:16]}_{fingerprint['count']}.json"
+
+    # --- OKUMA ---
+    def index(self):
+        return file_cache.read_json(self.index_path, _EMPTY_INDEX)
+
+    def versions(self):
+        """Sürüm özetleri (eskiden yeniye): version, file, created, r2, n, fingerprint."""
+        return self.index()["versions"]
+
+    def load(self, version=None):
+        """Verilen (varsayılan: güncel) sürümün modeli; yoksa None."""
+        idx = self.index()
+        version = idx["current"] if version is None else version
+        meta = next((v for v in idx["versions"] if v["version"] == version), None)
+        if meta is None:
+            return None
+        model = file_cache.read_json(os.path.join(self.root, meta["file"]), None)
+        if model is None:
+            return None
+        model["version"] = version
+        model["pinned"] = bool(idx.get("pinned")) and version == idx["current"]
+        return model
+
+    # --- YAZMA ---
+    def register(self, stats, fingerprint):
+        """stats (RegressionStats) ile eğitir, yeni sürüm olarak kaydeder ve güncel yapar."""
+        fitted = stats.fit()
+        if fitted is None:
+            return None
+        r2 = fitted["r2"]
+        file_name = self._file_name(fingerprint)
+        os.makedirs(self.root, exist_ok=True)
+        atomic_write_json(os.path.join(self.root, file_name), {
+            **fitted, "features": list(FEATURES),
+            "fingerprint": {"hash": fingerprint["hash"], "count": int(fingerprint["count"])},
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        })
+        dropped = []
+
+        def mutate(idx):
+            dropped.clear()
+            versions = idx["versions"]
+            current = next((v for v in versions if v["version"] == idx["current"]), None)
+            if current is not None and current["file"] == file_name:
+                return None  # başka bir oturum aynı veriyle az önce kaydetti
+            same = next((v for v in versions if v["file"] == file_name), None)
+            if same is not None:
+                return {"current": same["version"], "pinned": False, "versions": versions}
+            version = max((v["version"] for v in versions), default=0) + 1
+            versions.append({"version": version, "file": file_name, "created": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                             "r2": float(r2), "n": stats.n, "count": int(fingerprint["count"])})
+            while len(versions) > MAX_VERSIONS:
+                dropped.append(versions.pop(0))
+            return {"current": version, "pinned": False, "versions": versions}
+
+        update_json(self.index_path, mutate, _EMPTY_INDEX)
+        kept = {v["file"] for v in self.versions()}
+        for meta in dropped:
+            if meta["file"] not in kept:
+                try:
+                    os.remove(os.path.join(self.root, meta["file"]))
+                except OSError:
+                    pass
+        return self.load()
+
+    def ensure(self, stats, fingerprint):
+        """
+        Güncel model; parmak izi (hash, count) değiştiyse önce yeniden eğitilir.
+        Sabitlenmiş (rollback) sürüm varken eğitim yapılmaz.
+        """
+        model = self.load()
+        # Kovaryanssız (eski biçim) güncel model aynı dosyaya yeniden yazılır
+        if model is not None and (model["pinned"] or (model["fingerprint"] == fingerprint and "cov" in model)):
+            return model
+        return self.register(stats, fingerprint) or model
+
+    def rollback(self, version):
+        """Sürümü güncel yapar ve sabitler. Sürüm yoksa False."""
+        def mutate(idx):
+            if not any(v["version"] == version for v in idx["versions"]):
+                return None
+            return {**idx, "current": version, "pinned": True}
+        return update_json(self.index_path, mutate, _EMPTY_INDEX) is not None
+
+    def unpin(self):
+        """Sabitlemeyi kaldırır; sonraki ensure() en güncel veriyle eğitir."""
+        update_json(self.index_path, lambda idx: {**idx, "pinned": False} if idx.get("pinned") else None, _EMPTY_INDEX)
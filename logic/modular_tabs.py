@@ -5,27 +5,34 @@ import numpy as np
 import plotly.graph_objects as go
 from logic.report_generator import generate_kgm_raporu
 from logic.data_manager import (
-    veriyi_yukle, veriyi_kaydet, havuz_yukle, havuz_kaydet, 
+    veriyi_kaydet, load_project, havuz_yukle, havuz_kaydet, havuz_ekle, havuz_sutunlari, qc_kaydi_ekle,
+    havuz_istatistikleri, havuz_modeli, proje_model_istatistikleri, santral_dayanim_gelisimi,
     tesis_faktor_yukle, tesis_faktor_kaydet, santralleri_yukle, santral_kaydet, santral_sil,
     shared_insight_yukle, shared_insight_kaydet, shared_insight_sil
 )
 from logic.ocak_manager import ocaklari_yukle, ocak_kaydet, ocak_sil
+from logic.constants import MATERIALS
 from logic.engineering import (
     calculate_passing, calculate_theoretical_mpa, evaluate_mix_compliance, 
     classify_plant, get_std_limits, optimize_mix, update_site_factor,
-    evolve_site_factor
+    evolve_site_factor, blend_passing, proportion_mixes_cached, UNIT_COSTS
 )
+from logic.cost_optimizer import optimize_cost
+from logic.design_sweep import sweep
+from logic.gradation_analytics import retained_percent, snapshot_gradation
+from logic.memo import clear_all, memo_stats
 from logic.intelligence import generate_smart_alerts, explain_ai_logic
 from logic.corporate_logic import get_corp_performance_stats, calculate_cement_efficiency_stats, generate_risk_heatmap_data
-from logic.ai_model import train_prediction_model, predict_strength_ai, generate_suggestions
+from logic.strength_gain import DEFAULT_CEMENT, cement_types, forecast_d28
+from logic.ai_model import train_prediction_model, predict_batch, generate_suggestions
+from logic.qc_import import import_qc_file
 
 def render_tab_1(elek_serisi):
     st.subheader("1. Fraksiyonel Deney Verileri (Tartım Esaslı)")
-    materials = ["No:2 (15-25)", "No:1 (5-15)", "K.Kum (0-5)", "D.Kum (0-7)"]
     current_rhos, current_was, current_las, current_mbs, current_moists, computed_passing, active_mats, all_ri_values = [], [], [], [], [], {"Elek (mm)": elek_serisi}, [], {}
     
     col_f = st.columns(4)
-    for i, (col, mat) in enumerate(zip(col_f, materials)):
+    for i, (col, mat) in enumerate(zip(col_f, MATERIALS)):
         with col:
             act_k = f"act_{i}"
             is_active = st.checkbox(f"Dahil Et: {mat}", key=act_k)
@@ -47,7 +54,7 @@ def render_tab_1(elek_serisi):
             ri_data = {"Elek": elek_serisi, "Kalan (g)": [0.0]*len(elek_serisi)}
             if 'loaded_ri' in st.session_state:
                  # Hem isim hem de index bazlı kontrol (Geriye dönük uyumluluk için)
-                 saved_ri = st.session_state['loaded_ri'].get(mat) or st.session_state['loaded_ri'].get(i)
+                 saved_ri = st.session_state['loaded_ri'].get(mat)
                  if saved_ri and len(saved_ri) == len(elek_serisi): 
                      ri_data["Kalan (g)"] = saved_ri
             
@@ -67,7 +74,7 @@ def render_tab_1(elek_serisi):
     st.session_state['active_mats'] = active_mats
     
     # Sadece aktif olan malzemeleri tabloda göster
-    disp_cols = ["Elek (mm)"] + [m for i, m in enumerate(materials) if active_mats[i]]
+    disp_cols = ["Elek (mm)"] + [m for i, m in enumerate(MATERIALS) if active_mats[i]]
     df_disp = pd.DataFrame(computed_passing)[disp_cols]
     
     # --- ŞARTNAME (REFERANS) EKLE ---
@@ -108,18 +115,20 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
         computed_opt = st.session_state.get('computed_passing', {})
         
         # 1. Gradasyon Optimizasyonu (Agrega Oranları)
-        best_p = optimize_mix(curve_opt, dmax_opt, active_mats, computed_opt, elek_serisi, materials)
+        active_indices = [i for i, x in enumerate(active_mats) if x]
+        current_p = [float(st.session_state.get(f"p{idx+1}", 0) or 0) for idx in active_indices]
+        best_p = optimize_mix(curve_opt, dmax_opt, active_mats, computed_opt, elek_serisi, materials,
+                              warm_start=current_p if sum(current_p) > 0 else None)
         if best_p is not None:
-            active_indices = [i for i, x in enumerate(active_mats) if x]
             for k, idx in enumerate(active_indices):
-                st.session_state[f"p{idx+1}"] = int(best_p[k])
+                st.session_state[f"p{idx+1}"] = int(round(best_p[k]))
             
             # 2. AI Tabanlı Çimento ve Su Optimizasyonu (Global Hafıza Kullanımı)
-            pool_data = havuz_yukle()
-            if len(pool_data) >= 5:
+            pool_cols = havuz_sutunlari()
+            if pool_cols.n >= 5:
                 # Başarılı projelerin ortalama W/C oranını bul
                 from logic.engineering import best_wc_estimate
-                ai_wc = best_wc_estimate(pool_data, hedef_sinif)
+                ai_wc = best_wc_estimate(pool_cols, hedef_sinif)
                 if ai_wc:
                     # En son kullanılan su miktarını referans al veya standart 180L'den başla
                     ref_water = st.session_state.get('su_val', 180)
@@ -137,6 +146,15 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
             st.error("Optimizasyon başarısız oldu. Lütfen aktif malzemeleri kontrol edin.")
             st.session_state.pop('trigger_optimize')
 
+    # --- MALİYET OPTİMUMUNU UYGULA (widget'lar oluşmadan önce) ---
+    cost_mix = st.session_state.pop('pending_cost_mix', None)
+    if cost_mix:
+        for idx, p_val in enumerate(cost_mix["p"]):
+            st.session_state[f"p{idx+1}"] = int(round(p_val))
+        st.session_state['cimento_val'] = int(round(cost_mix["cement"]))
+        st.session_state['su_val'] = int(round(cost_mix["water"]))
+        st.session_state['ucucu_kul'] = round(cost_mix["ash"], 1)
+
     # Karışım Ayarları (Dinamik Seçiciler)
     c_hdr1, c_hdr2 = st.columns(2)
     with c_hdr1:
@@ -153,15 +171,14 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
     with c_sld4: p4 = st.slider(f"{materials[3]}", 0, 100, key="p4")
     
     computed_passing = st.session_state.get('computed_passing', {})
-    karisim_gecen = np.zeros(len(elek_serisi))
+    passing_matrix = np.zeros((4, len(elek_serisi)))
     individual_passing = {}
     
-    for i, p in enumerate([p1, p2, p3, p4]):
-        mat_name = materials[i]
+    for i, mat_name in enumerate(materials):
         if active_mats[i] and mat_name in computed_passing:
-            mat_pass = np.array(computed_passing[mat_name])
-            karisim_gecen += (mat_pass * p / 100.0)
-            individual_passing[mat_name] = mat_pass
+            passing_matrix[i] = computed_passing[mat_name]
+            individual_passing[mat_name] = passing_matrix[i]
+    karisim_gecen = blend_passing([p1, p2, p3, p4], passing_matrix)[0]
 
     st.markdown("---")
     c_wc_sets, c_grad_plot = st.columns([1, 1])
@@ -190,15 +207,14 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
                 st.caption(f"ℹ️ Litoloji Aderans Etkisi: x{lith_factor:.2f} ({litoloji})")
             st.write(f"Saha Faktörü: x{current_site_factor:.3f} | {tesis_adi}")
             
-            # Global AI Brain (Automatic check)
-            pool_data = havuz_yukle()
-            if len(pool_data) >= 5:
-                g_coeffs, g_intercept, g_r2 = train_prediction_model(pool_data)
-                if g_coeffs is not None:
-                    katki_kg_val = (cimento * katki / 100)
-                    g_inputs = np.array([float(cimento), float(su_hedef), float(ucucu_kul), float(hava_yuzde), float(katki_kg_val)])
-                    g_pred = predict_strength_ai(g_coeffs, g_intercept, g_inputs)
-                    st.success(f"🌐 **Global AI Tahmini:** {g_pred:.1f} MPa")
+            # Global AI Brain (Automatic check) - kayıt defterindeki güncel model
+            g_model = havuz_modeli()
+            if g_model is not None:
+                katki_kg_val = (cimento * katki / 100)
+                g_inputs = np.array([float(cimento), float(su_hedef), float(ucucu_kul), float(hava_yuzde), float(katki_kg_val)])
+                g_pred, g_half = predict_batch(g_model, g_inputs)
+                g_pi = f" ± {g_half[0]:.1f}" if np.isfinite(g_half[0]) else ""
+                st.success(f"🌐 **Global AI Tahmini:** {g_pred[0]:.1f}{g_pi} MPa (%95)")
         else: wc_ratio_eff, predicted_mpa = 0.6, 0.0
 
     with c_grad_plot:
@@ -263,12 +279,7 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
             st.dataframe(pd.DataFrame([full_grad_data]), hide_index=True, use_container_width=True)
         else:
             # PERCENT RETAINED (8-18)
-            retained = []
-            prev_p = 100.0
-            for p in karisim_gecen:
-                val = max(0, prev_p - p)
-                retained.append(val)
-                prev_p = p
+            retained = retained_percent(karisim_gecen)[0].tolist()
             
             x_labels = [f"{s}" for s in elek_serisi]
             fig_ret = go.Figure()
@@ -290,12 +301,93 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
             st.plotly_chart(fig_ret, use_container_width=True)
             st.caption("ℹ️ Betonun işlenebilirliği ve kohezyonu için her elekte %8 ile %18 arasında malzeme kalması ideal kabul edilir.")
 
+    # --- TASARIM UZAYI TARAMASI (Çimento x Su what-if yüzeyi) ---
+    if st.checkbox("🗺️ Tasarım Uzayı Taraması (Çimento x Su)", key="sweep_toggle"):
+        c_sw1, c_sw2 = st.columns(2)
+        with c_sw1:
+            sw_cem = st.slider("Çimento aralığı (kg/m³)", 200, 550, (250, 450), step=10, key="sweep_cem")
+        with c_sw2:
+            sw_su = st.slider("Su aralığı (L/m³)", 120, 230, (140, 200), step=5, key="sweep_su")
+        sw_metric = st.radio("Yüzey", ["Tahmini Dayanım (MPa)", "Maliyet (TL/m³)", "AI Tahmini (MPa)", "AI Tahmin Aralığı (± MPa)"],
+                             horizontal=True, key="sweep_metric")
+        g_model = havuz_modeli()
+        sweep_base = {
+            "p": (p1, p2, p3, p4), "admixture_pct": katki, "rhos": current_rhos, "was": current_was,
+            "moists": current_moists, "las": current_las, "mbs": current_mbs, "active": active_mats,
+            "target_class": hedef_sinif, "lithology": litoloji, "site_factor": current_site_factor,
+            "exposure_class": st.session_state.get('exposure_class', 'XC3'),
+            "asr_status": st.session_state.get('asr_status', 'Düzeltme Gerekmiyor'),
+            "ai_model": g_model,
+        }
+        sw = sweep(sweep_base, bounds={"cement": sw_cem, "water": sw_su, "ash": ucucu_kul, "air": hava_yuzde},
+                   steps=61)
+        z_col = {"Tahmini Dayanım (MPa)": "pred_mpa", "Maliyet (TL/m³)": "cost", "AI Tahmini (MPa)": "ai_mpa",
+                 "AI Tahmin Aralığı (± MPa)": "ai_pi"}[sw_metric]
+        surface = sw.pivot(index="water", columns="cement", values=z_col)
+        status = sw.pivot(index="water", columns="cement", values="status")
+        fig_sw = go.Figure()
+        fig_sw.add_trace(go.Contour(x=surface.columns, y=surface.index, z=surface.values, colorscale="Viridis",
+                                    contours=dict(showlabels=True), colorbar=dict(title=sw_metric)))
+        # Uygun bölge sınırı (RED olmayan reçeteler)
+        fig_sw.add_trace(go.Contour(x=status.columns, y=status.index, z=(status.values < 2).astype(int),
+                                    contours=dict(start=0.5, end=0.5, coloring="none"), line=dict(color="white", width=3, dash="dash"),
+                                    showscale=False, name="Uygunluk sınırı"))
+        fig_sw.add_trace(go.Scatter(x=[cimento], y=[su_hedef], mode="markers", marker=dict(symbol="x", size=14, color="red"),
+                                    name="Mevcut Dizayn"))
+        fig_sw.update_layout(xaxis_title="Çimento (kg/m³)", yaxis_title="Su (L/m³)", height=450,
+                             margin=dict(l=40, r=20, t=30, b=40), showlegend=False)
+        st.plotly_chart(fig_sw, use_container_width=True)
+        ok = sw[sw["status"] < 2]
+        if len(ok):
+            best = ok.loc[ok["cost"].idxmin()]
+            st.caption(f"Kesikli çizgi içi: uygunluk RED değil. En düşük maliyetli uygun nokta: "
+                       f"Çimento {best['cement']:.0f} kg, Su {best['water']:.0f} L -> "
+                       f"{best['pred_mpa']:.1f} MPa, {best['cost']:.0f} TL/m³")
+        else:
+            st.caption("Taranan aralıkta uygun (RED olmayan) reçete yok.")
+
+    # --- EN DÜŞÜK MALİYETLİ REÇETE (LP) ---
+    with st.expander("💰 En Düşük Maliyetli Reçete (TS EN 206 / KTŞ Kısıtlı)"):
+        c_pr1, c_pr2, c_pr3 = st.columns(3)
+        with c_pr1:
+            pr_cem = st.number_input(f"{selected_cem} (TL/kg)", value=UNIT_COSTS["cement"], step=0.05, key="price_cement")
+            pr_ash = st.number_input("Uçucu Kül (TL/kg)", value=UNIT_COSTS["ash"], step=0.05, key="price_ash")
+            pr_adm = st.number_input("Katkı (TL/kg)", value=UNIT_COSTS["admixture"], step=0.5, key="price_adm")
+        with c_pr2:
+            pr_aggs = [st.number_input(f"{mat} (TL/kg)", value=UNIT_COSTS["aggregates"][i], step=0.01, format="%.3f",
+                                       key=f"price_agg_{i}") for i, mat in enumerate(materials)]
+        with c_pr3:
+            ash_max = st.number_input("Maks. Uçucu Kül (kg/m³)", value=0.0, step=10.0, key="cost_ash_max")
+            su_min = st.number_input("Min. Su İhtiyacı (L/m³)", value=float(su_hedef), step=5.0, key="cost_water_min")
+            margin = st.number_input("Dayanım Payı (MPa)", value=0.0, step=0.5, key="cost_margin")
+        if st.button("💰 En Ucuz Uygun Reçeteyi Bul", use_container_width=True):
+            st.session_state['cost_opt_result'] = optimize_cost(
+                hedef_sinif, st.session_state.get('exposure_class', 'XC3'), passing_matrix, elek_serisi, dmax=dmax_val,
+                rhos=current_rhos, unit_costs={"ash": pr_ash, "admixture": pr_adm, "aggregates": pr_aggs},
+                cement_prices={selected_cem: pr_cem}, air=hava_yuzde, admixture_pct=katki,
+                water_range=(su_min, max(su_min, 230.0)), ash_range=(0.0, ash_max), site_factor=current_site_factor,
+                lithology=litoloji, strength_margin=margin, active=active_mats,
+            )
+        cost_res = st.session_state.get('cost_opt_result')
+        if cost_res and cost_res["status"] == "optimal":
+            lim = cost_res["limits"]
+            st.success(f"**{cost_res['cost']:.0f} TL/m³** | Çimento {cost_res['cement']:.0f} kg, Su {cost_res['water']:.0f} L, "
+                       f"Kül {cost_res['ash']:.0f} kg | S/Ç {cost_res['wc']:.3f} (sınır {lim['wc']:.3f}) | "
+                       f"Tahmin {cost_res['pred_mpa']:.1f} MPa")
+            st.dataframe(pd.DataFrame({"Malzeme": materials, "Oran (%)": [round(v, 1) for v in cost_res["p"]],
+                                       "SSD (kg/m³)": [round(v, 1) for v in cost_res["m_kg"]]}),
+                         hide_index=True, use_container_width=True)
+            if st.button("✅ Bu Reçeteyi Uygula", key="apply_cost_mix"):
+                st.session_state['pending_cost_mix'] = cost_res
+                st.rerun()
+        elif cost_res:
+            st.error(cost_res["message"])
+
     # --- HESAPLA VE KİLİTLE BUTONU VE SONUÇLAR ---
     st.divider()
     if st.button("🧮 Dizaynı Hesapla ve Kilitle", type="primary", use_container_width=True):
         # --- AI ÖĞRENME MOTORU (Dizayn Anında Öğrenme) ---
         try:
-            pool_data = havuz_yukle()
             # Mevcut dizayn verilerini AI havuzuna ekle
             ai_entry = {
                 "cement": float(cimento),
@@ -316,26 +408,22 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
                 "timestamp": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M"),
                 "source": f"Design-Learn-{proje}"
             }
-            pool_data.append(ai_entry)
-            havuz_kaydet(pool_data)
+            havuz_ekle(ai_entry)
             st.toast("🤖 AI Motoru bu dizayndan yeni bilgiler öğrendi!", icon="🧠")
         except Exception as e:
             st.error(f"AI Öğrenme Hatası: {e}")
 
         active_p = st.session_state.get('active_plant', 'merkez')
-        all_qc_data = veriyi_yukle(plant_id=active_p)
-        proj_history = all_qc_data.get(proje, {}).get("qc_history", [])
+        proj_history = (load_project(active_p, proje, readonly=True) or {}).get("qc_history", [])
         
         # --- GLOBAL AI FALLBACK ---
         # Eğer bu projenin yerel verisi azsa (<5), global havuzdan destek al
-        training_data = proj_history
+        # (yeterli istatistikler toplanabilir: yeniden eğitim yok, yalnızca birleştirme)
+        training_stats = proje_model_istatistikleri(proje, active_p, proj_history)
         if len(proj_history) < 5:
-            pool_data = havuz_yukle()
-            if pool_data:
-                # Hem yerel (varsa) hem global veriyi birleştir
-                training_data = proj_history + pool_data
+            training_stats = training_stats.merge(havuz_istatistikleri())
         
-        model_coeffs, intercept, r2_score = train_prediction_model(training_data)
+        model_coeffs, intercept, r2_score = train_prediction_model(training_stats)
         
         # Karar ve Analiz
         current_inputs = np.array([cimento, su_hedef, ucucu_kul, hava_yuzde, (cimento*katki/100)])
@@ -352,9 +440,13 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
                 grade_dev_total += diff
                 if diff > 3.0: grade_violation = True
 
-        total_ratio = 100
-        w_la = (current_las[0]*p1 + current_las[1]*p2 + current_las[2]*p3 + current_las[3]*p4) / total_ratio
-        w_mb = (current_mbs[0]*p1 + current_mbs[1]*p2 + current_mbs[2]*p3 + current_mbs[3]*p4) / total_ratio
+        # Hacim, reçete, su dengesi ve gradasyon göstergeleri (saf dozaj çekirdeği)
+        mix = proportion_mixes_cached(
+            [p1, p2, p3, p4], cimento, su_hedef, ucucu_kul, hava_yuzde, katki,
+            rhos=current_rhos, was=current_was, moists=current_moists, las=current_las, mbs=current_mbs,
+            active=active_mats, passing=passing_matrix, sieves=elek_serisi
+        )[0]
+        w_la, w_mb = float(mix["w_la"]), float(mix["w_mb"])
         
         comp_data = {
             "class": hedef_sinif, "wc": wc_ratio_eff, "pred_mpa": predicted_mpa,
@@ -368,41 +460,9 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
         decision = evaluate_mix_compliance(comp_data)
         st.session_state['last_decision'] = decision
 
-        # Hacim ve Reçete
-        vol_cem = cimento / 3.15
-        vol_water = su_hedef / 1.0
-        vol_ash = ucucu_kul / 2.25
-        vol_air = hava_yuzde * 10
-        vol_chem = (cimento * katki / 100) / 1.12
-        V_agg_tot = 1000 - (vol_cem + vol_water + vol_ash + vol_air + vol_chem)
-        m_kgs = [V_agg_tot * (p/100) * r for p, r in zip([p1,p2,p3,p4], current_rhos)]
-
-        # Su Telafisi Hesaplama
-        total_agg_kg = sum(m_kgs)
-        weighted_wa = (current_was[0]*p1 + current_was[1]*p2 + current_was[2]*p3 + current_was[3]*p4) / total_ratio
-        wa_liters = (weighted_wa / 100) * total_agg_kg
-        
-        # 0.063mm (Filler) ve 4mm (Kum) Oranlarını Dinamik Bul
-        idx_filler = elek_serisi.index(0.063) if 0.063 in elek_serisi else (12 if len(karisim_gecen) > 12 else -1)
-        idx_sand = elek_serisi.index(4.0) if 4.0 in elek_serisi else (6 if len(karisim_gecen) > 6 else -1)
-        
-        filler_val = karisim_gecen[idx_filler] if idx_filler != -1 else 0.0
-        sand_val = karisim_gecen[idx_sand] if idx_sand != -1 else 0.0
-
-        # Bireysel Kalan Yüzde (%8-18 Kuralı)
-        retained = []
-        prev_p = 100.0
-        for p in karisim_gecen:
-            retained.append(max(0, prev_p - p))
-            prev_p = p
-
-        # Shilstone Hesaplamaları (CF & WF)
-        idx_8 = elek_serisi.index(8.0) if 8.0 in elek_serisi else 4
-        idx_2 = elek_serisi.index(2.0) if 2.0 in elek_serisi else 7
-        ret_above_8 = 100 - (karisim_gecen[idx_8] if len(karisim_gecen) > idx_8 else 0)
-        ret_above_2 = 100 - (karisim_gecen[idx_2] if len(karisim_gecen) > idx_2 else 0)
-        cf = (ret_above_8 / ret_above_2 * 100) if ret_above_2 > 0 else 0
-        wf = (karisim_gecen[idx_2] + ((cimento - 335) / 55) * 2.5) if len(karisim_gecen) > idx_2 else 0
+        m_kgs = mix["m_kg"].tolist()
+        wa_liters, weighted_wa = float(mix["wa_liters"]), float(mix["weighted_wa"])
+        filler_val, sand_val = float(mix["filler"]), float(mix["sand"])
 
         # Analitik Durum Etiketleri
         wc_status = "Riskli" if not (0.40 <= wc_ratio_eff <= 0.50) else "İdeal"
@@ -422,18 +482,13 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
             },
             "moisture_info": {
                 "moists": current_moists,
-                "total_water_from_moist": sum([m_kgs[i] * (current_moists[i]/100.0) for i in range(4) if active_mats[i]])
+                "total_water_from_moist": float(mix["moist_water"])
             },
             "ai_analysis": {
                 "wa_liters": wa_liters,
                 "weighted_wa": weighted_wa,
-                "filler_val": filler_val,
-                "sand_val": sand_val,
                 "w_la": w_la,
                 "w_mb": w_mb,
-                "cf": cf,
-                "wf": wf,
-                "retained": retained,
                 "wc_status": wc_status,
                 "filler_status": "Yüksek" if filler_val > 5.0 else ("Düşük" if filler_val < 1.0 else "Uygun"),
                 "sand_status": "Dengesiz" if not (37 <= sand_val <= 56) else "Stabil"
@@ -446,21 +501,18 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
             "passing": karisim_gecen.tolist(), 
             "timestamp": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
         }
+        snapshot_gradation(st.session_state['mix_snapshot'])
 
         # --- AI MÜHENDİSLİK VE LİTOLOJİK DEĞERLENDİRME (Görsel Panel) ---
         st.markdown("### 🧠 AI Mühendislik ve Litolojik Değerlendirme")
         
-        # Su Telafisi & Rutubet Hesaplama (Excel OCB-8 Mantığı)
-        total_agg_kg = sum(m_kgs)
-        
+        # Su Telafisi & Rutubet (Excel OCB-8 Mantığı)
         # Agregalardan gelen su farkı: (Su Emme - Rutubet)
         # (+) Değer: Su çekilir (Kantar suyu artar), (-) Değer: Serbest su verilir (Kantar suyu azalır)
-        su_farklar = [m_kgs[i] * (current_was[i] - current_moists[i]) / 100.0 for i in range(4) if active_mats[i]]
-        total_su_fark = sum(su_farklar)
-        eklenecek_su = su_hedef + total_su_fark
-        
+        total_su_fark = float(mix["water_correction"])
+        eklenecek_su = float(mix["batch_water"])
         # Agrega Kantar Ağırlıkları: Agrega_SSD * (1 + (Rutubet - Su Emme) / 100)
-        m_kantar = [m_kgs[i] * (1 + (current_moists[i] - current_was[i]) / 100.0) if active_mats[i] else 0.0 for i in range(4)]
+        m_kantar = mix["m_batch"].tolist()
 
         # Görsel Panel Gösterimi
         c_water1, c_water2 = st.columns(2)
@@ -562,10 +614,6 @@ def render_tab_2(proje, tesis_adi, hedef_sinif, litoloji, elek_serisi, materials
             st.markdown("### 📋 1m³ Reçete")
             katki_kg = round(cimento * katki / 100, 2)
             hava_katki_kg = round(cimento * hava_katki_yuzde / 100, 3)
-            # Reçete hesaplamaları (Tekrar hesapla)
-            su_farklar = [m_kgs[i] * (current_was[i] - current_moists[i]) / 100.0 for i in range(4) if active_mats[i]]
-            eklenecek_su = su_hedef + sum(su_farklar)
-            m_kantar = [m_kgs[i] * (1 + (current_moists[i] - current_was[i]) / 100.0) if active_mats[i] else 0.0 for i in range(4)]
 
             rec_tab = {
                 "Bileşen": ["Çimento", "Net Su (Dizayn)", "Eklenecek Su (Üretim)", "Uçucu Kül", "Kimyasal Katkı", "Hava Sürükleyici", "Hava (Hacim)"], 
@@ -629,13 +677,16 @@ def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
     with c_ana1:
         st.metric("Su/Çimento Oranı", f"{wc_val:.2f}", delta="-İdeal" if 0.40 <= wc_val <= 0.50 else "Riskli", delta_color="normal")
     
+    # Gradasyon göstergeleri (görüntü başına bir kez hesaplanır; rapor ve AI istemi de aynısını kullanır)
+    grad = snapshot_gradation(snap)
+
     # Filler Oranı
-    filler_val = snap.get('passing', [])[12] if len(snap.get('passing', [])) > 12 else 0
+    filler_val = grad['filler']
     with c_ana2:
         st.metric("Filler Oranı (<0.063)", f"%{filler_val:.2f}", delta="Uygun" if filler_val <= 3.0 else "Yüksek", delta_color="inverse")
         
     # Agrega Matrisi (Kum Oranı)
-    sand_val = snap.get('passing', [])[6] if len(snap.get('passing', [])) > 6 else 0
+    sand_val = grad['sand']
     with c_ana3:
         st.metric("Kum Oranı (<4mm)", f"%{sand_val:.1f}", delta="Stabil" if 33 <= sand_val <= 42 else "Dengesiz")
 
@@ -643,15 +694,8 @@ def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
     st.markdown("#### 📊 İleri Analitik Görselleştirme")
     g_col1, g_col2 = st.columns(2)
     
-    passing = snap.get('passing', [])
     sieves = snap.get('sieves', [])
-    
-    # 1. Percent Retained Hesaplama
-    retained = []
-    prev_p = 100.0
-    for p in passing:
-        retained.append(max(0, prev_p - p))
-        prev_p = p
+    retained = grad['retained']
     
     with g_col1:
         # 1. Percent Retained Grafiği (TSE Uyarlaması - Bar Chart)
@@ -685,17 +729,7 @@ def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
 
     with g_col2:
         # 2. Shilstone İşlenebilirlik Grafiği (Visual Update)
-        idx_8 = sieves.index(8.0) if 8.0 in sieves else 4
-        idx_2 = sieves.index(2.0) if 2.0 in sieves else 7
-        
-        ret_above_8 = 100 - passing[idx_8]
-        ret_above_2 = 100 - passing[idx_2]
-        cf = (ret_above_8 / ret_above_2 * 100) if ret_above_2 > 0 else 0
-        
-        cement = snap.get('recipe', {}).get('çimento', 350)
-        wf_base = passing[idx_2]
-        wf_adj = ((cement - 335) / 55) * 2.5
-        wf = wf_base + wf_adj
+        cf, wf = grad['cf'], grad['wf']
         
         fig_shil = go.Figure()
         
@@ -796,7 +830,7 @@ def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
         ANALİZ YAPISI (BU SIRAYLA OLACAK):
         1. TEKNİK ÖZET: Dizaynın genel başarısı ve hedeflenen dayanım sınıfı ({s_mix['class']}) ile uyumu.
         2. SU/ÇİMENTO VE DAYANIKLILIK (DURABİLİTE) ANALİZİ: W/C oranının ({s_mix['wc']}) TS EN 206 kısıtları ve betonun servis ömrü (korozyon, karbonatlaşma) açısından değerlendirilmesi.
-        3. GRADASYON VE KOMPAKTLIK: 4mm altı kum oranı (%{sand_val:.1f}) ve 0.063mm filler miktarının (%{filler_val:.2f}) taze beton işlenebilirliği ve boşluk yapısı üzerindeki etkisi.
+        3. GRADASYON VE KOMPAKTLIK: 4mm altı kum oranı (%{sand_val:.1f}) ve 0.063mm filler miktarının (%{filler_val:.2f}) taze beton işlenebilirliği ve boşluk yapısı üzerindeki etkisi; Shilstone irilik (CF {cf:.0f}) ve işlenebilirlik (WF {wf:.0f}) faktörleri.
         4. MALZEME RİSKLERİ: Litolojik köken ({s_mix['lithology']}) ile LA Aşınma (%{s_mix['avg_la']:.1f}) ve MB Kirlilik ({s_mix['avg_mb']:.2f}) değerlerinin mekanik performans üzerindeki korelasyonu.
         5. NİHAİ MÜHENDİSLİK GÖRÜŞÜ: Karışımın spesifik kullanım alanı (Beton yol/Yapısal beton) için onay durumu ve optimizasyon önerileri.
 
@@ -823,8 +857,7 @@ def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
 def render_tab_4(proje, tesis_adi, TARGET_LIMITS, hedef_sinif, get_global_qc_history, is_admin=False):
     # Verileri Yükle
     active_p = st.session_state.get('active_plant', 'merkez')
-    all_data_json = veriyi_yukle(plant_id=active_p)
-    proj_data = all_data_json.get(proje, {})
+    proj_data = load_project(active_p, proje) or {}
     qc_history = proj_data.get("qc_history", [])
     current_site_factor = tesis_faktor_yukle(tesis_adi, plant_id=active_p)
     
@@ -941,7 +974,7 @@ def render_tab_4(proje, tesis_adi, TARGET_LIMITS, hedef_sinif, get_global_qc_his
                 qc_p4 = st.number_input("D.Kum %", value=st.session_state.get('qc_p4', 25), key="qc_p4")
                 
             st.markdown("#### 🏁 Taze Beton ve Kırım Verileri")
-            c_qc1, c_qc2, c_qc3, c_qc4 = st.columns(4)
+            c_qc1, c_qc2, c_qc3, c_qc4, c_qc5 = st.columns(5)
             with c_qc1:
                 qc_slump = st.number_input("Slump (cm)", value=18.0, step=0.5, key="qc_slump")
             with c_qc2:
@@ -950,6 +983,8 @@ def render_tab_4(proje, tesis_adi, TARGET_LIMITS, hedef_sinif, get_global_qc_his
                 qc_d7 = st.number_input("7 Günlük (MPa)", value=0.0, step=0.1, key="qc_d7")
             with c_qc4:
                 qc_d28 = st.number_input("28 Günlük (MPa)", value=0.0, step=0.1, key="qc_d28")
+            with c_qc5:
+                qc_d56 = st.number_input("56 Günlük (Opsiyonel)", value=0.0, step=0.1, key="qc_d56")
                 
             st.markdown("<br>", unsafe_allow_html=True)
             submit_control = st.form_submit_button("💾 Tam Sistemi Kaydet")
@@ -970,31 +1005,54 @@ def render_tab_4(proje, tesis_adi, TARGET_LIMITS, hedef_sinif, get_global_qc_his
                     "slump": qc_slump,
                     "d7": qc_d7,
                     "d28": qc_d28,
-                    "measured_mpa": qc_d28,
+                    "d56": qc_d56 if qc_d56 > 0 else None,
+                    "cement_type": st.session_state.get('cem_type', DEFAULT_CEMENT),
                     "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
                 }
-                qc_history.append(new_record)
-                proj_data["qc_history"] = qc_history
-                all_data_json[proje] = proj_data
-                veriyi_kaydet(proje, proj_data, plant_id=active_p)
+                qc_kaydi_ekle(proje, new_record, plant_id=active_p)
                 
                 # AI Learning (Automatic)
                 if qc_d28 > 0:
                     try:
-                        pool_data = havuz_yukle()
-                        pool_data.append({
+                        havuz_ekle({
                             "cement": qc_cem, "water": qc_wat, "ash": qc_ash,
                             "air": qc_air, "admixture": qc_chem, "d28": qc_d28,
                             "p": [qc_p1, qc_p2, qc_p3, qc_p4],
                             "lithology": proj_data.get("lithology", "Bazalt"),
                             "source": f"Control-Tab-{proje}"
                         })
-                        havuz_kaydet(pool_data)
                     except: pass
                 
                 st.success("✅ Kayıt başarıyla sisteme işlendi.")
                 st.rerun()
 
+    # --- 1b. TOPLU AKTARIM (LAB ÇIKTISI) ---
+    with st.expander("📥 Toplu Sonuç Aktarımı (CSV / Excel)"):
+        st.caption("Laboratuvar çıktısındaki kırım sonuçları (proje, no, tarih) anahtarıyla tekilleştirilerek "
+                   "projelere tek seferde eklenir. Proje kolonu yoksa bu proje kullanılır.")
+        up_file = st.file_uploader("Dosya Seç", type=["csv", "xlsx"], key="qc_bulk_file")
+        c_b1, c_b2 = st.columns(2)
+        create_new = c_b1.checkbox("Bilinmeyen projeleri oluştur", value=False, key="qc_bulk_create")
+        dry_run = c_b2.checkbox("Yalnızca doğrula (kaydetme)", value=False, key="qc_bulk_dry")
+        if up_file is not None and st.button("🚀 Aktarımı Başlat", key="qc_bulk_run"):
+            bar = st.progress(0.0, text="Okunuyor...")
+            def _progress(done, total):
+                frac = min(done / total, 1.0) if total else 0.0
+                bar.progress(frac, text=f"{done} satır işlendi")
+            try:
+                report = import_qc_file(up_file, active_p, default_project=proje, create_projects=create_new,
+                                        dry_run=dry_run, progress=_progress)
+            except ValueError as e:
+                bar.empty()
+                st.error(f"Aktarım başarısız: {e}")
+            else:
+                bar.progress(1.0, text="Tamamlandı")
+                st.success(f"{report['rows']} satır okundu: {report['imported']} yeni kayıt, "
+                           f"{report['duplicates']} tekrar, {len(report['errors'])} hatalı satır, "
+                           f"{report['pool']} havuz kaydı." + (" (Doğrulama modu, kaydedilmedi)" if dry_run else ""))
+                if report["errors"]:
+                    st.dataframe(pd.DataFrame(report["errors"], columns=["Satır", "Hata"]), use_container_width=True)
+
     # --- 2. KAYITLI VERİLER VE YÖNETİM ---
     if qc_history:
         st.subheader("📊 Kayıtlı Numuneler")
@@ -1031,15 +1089,13 @@ def render_tab_4(proje, tesis_adi, TARGET_LIMITS, hedef_sinif, get_global_qc_his
         if is_admin:
             if st.button("🧠 Bu Kaydı Global AI Hafızasına Gönder", use_container_width=True):
                 selected_row = [r for r in qc_history if r["id"] == selected_id][0]
-                pool_data = havuz_yukle()
                 new_entry = {
                     "cement": selected_row.get("cement"), "water": selected_row.get("water"),
                     "ash": selected_row.get("ash", 0), "air": selected_row.get("air", 1.5),
                     "admixture": selected_row.get("admixture", 0), "d28": selected_row.get("d28"),
                     "timestamp": pd.Timestamp.now().strftime("%Y-%m-%d")
                 }
-                pool_data.append(new_entry)
-                havuz_kaydet(pool_data)
+                havuz_ekle(new_entry)
                 st.success(f"🚀 Kayıt #{selected_id} Global Eğitim Havuzuna başarıyla eklendi!")
         else:
             st.info("💡 Kayıtları Global Hafızaya (Eğitim Havuzu) sadece Yöneticiler ekleyebilir.")
@@ -1084,17 +1140,37 @@ def render_tab_4(proje, tesis_adi, TARGET_LIMITS, hedef_sinif, get_global_qc_his
                 st.error(f"🚨 {len(low_results)} adet kırım sonucu hedef limitin altında!")
             else:
                 st.success("✅ Tüm kırım sonuçları hedef limitlerin üzerindedir.")
+
+        # --- ERKEN UYARI: 7 GÜNLÜKTEN 28 GÜN TAHMİNİ ---
+        pending = [r for r in qc_history if (r.get("d7") or 0) > 0 and not (r.get("d28") or 0) > 0]
+        if pending:
+            st.markdown("#### ⏱️ Erken Yaş Tahmini (7 → 28 Gün)")
+            gain_params = santral_dayanim_gelisimi(active_p)
+            targets = [r.get("target_mpa") or target_mpa for r in pending]
+            fc = forecast_d28(gain_params, [r["d7"] for r in pending], cement_types(pending), targets)
+            df_fc = pd.DataFrame({
+                "Numune": [r.get("no", r.get("id")) for r in pending], "Tarih": [r.get("date") for r in pending],
+                "d7 (MPa)": [r["d7"] for r in pending], "d28 Tahmini (MPa)": fc["d28"].round(1),
+                "%95 Aralık": [f"{lo:.1f} – {hi:.1f}" for lo, hi in zip(fc["lower"], fc["upper"])],
+                "Hedef (MPa)": targets, "Risk (%)": (fc["fail_prob"] * 100).round(0),
+            })
+            if fc["flag"].any():
+                st.error(f"🚨 {int(fc['flag'].sum())} numune 7 günlük sonuca göre 28 günde hedefin altında kalabilir!")
+            st.dataframe(df_fc, use_container_width=True, hide_index=True)
+            st.caption(" | ".join(f"{t}: s = {p['s']:.3f} ({p['n']} çift, önsel {p['s_prior']:.2f})"
+                                  for t, p in gain_params.items()) or "Santralde eşleşen d7/d28 çifti yok; çimento sınıfı önselleri kullanılıyor.")
     else:
         st.warning("Henüz şantiye QC verisi girilmemiş.")
 
-def render_tab_5(is_admin=False):
-    st.header("🧠 Yapay Zeka Eğitim Hafızası (Global Pool)")
-    st.info("Bu sekme, yapay zekayı eğitmek için projelerden bağımsız tecrübeleri yüklemeyi sağlar.")
+def _render_pool_panel():
+    """Global havuz özeti: kolon görünümü (havuz_sutunlari) + kayıt defterindeki model (havuz_modeli)."""
+    st.markdown("#### 🧠 Yapay Zeka Eğitim Hafızası (Global Pool)")
+    st.info("Bu bölüm, yapay zekayı eğitmek için projelerden bağımsız tecrübeleri yüklemeyi sağlar.")
     
-    pool_data = havuz_yukle()
+    pool_cols = havuz_sutunlari()
     
     # Veri Giriş Formu
-    with st.expander("➕ Yeni Tecrübe Kaydı Ekle", expanded=len(pool_data) == 0):
+    with st.expander("➕ Yeni Tecrübe Kaydı Ekle", expanded=pool_cols.n == 0):
         c1, c2, c3 = st.columns(3)
         with c1:
             g_cem = st.number_input("Çimento (kg)", value=350, key="g_cem")
@@ -1112,27 +1188,26 @@ def render_tab_5(is_admin=False):
                 "air": g_air, "admixture": g_chem, "d28": g_d28,
                 "timestamp": pd.Timestamp.now().strftime("%Y-%m-%d")
             }
-            pool_data.append(new_entry)
-            havuz_kaydet(pool_data)
+            havuz_ekle(new_entry)
             st.success("Veri global havuza eklendi.")
             st.rerun()
 
-    if pool_data:
-        st.subheader(f"📊 Mevcut Eğitim Havuzu ({len(pool_data)} Kayıt)")
-        df_pool = pd.DataFrame(pool_data)
+    if pool_cols.n:
+        st.subheader(f"📊 Mevcut Eğitim Havuzu ({pool_cols.n} Kayıt)")
         
-        # BEYİN SAĞLIĞI (İstatistikler)
+        # BEYİN SAĞLIĞI (İstatistikler) - kolon görünümünden
         col_st1, col_st2, col_st3 = st.columns(3)
         with col_st1:
-            avg_d28 = df_pool["d28"].mean()
+            avg_d28 = np.nanmean(pool_cols["d28"])
             st.metric("Ortalama Dayanım", f"{avg_d28:.1f} MPa")
         with col_st2:
-            from logic.ai_model import train_prediction_model
-            _, _, r2 = train_prediction_model(pool_data)
+            g_model = havuz_modeli()
+            r2 = g_model["r2"] if g_model else 0.0
             st.metric("AI Tahmin Hassasiyeti (R²)", f"%{r2*100:.1f}")
         with col_st3:
-            st.metric("Toplam Tecrübe", len(pool_data))
+            st.metric("Toplam Tecrübe", pool_cols.n)
 
+        df_pool = pd.DataFrame(havuz_yukle(readonly=True))
         st.dataframe(df_pool, use_container_width=True)
         
         st.markdown("---")
@@ -1490,6 +1565,20 @@ def render_tab_management(is_super_admin=False):
         else:
             st.info("Sistemde silinebilecek başka kullanıcı bulunmuyor.")
 
+    # 4. Hesap Önbellekleri (süreç geneli, tüm oturumlar paylaşır)
+    with st.expander("🧮 Hesap Önbellekleri"):
+        stats = memo_stats()
+        if stats:
+            df_memo = pd.DataFrame.from_dict(stats, orient="index")
+            df_memo["hit_rate"] = (df_memo["hit_rate"] * 100).round(1)
+            st.dataframe(df_memo.rename(columns={
+                "hits": "İsabet", "misses": "Iskalama", "entries": "Kayıt", "max_entries": "Kapasite",
+                "hit_rate": "İsabet Oranı (%)"}), use_container_width=True)
+        if st.button("🗑️ Önbellekleri Temizle", key="clear_memo_cache"):
+            clear_all()
+            st.success("✅ Hesap önbellekleri temizlendi.")
+            st.rerun()
+
 def render_tab_5(is_admin=False):
     # --- INDUSTRIAL SWISS CSS ---
     st.markdown("""
@@ -1538,6 +1627,10 @@ def render_tab_5(is_admin=False):
         st.warning("⚠️ Bu panel sadece yönetici yetkisine sahip kullanıcılar içindir.")
         return
 
+    # --- 0. GLOBAL HAVUZ (tesis verisinden bağımsız, her zaman gösterilir) ---
+    _render_pool_panel()
+    st.markdown("---")
+
     # --- FİLTRELEME ---
     c_filt1, c_filt2 = st.columns([1, 1])
     with c_filt1:
@@ -1,26 +1,25 @@
-import json
 import os
 
+from logic.atomic_io import update_json
+from logic.file_cache import file_cache
+
 DATA_DIR = "data"
 OCAK_FILE = os.path.join(DATA_DIR, "ocaklar.json")
 
 def ocaklari_yukle():
-    if os.path.exists(OCAK_FILE):
-        with open(OCAK_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    return file_cache.read_json(OCAK_FILE, {})
 
 def ocak_kaydet(ocak_id, ocak_data):
-    ocaklar = ocaklari_yukle()
-    ocaklar[ocak_id] = ocak_data
-    with open(OCAK_FILE, "w", encoding="utf-8") as f:
-        json.dump(ocaklar, f, ensure_ascii=False, indent=4)
+    def mutate(ocaklar):
+        ocaklar[ocak_id] = ocak_data
+        return ocaklar
+    update_json(OCAK_FILE, mutate, {})
 
 def ocak_sil(ocak_id):
-    ocaklar = ocaklari_yukle()
-    if ocak_id in ocaklar:
+    def mutate(ocaklar):
+        if ocak_id not in ocaklar: return None
         del ocaklar[ocak_id]
-        with open(OCAK_FILE, "w", encoding="utf-8") as f:
-            json.dump(ocaklar, f, ensure_ascii=False, indent=4)
+        return ocaklar
+    if update_json(OCAK_FILE, mutate, {}) is not None:
         return True, "Ocak silindi."
     return False, "Ocak bulunamadı."
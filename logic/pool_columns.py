@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Sayısal kolonlar: eksik / sayı olmayan değerler NaN olur
+NUMERIC_COLUMNS = ("cement", "water", "ash", "air", "admixture", "d28")
+# Agrega oranları (kayıttaki "p" listesinden, %): eksikse NaN
+RATIO_COLUMNS = ("p1", "p2", "p3", "p4")
+# Metin kolonları: eksik değer ""
+TEXT_COLUMNS = ("lithology", "class")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _record_ratios(record):
+    p = record.get("p")
+    if not isinstance(p, (list, tuple)): p = ()
+    return [_to_float(p[i]) if i < len(p) else np.nan for i in range(len(RATIO_COLUMNS))]
+
+def _record_class(record):
+    return record.get("target_class") or record.get("class") or ""
+
+def _record_date(record):
+    # "2025-09-02" veya "2025-09-02 14:30" -> gün hassasiyeti
+    raw = str(record.get("date") or record.get("timestamp") or "")[:10]
+    try:
+        return np.datetime64(raw, "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+class PoolColumns:
+    """
+    AI havuzunun kolon bazlı (columnar) görünümü.
+
+    Her alan tek bir NumPy dizisidir: cement/water/ash/air/admixture/d28 ve
+    agrega oranları p1..p4 (float64, eksikse NaN), lithology/class (str) ve
+    date (datetime64[D]). Eski .npz dosyalarında eksik kolon varsa load
+    (None, None) döner ve görünüm baştan kurulur.
+    Eğitim ve istatistikler kayıt kayıt float() çağırmak yerine dizilerle çalışır.
+    """
+
+    def __init__(self, columns=None):
+        if columns is None:
+            columns = PoolColumns.from_records([]).columns
+        self.columns = columns
+
+    @property
+    def n(self):
+        return len(self.columns["d28"])
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        cols = {}
+        for name in NUMERIC_COLUMNS:
+            cols[name] = np.array([_to_float(r.get(name)) for r in records], dtype=np.float64)
+        ratios = np.array([_record_ratios(r) for r in records], dtype=np.float64).reshape(-1, len(RATIO_COLUMNS))
+        for j, name in enumerate(RATIO_COLUMNS):
+            cols[name] = ratios[:, j]
+        cols["lithology"] = np.array([str(r.get("lithology") or "") for r in records], dtype=str)
+        cols["class"] = np.array([str(_record_class(r)) for r in records], dtype=str)
+        cols["date"] = np.array([_record_date(r) for r in records], dtype="datetime64[D]")
+        return cls(cols)
+
+    def concat(self, other):
+        """İki görünümü uç uca ekler (yeni nesne döner)."""
+        if other.n == 0: return self
+        if self.n == 0: return other
+        return PoolColumns({k: np.concatenate([self.columns[k], other.columns[k]]) for k in self.columns})
+
+    def extend(self, records):
+        return self.concat(PoolColumns.from_records(records))
+
+    def filled(self, name, value=0.0):
+        """Sayısal kolonu NaN'ları value ile doldurarak döner."""
+        col = self.columns[name]
+        return np.where(np.isnan(col), value, col)
+
+    # --- DİSK ---
+    def save(self, path, cursor=None):
+        """Kolonları .npz olarak atomik yazar; cursor kaynağın o anki konumudur."""
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                        dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, _cursor=np.array(json.dumps(cursor)), **self.columns)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """(PoolColumns, cursor) döner; dosya yoksa veya okunamazsa (None, None)."""
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                cols = {name: z[name] for name in NUMERIC_COLUMNS + RATIO_COLUMNS + TEXT_COLUMNS + ("date",)}
+                cursor = json.loads(str(z["_cursor"]))
+        except (OSError, KeyError, ValueError):
+            return None, None
+        return cls(cols), cursor
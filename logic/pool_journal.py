@@ -0,0 +1,252 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+
+from logic.atomic_io import file_lock, file_version
+from logic.file_cache import file_cache
+
+_SKIP = re.compile(r"[\s,]*")
+
+def iter_json_array(path, chunk_size=65536):
+    """
+    JSON dizi dosyasını (örn. ai_training_pool.json) tüm listeyi belleğe almadan
+    eleman eleman okur. Girinti / satır düzeni fark etmez.
+    """
+    if not os.path.exists(path):
+        return
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof, started = "", 0, False, False
+        while True:
+            pos = _SKIP.match(buf, pos).end()
+            if pos >= len(buf):
+                if eof: return
+                chunk = f.read(chunk_size)
+                if chunk: buf, pos = buf[pos:] + chunk, 0
+                else: eof = True
+                continue
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError(f"{path} bir JSON dizisi değil.")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                obj, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof: raise
+                # Nesne parçanın sonunda yarım kaldı; bir sonraki parçayı bekle
+                chunk = f.read(chunk_size)
+                if chunk: buf, pos = buf[pos:] + chunk, 0
+                else: eof = True
+                continue
+            yield obj
+
+def iter_jsonl(path):
+    """Satır başına bir kayıt içeren günlük dosyasını okur; yarım kalmış son satırı atlar."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # yazımı henüz bitmemiş satır
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def _load_array(path):
+    return list(iter_json_array(path))
+
+def _load_lines(path):
+    return list(iter_jsonl(path))
+
+
+class PoolJournal:
+    """
+    AI eğitim havuzu için ekleme-günlüklü (append-only) depolama.
+
+    - ai_training_pool.json   : son sıkıştırmadaki anlık görüntü (JSON dizi)
+    - ai_training_pool.jsonl  : sonradan eklenen kayıtlar (satır başına bir JSON)
+
+    Eklemeler günlüğün sonuna tek satır olarak yazılır, fsync toplu yapılır.
+    Sıkıştırma günlüğü anlık görüntüye katlar.
+    """
+
+    def __init__(self, snapshot_path, fsync_every=16, fsync_interval=2.0, compact_bytes=1024 * 1024):
+        self.snapshot_path = snapshot_path
+        base, _ = os.path.splitext(snapshot_path)
+        self.journal_path = base + ".jsonl"
+        self.compacting_path = base + ".jsonl.compacting"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._compactor = None
+        atexit.register(self.flush)
+
+    # --- OKUMA ---
+    def iter_records(self):
+        """Anlık görüntü + günlük kuyruğunu akış halinde döner."""
+        yield from iter_json_array(self.snapshot_path)
+        yield from iter_jsonl(self.compacting_path)
+        yield from iter_jsonl(self.journal_path)
+
+    def load(self, copy=True):
+        """Tüm havuzu liste olarak döner; dosya parçaları file_cache'ten gelir."""
+        records = []
+        for path, loader in ((self.snapshot_path, _load_array),
+                             (self.compacting_path, _load_lines),
+                             (self.journal_path, _load_lines)):
+            records.extend(file_cache.load(path, loader, [], copy=copy))
+        return records
+
+    # --- ARTIMLI OKUMA (kolon anlık görüntüsü için) ---
+    def _base_versions(self):
+        # JSON'a yazılıp geri okunabilsin diye liste olarak
+        return [list(v) if v else None for v in (file_version(self.snapshot_path), file_version(self.compacting_path))]
+
+    def _read_journal_from(self, offset):
+        """Günlüğü offset'ten okur; yalnızca tamamlanmış satırları ve yeni offset'i döner."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(offset)
+                raw = f.read()
+        except FileNotFoundError:
+            return [], offset
+        cut = raw.rfind(b"\n") + 1
+        records = [json.loads(line) for line in raw[:cut].decode("utf-8").splitlines() if line.strip()]
+        return records, offset + cut
+
+    def read_with_cursor(self):
+        """Tüm havuzu ve read_since için konum bilgisini (cursor) döner."""
+        base = self._base_versions()
+        records = list(iter_json_array(self.snapshot_path)) + list(iter_jsonl(self.compacting_path))
+        tail, offset = self._read_journal_from(0)
+        return records + tail, {"base": base, "journal": offset}
+
+    def read_since(self, cursor):
+        """
+        cursor'dan sonra günlüğe eklenen kayıtları (kayıtlar, yeni cursor) olarak
+        döner. Anlık görüntü sıkıştırma/sıfırlama ile değiştiyse None döner;
+        çağıran tam okumaya (read_with_cursor) düşmelidir.
+        """
+        if not cursor or cursor.get("base") != self._base_versions():
+            return None
+        if self.journal_size() < cursor["journal"]:
+            return None
+        tail, offset = self._read_journal_from(cursor["journal"])
+        return tail, {"base": cursor["base"], "journal": offset}
+
+    def _invalidate(self):
+        for p in (self.snapshot_path, self.compacting_path, self.journal_path):
+            file_cache.invalidate(p)
+
+    # --- YAZMA ---
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        if not records: return
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        # Dosya kilidi sıkıştırmayla aynı (klasör başına): başka bir süreçte açılmış
+        # tanıtıcı, günlük .compacting'e taşınıp silinirken araya yazamaz
+        with self._lock:
+            with file_lock(self.snapshot_path):
+                self._write_journal(payload)
+            file_cache.invalidate(self.journal_path)
+            self._pending += len(records)
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+        if self.journal_size() >= self.compact_bytes:
+            self.compact_in_background()
+
+    def _write_journal(self, payload):
+        # Tek write() çağrısı: O_APPEND ile eşzamanlı oturumlar birbirinin satırını ezmez
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(payload)
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        if os.path.exists(self.journal_path):
+            fd = os.open(self.journal_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass  # Windows'ta salt-okunur tanıtıcı fsync desteklemeyebilir
+            finally:
+                os.close(fd)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def replace_all(self, records):
+        """Havuzu verilen listeyle değiştirir (örn. havuzu sıfırlama)."""
+        with self._lock, file_lock(self.snapshot_path):
+            self._write_snapshot(records)
+            for p in (self.journal_path, self.compacting_path):
+                if os.path.exists(p): os.remove(p)
+            self._pending = 0
+            self._invalidate()
+
+    # --- SIKIŞTIRMA ---
+    def journal_size(self):
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    def compact(self):
+        """Günlüğü anlık görüntüye katlar. Katlanan kayıt sayısını döner."""
+        # Dosya kilidi: başka bir süreç aynı anda sıkıştırırsa kayıtlar iki kez katlanmaz
+        with self._lock, file_lock(self.snapshot_path):
+            if not os.path.exists(self.compacting_path):
+                if self.journal_size() == 0:
+                    return 0
+                # Yeni eklemeler bundan sonra boş bir günlüğe gider
+                os.replace(self.journal_path, self.compacting_path)
+            with open(self.compacting_path, "rb") as f:
+                raw = f.read()
+            cut = raw.rfind(b"\n") + 1  # yalnızca tamamlanmış satırlar katlanır
+            tail = [json.loads(line) for line in raw[:cut].decode("utf-8").splitlines() if line.strip()]
+            records = list(iter_json_array(self.snapshot_path)) + tail
+            self._write_snapshot(records)
+
+            # Eklemeler aynı dosya kilidini aldığından buraya normalde bayt gelmez; kilidi
+            # almayan eski bir yazar araya girdiyse o baytları yeni günlüğe geri taşı
+            with open(self.compacting_path, "rb") as f:
+                f.seek(cut)
+                leftover = f.read()
+            if leftover:
+                with open(self.journal_path, "ab") as f:
+                    f.write(leftover)
+            os.remove(self.compacting_path)
+            self._invalidate()
+            return len(tail)
+
+    def compact_in_background(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="pool-compactor", daemon=True)
+        self._compactor.start()
+
+    def _write_snapshot(self, records):
+        # Satır başına bir kayıt: geçerli JSON dizisi, iter_json_array ile hızlı akış
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("[\n")
+            for i, r in enumerate(records):
+                f.write(("," if i else "") + json.dumps(r, ensure_ascii=False) + "\n")
+            f.write("]\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
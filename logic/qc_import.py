@@ -0,0 +1,341 @@
+"""
+Laboratuvar çıktılarından (CSV / XLSX) toplu QC kırım sonucu aktarımı.
+
+    python -m logic.qc_import sonuclar.xlsx --plant merkez [--project "BETON YOL"] [--dry-run]
+
+Dosya parça parça (chunk) okunur; başlıklar bilinen eş adlarla (veya verilen
+eşlemeyle) alanlara eşlenir, satırlar doğrulanır ve (proje, no, tarih)
+anahtarıyla hem mevcut kayıtlara hem dosyanın kendisine karşı tekilleştirilir.
+Geçerli kayıtlar santral başına tek toplu yazmayla projelere eklenir; d28'i
+olan kayıtlar aynı çağrıda AI havuzuna da beslenir.
+"""
+import argparse
+import datetime
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Alan -> bilinen başlık eş adları (karşılaştırma _norm_header ile yapılır)
+FIELD_ALIASES = {
+    "project": ("project", "proje", "proje adı", "proje adi"),
+    "no": ("no", "numune", "numune no", "numune kodu", "sample", "sample no"),
+    "date": ("date", "tarih", "döküm tarihi", "dokum tarihi", "casting date"),
+    "target_mpa": ("target_mpa", "target", "hedef", "hedef mpa", "hedef dayanım", "fck"),
+    "cement": ("cement", "çimento", "cimento"),
+    "water": ("water", "su"),
+    "ash": ("ash", "kül", "uçucu kül", "ucucu kul", "fly ash"),
+    "admixture": ("admixture", "katkı", "katki", "kimyasal katkı"),
+    "air": ("air", "hava"),
+    "slump": ("slump", "çökme", "cokme"),
+    "d7": ("d7", "7 gün", "7 günlük", "7 gunluk"),
+    "d28": ("d28", "28 gün", "28 günlük", "28 gunluk", "measured_mpa"),
+    "d56": ("d56", "56 gün", "56 günlük", "56 gunluk"),
+    "cement_type": ("cement_type", "çimento tipi", "cimento tipi", "çimento cinsi"),
+    "lithology": ("lithology", "litoloji", "agrega"),
+}
+NUMERIC_FIELDS = ("target_mpa", "cement", "water", "ash", "admixture", "air", "slump", "d7", "d28", "d56")
+MAX_MPA = 150.0
+MAX_ERRORS = 1000  # raporda tutulan en fazla hata satırı
+
+
+def _norm_header(h):
+    # "28 Günlük (MPa)" -> "28 günlük"; birimler ve fazla boşluk atılır
+    h = re.sub(r"\(.*?\)|\[.*?\]", " ", str(h)).replace("_", " ")
+    return " ".join(h.casefold().split())
+
+_ALIAS_INDEX = {_norm_header(a): field for field, aliases in FIELD_ALIASES.items() for a in aliases}
+
+
+def map_columns(headers, mapping=None):
+    """
+    Dosya başlıklarını alan adlarına eşler: {başlık: alan}. mapping
+    ({başlık: alan}) eş adlardan önce gelir; tanınmayan başlıklar atlanır.
+    """
+    mapping = mapping or {}
+    result = {}
+    for h in headers:
+        field = mapping.get(h) or _ALIAS_INDEX.get(_norm_header(h))
+        if field in FIELD_ALIASES and field not in result.values():
+            result[h] = field
+    return result
+
+
+# --- OKUMA ---
+def _source_name(source):
+    return source if isinstance(source, str) else getattr(source, "name", "")
+
+def _is_excel(source):
+    return _source_name(source).lower().endswith((".xlsx", ".xlsm"))
+
+def _csv_options(source):
+    # Türkçe Excel çıktıları genelde ';' ayraçlı ve ',' ondalıklıdır: ilk satıra bakılır
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8-sig", errors="replace") as f:
+            first = f.readline()
+    else:
+        pos = source.tell()
+        first = source.readline()
+        source.seek(pos)
+        if isinstance(first, bytes): first = first.decode("utf-8", errors="replace")
+    return {"sep": ";" if first.count(";") > first.count(",") else ","}
+
+def count_rows(source):
+    """İlerleme çubuğu için veri satırı sayısı (başlık hariç); bilinmiyorsa None."""
+    if _is_excel(source):
+        return None
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            n = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+    else:
+        pos = source.tell()
+        data = source.read()
+        source.seek(pos)
+        n = (data.encode() if isinstance(data, str) else data).count(b"\n")
+    return max(n - 1, 0)
+
+def iter_chunks(source, chunk_size=5000):
+    """Dosyayı chunk_size satırlık DataFrame parçaları halinde okur (tüm değerler ham)."""
+    if _is_excel(source):
+        from openpyxl import load_workbook
+        wb = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = wb.worksheets[0].iter_rows(values_only=True)
+            headers = [str(h) if h is not None else "" for h in next(rows, ())]
+            buf = []
+            for row in rows:
+                if row is None or all(v is None for v in row): continue
+                buf.append(row[:len(headers)])
+                if len(buf) >= chunk_size:
+                    yield pd.DataFrame(buf, columns=headers, dtype=object)
+                    buf = []
+            if buf:
+                yield pd.DataFrame(buf, columns=headers, dtype=object)
+        finally:
+            wb.close()
+        return
+    yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, encoding="utf-8-sig",
+                           skip_blank_lines=True, **_csv_options(source))
+
+
+# --- DOĞRULAMA ---
+def _to_number(col):
+    # "38,5" ve 38.5 aynı sayı olur; sayı olmayanlar NaN
+    return pd.to_numeric(col.astype(str).str.strip().str.replace(",", ".", regex=False), errors="coerce")
+
+def _to_date(col):
+    # Önce ISO (2025-09-02, Excel tarih hücreleri), kalanlar gün önce (02.09.2025)
+    text = col.astype(str).str.strip()
+    parsed = pd.to_datetime(text, errors="coerce", format="ISO8601")
+    rest = parsed.isna()
+    if rest.any():
+        parsed[rest] = pd.to_datetime(text[rest], errors="coerce", dayfirst=True, format="mixed")
+    return parsed.dt.strftime("%Y-%m-%d")
+
+def _to_text(col):
+    return col.astype(object).where(col.notna(), "").astype(str).str.strip()
+
+def sample_no(value):
+    """
+    Numune no karşılaştırma biçimi: tam sayı değerli sayılar (5, 5.0, "5.0";
+    Excel sayı hücreleri) "5" olur, 0 boş sayılmaz; diğerleri kırpılmış metin.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        return str(int(value)) if float(value).is_integer() else str(value)
+    text = str(value).strip()
+    return text.split(".", 1)[0] if re.fullmatch(r"-?\d+\.0+", text) else text
+
+def validate_chunk(df, columns, default_project=None, row_offset=0):
+    """
+    Ham parçayı alan adlı, tipli bir DataFrame'e çevirir. (geçerli_df, hatalar)
+    döner; hatalar [(satır_no, mesaj), ...] (satır_no dosyadaki 1 tabanlı veri
+    satırı). Geçerli satırların indeksi parça içindeki konumdur.
+    """
+    df = df.reset_index(drop=True)
+    out = pd.DataFrame(index=df.index)
+    for header, field in columns.items():
+        col = df[header]
+        if field in NUMERIC_FIELDS: out[field] = _to_number(col)
+        elif field == "date": out[field] = _to_date(col)
+        elif field == "no": out[field] = col.map(sample_no)
+        else: out[field] = _to_text(col)
+    if "project" not in out:
+        out["project"] = default_project or ""
+    elif default_project:
+        out["project"] = out["project"].where(out["project"] != "", default_project)
+    if "no" not in out: out["no"] = ""
+    for field in NUMERIC_FIELDS:
+        if field not in out: out[field] = np.nan
+
+    checks = [
+        (out["project"] == "", "proje adı boş"),
+        (out["date"].isna(), "tarih okunamadı"),
+        (out["d7"].isna() & out["d28"].isna(), "d7 / d28 sonucu yok"),
+        ((out[list(NUMERIC_FIELDS)] < 0).any(axis=1), "negatif değer"),
+        ((out[["d7", "d28", "d56"]] > MAX_MPA).any(axis=1), f"dayanım {MAX_MPA:.0f} MPa üstünde"),
+    ]
+    bad = np.zeros(len(out), dtype=bool)
+    errors = []
+    for mask, msg in checks:
+        mask = mask.to_numpy() & ~bad  # satır başına ilk hata raporlanır
+        errors.extend((row_offset + int(i) + 1, msg) for i in np.flatnonzero(mask))
+        bad |= mask
+    errors.sort()
+    return out[~bad], errors
+
+
+# --- KAYIT ÜRETİMİ ---
+def _clean(value):
+    if isinstance(value, float) and np.isnan(value): return None
+    return value
+
+def _qc_record(row, record_id, source, timestamp):
+    rec = {"id": record_id, "date": row["date"], "no": row["no"]}
+    for field in NUMERIC_FIELDS:
+        value = _clean(row[field])
+        if value is not None: rec[field] = value
+    if row.get("cement_type"): rec["cement_type"] = row["cement_type"]
+    rec["timestamp"] = timestamp
+    rec["source"] = source
+    return rec
+
+def _pool_record(rec, project, plant_id, lithology):
+    # Kontrol sekmesindeki tek kayıt akışıyla aynı alanlar
+    pool = {k: rec[k] for k in ("cement", "water", "ash", "air", "admixture", "d28") if k in rec}
+    pool.update({"date": rec["date"], "lithology": lithology, "plant_id": plant_id,
+                 "project": project, "source": f"Import-{project}"})
+    return pool
+
+
+def import_qc_file(source, plant_id="merkez", store=None, mapping=None, default_project=None,
+                   create_projects=False, feed_pool=True, dry_run=False, chunk_size=5000,
+                   progress=None):
+    """
+    CSV / XLSX dosyasındaki kırım sonuçlarını santralin projelerine aktarır.
+
+    progress(işlenen_satır, toplam_satır_veya_None) her parçadan sonra çağrılır.
+    Rapor sözlüğü döner: rows, imported, duplicates, errors ([(satır, mesaj)]),
+    projects ({proje: eklenen}), pool, columns ({başlık: alan}).
+    store verilmezse aktif motor kullanılır ve yazma data_manager.qc_toplu_ekle
+    üzerinden yapılır (proje model istatistikleri artımlı güncellenir).
+    """
+    if store is None:
+        from logic.data_manager import get_storage, qc_toplu_ekle
+        store = get_storage()
+        write = lambda p_id, recs, pool: qc_toplu_ekle(recs, p_id, pool)
+    else:
+        write = store.append_qc_batch
+    plant_id = plant_id or "merkez"
+    source_label = f"import:{os.path.basename(_source_name(source)) or 'upload'}"
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    # Yalnızca dosyada geçen projelerin gövdesi okunur (ilk görüldüğünde)
+    known = {p["name"] for p in store.list_projects(plant_id)}
+    projects, seen, next_id = {}, set(), {}
+
+    def open_project(name):
+        if name not in projects:
+            p_data = store.load_project(plant_id, name, readonly=True) if name in known else None
+            history = p_data.get("qc_history", []) if isinstance(p_data, dict) else []
+            seen.update((name, sample_no(r.get("no")), str(r.get("date") or "")[:10]) for r in history)
+            next_id[name] = len(history) + 1
+            projects[name] = p_data
+        return projects[name]
+
+    total = count_rows(source)
+    report = {"rows": 0, "imported": 0, "duplicates": 0, "errors": [], "projects": {}, "pool": 0, "columns": {}}
+    new_records, pool_records = {}, []
+    columns = None
+
+    for chunk in iter_chunks(source, chunk_size):
+        if columns is None:
+            columns = map_columns(chunk.columns, mapping)
+            report["columns"] = columns
+            fields = set(columns.values())
+            missing = [f for f in ("date",) if f not in fields]
+            if "project" not in fields and not default_project: missing.append("project")
+            if not fields & {"d7", "d28"}: missing.append("d28")
+            if missing:
+                raise ValueError(f"Zorunlu kolon(lar) bulunamadı: {', '.join(missing)}")
+
+        valid, errors = validate_chunk(chunk, columns, default_project, row_offset=report["rows"])
+        report["rows"] += len(chunk)
+        offset = report["rows"] - len(chunk)
+        for pos, row in zip(valid.index, valid.to_dict("records")):
+            project = row["project"]
+            if project not in known and not create_projects:
+                errors.append((offset + int(pos) + 1, f"bilinmeyen proje: {project}"))
+                continue
+            p_data = open_project(project)
+            key = (project, row["no"], row["date"])
+            if key in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+            record_id = next_id.get(project, 1)
+            next_id[project] = record_id + 1
+            rec = _qc_record(row, record_id, source_label, timestamp)
+            new_records.setdefault(project, []).append(rec)
+            if feed_pool and (rec.get("d28") or 0) > 0:
+                lithology = row.get("lithology") or (p_data or {}).get("lithology", "Bazalt")
+                pool_records.append(_pool_record(rec, project, plant_id, lithology))
+        if len(report["errors"]) < MAX_ERRORS:
+            report["errors"].extend(errors[:MAX_ERRORS - len(report["errors"])])
+        if progress: progress(report["rows"], total)
+
+    report["projects"] = {name: len(recs) for name, recs in new_records.items()}
+    report["imported"] = sum(report["projects"].values())
+    report["pool"] = len(pool_records)
+    if not dry_run and new_records:
+        write(plant_id, new_records, pool_records)
+    return report
+
+
+def main(argv=None):
+    from logic.data_manager import set_storage
+    from logic.storage import STORAGE_BACKEND, create_storage
+
+    parser = argparse.ArgumentParser(prog="python -m logic.qc_import",
+                                     description="CSV / XLSX kırım sonuçlarını projelere toplu aktarır.")
+    parser.add_argument("file")
+    parser.add_argument("--plant", default="merkez")
+    parser.add_argument("--project", help="Proje kolonu yoksa / boşsa kullanılacak proje")
+    parser.add_argument("--map", action="append", default=[], metavar="BAŞLIK=ALAN",
+                        help="Ek kolon eşlemesi, örn. --map \"Küp No=no\"")
+    parser.add_argument("--create-projects", action="store_true", help="Bilinmeyen projeleri oluştur")
+    parser.add_argument("--no-pool", action="store_true", help="AI havuzunu besleme")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--backend", default=STORAGE_BACKEND)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="Doğrula ve raporla, yazma")
+    args = parser.parse_args(argv)
+
+    mapping = dict(m.split("=", 1) for m in args.map)
+    # Motor data_manager'a verilir: aktarım model istatistiklerini de günceller
+    set_storage(create_storage(args.backend, args.data_dir))
+
+    def progress(done, total):
+        print(f"\r{done}/{total or '?'} satır", end="", file=sys.stderr, flush=True)
+
+    report = import_qc_file(args.file, args.plant, mapping=mapping,
+                            default_project=args.project, create_projects=args.create_projects,
+                            feed_pool=not args.no_pool, dry_run=args.dry_run,
+                            chunk_size=args.chunk_size, progress=progress)
+    print(file=sys.stderr)
+    print(f"Satır: {report['rows']} | Aktarılan: {report['imported']} | Tekrar: {report['duplicates']} | "
+          f"Hatalı: {len(report['errors'])} | Havuz: {report['pool']}")
+    for name, n in report["projects"].items():
+        print(f"  {name}: +{n}")
+    for row, msg in report["errors"][:20]:
+        print(f"  satır {row}: {msg}")
+    if args.dry_run:
+        print("(dry-run, yazılmadı)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from logic.constants import MATERIALS
+from logic.gradation_analytics import snapshot_gradation
 from logic.report_engine import generate_regulatory_text, build_grading_comment, build_strength_decision
 import datetime
 
@@ -31,9 +33,9 @@ def generate_kgm_raporu(snapshot):
     elif decision_data["status"] == "GREEN": status_color = "#27AE60"
     
     # SVG Grafik Üretimi
-    s_ai = snapshot.get('ai_analysis', {})
-    retained_svg = _generate_retained_svg(snapshot.get('sieves', []), s_ai.get('retained', []))
-    shilstone_svg = _generate_shilstone_svg(s_ai.get('cf', 0), s_ai.get('wf', 0))
+    grad = snapshot_gradation(snapshot)
+    retained_svg = _generate_retained_svg(snapshot.get('sieves', []), grad['retained'])
+    shilstone_svg = _generate_shilstone_svg(grad['cf'], grad['wf'])
 
     html = f"""
     <div style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; max-width: 800px; margin: auto; color: #333; line-height: 1.6;">
@@ -104,7 +106,7 @@ def generate_kgm_raporu(snapshot):
     was = material_data.get("was", [0]*4)
     las = material_data.get("las", [0]*4)
     mbs = material_data.get("mbs", [0]*4)
-    mats = ["No:2 (15-25)", "No:1 (5-15)", "K.Kum (0-5)", "D.Kum (0-7)"]
+    mats = MATERIALS
     
     for i in range(4):
         html += f"""
@@ -176,14 +178,14 @@ def generate_kgm_raporu(snapshot):
                 </div>
                 <div style="border: 1px solid #ddd; padding: 10px; border-radius: 5px;">
                     <span style="font-size: 11px; color: #666;">Filler Oranı (<0.063)</span><br>
-                    <b style="font-size: 16px;">%{snapshot.get('ai_analysis', {}).get('filler_val', 0):.2f}</b><br>
+                    <b style="font-size: 16px;">%{grad['filler']:.2f}</b><br>
                     <span style="color: {'#27AE60' if snapshot.get('ai_analysis', {}).get('filler_status') == 'Uygun' else '#C0392B'}; font-size: 11px;">
                         {snapshot.get('ai_analysis', {}).get('filler_status', '-')}
                     </span>
                 </div>
                 <div style="border: 1px solid #ddd; padding: 10px; border-radius: 5px;">
                     <span style="font-size: 11px; color: #666;">Kum Oranı (<4mm)</span><br>
-                    <b style="font-size: 16px;">%{snapshot.get('ai_analysis', {}).get('sand_val', 0):.1f}</b><br>
+                    <b style="font-size: 16px;">%{grad['sand']:.1f}</b><br>
                     <span style="color: {'#27AE60' if snapshot.get('ai_analysis', {}).get('sand_status') == 'Stabil' else '#C0392B'}; font-size: 11px;">
                         {snapshot.get('ai_analysis', {}).get('sand_status', '-')}
                     </span>
@@ -200,7 +202,7 @@ def generate_kgm_raporu(snapshot):
                             <th style="border: 1px solid #ddd; padding: 2px;">Kalan (%)</th>
                             <th style="border: 1px solid #ddd; padding: 2px;">Durum</th>
                         </tr>
-                        {"".join([f"<tr><td style='border: 1px solid #ddd; padding: 2px;'>{s}</td><td style='border: 1px solid #ddd; padding: 2px;'>{r:.1f}</td><td style='border: 1px solid #ddd; padding: 2px; color: {'red' if not (8 <= r <= 18) else 'green'}'>{'!' if not (8 <= r <= 18) else '✓'}</td></tr>" for s, r in zip(snapshot.get('sieves', []), snapshot.get('ai_analysis', {}).get('retained', [])) if s > 0.063])}
+                        {"".join([f"<tr><td style='border: 1px solid #ddd; padding: 2px;'>{s}</td><td style='border: 1px solid #ddd; padding: 2px;'>{r:.1f}</td><td style='border: 1px solid #ddd; padding: 2px; color: {'red' if not (8 <= r <= 18) else 'green'}'>{'!' if not (8 <= r <= 18) else '✓'}</td></tr>" for s, r in zip(snapshot.get('sieves', []), grad['retained']) if s > 0.063])}
                     </table>
                     <div style="margin-top: 15px; text-align: center;">
                         {retained_svg}
@@ -209,10 +211,10 @@ def generate_kgm_raporu(snapshot):
                 <div style="text-align: center; display: flex; flex-direction: column; justify-content: flex-start; gap: 10px;">
                     <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px;">
                         <div style="background: #1f77b4; color: white; padding: 10px; border-radius: 5px;">
-                            <span style="font-size: 10px;">WF: <b>{snapshot.get('ai_analysis', {}).get('wf', 0):.0f}</b></span>
+                            <span style="font-size: 10px;">WF: <b>{grad['wf']:.0f}</b></span>
                         </div>
                         <div style="background: #2ca02c; color: white; padding: 10px; border-radius: 5px;">
-                            <span style="font-size: 10px;">CF: <b>{snapshot.get('ai_analysis', {}).get('cf', 0):.0f}</b></span>
+                            <span style="font-size: 10px;">CF: <b>{grad['cf']:.0f}</b></span>
                         </div>
                     </div>
                     <div style="margin-top: 5px; border: 1px solid #eee; padding: 5px; border-radius: 5px; background: white;">
@@ -0,0 +1,365 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from logic.migrate import normalize_project
+from logic.storage import StorageBackend, JsonStorage, ShardedJsonStorage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plants (
+    plant_id TEXT PRIMARY KEY,
+    body     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    plant_id     TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    active_trial TEXT,
+    has_trials   INTEGER NOT NULL DEFAULT 0,
+    has_qc       INTEGER NOT NULL DEFAULT 0,
+    body         TEXT NOT NULL,
+    modified     TEXT,
+    PRIMARY KEY (plant_id, name)
+);
+CREATE TABLE IF NOT EXISTS trials (
+    plant_id TEXT NOT NULL,
+    project  TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    body     TEXT NOT NULL,
+    PRIMARY KEY (plant_id, project, name)
+);
+CREATE TABLE IF NOT EXISTS qc_records (
+    id       INTEGER PRIMARY KEY,
+    plant_id TEXT NOT NULL,
+    project  TEXT NOT NULL,
+    seq      INTEGER NOT NULL,
+    date     TEXT,
+    body     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_qc_plant_project_date ON qc_records (plant_id, project, date);
+CREATE INDEX IF NOT EXISTS idx_qc_plant_project_seq ON qc_records (plant_id, project, seq);
+CREATE TABLE IF NOT EXISTS pool_records (
+    id       INTEGER PRIMARY KEY,
+    plant_id TEXT,
+    project  TEXT,
+    date     TEXT,
+    body     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pool_plant_project_date ON pool_records (plant_id, project, date);
+CREATE TABLE IF NOT EXISTS site_factors (
+    plant_id TEXT NOT NULL,
+    tesis    TEXT NOT NULL,
+    value    REAL NOT NULL,
+    PRIMARY KEY (plant_id, tesis)
+);
+"""
+
+DEFAULT_PLANTS = {"merkez": {"name": "Merkez Santral", "location": "Şanlıurfa"}}
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def _record_date(record):
+    return str(record.get("date") or record.get("timestamp") or "")
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    SQLite tabanlı depolama motoru.
+    Projeler, denemeler, QC kayıtları ve havuz kayıtları ayrı tablolarda tutulur;
+    tek kayıt eklemek tüm santral dosyasını yeniden yazmak yerine indeksli bir INSERT'tir.
+    """
+    name = "sqlite"
+
+    def __init__(self, db_path="data/beton.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        db_dir = os.path.dirname(db_path)
+        if db_dir: os.makedirs(db_dir, exist_ok=True)
+        with self._conn() as con:
+            con.executescript(SCHEMA)
+            cols = {row[1] for row in con.execute("PRAGMA table_info(projects)")}
+            if "modified" not in cols:
+                con.execute("ALTER TABLE projects ADD COLUMN modified TEXT")
+
+    def _conn(self):
+        # Streamlit oturumları ayrı thread'lerde çalışır; her thread kendi bağlantısını kullanır.
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.db_path, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def close(self):
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    # --- SANTRALLER ---
+    def load_plants(self):
+        rows = self._conn().execute("SELECT plant_id, body FROM plants ORDER BY rowid").fetchall()
+        if not rows: return dict(DEFAULT_PLANTS)
+        return {pid: json.loads(body) for pid, body in rows}
+
+    def save_plant(self, plant_id, plant_data):
+        with self._conn() as con:
+            con.execute(
+                "INSERT INTO plants (plant_id, body) VALUES (?, ?) "
+                "ON CONFLICT(plant_id) DO UPDATE SET body = excluded.body",
+                (plant_id, _dumps(plant_data)))
+
+    def delete_plant(self, plant_id):
+        with self._conn() as con:
+            cur = con.execute("DELETE FROM plants WHERE plant_id = ?", (plant_id,))
+        return cur.rowcount > 0
+
+    def known_plants(self):
+        """Veritabanında projesi bulunan santral ID'leri."""
+        rows = self._conn().execute("SELECT DISTINCT plant_id FROM projects ORDER BY plant_id").fetchall()
+        return [pid for (pid,) in rows]
+
+    # --- PROJELER ---
+    def _assemble_projects(self, plant_id, names=None):
+        con = self._conn()
+        args = [plant_id]
+        name_filter = ""
+        if names is not None:
+            name_filter = f" IN ({','.join('?' * len(names))})"
+            args += list(names)
+        where = "WHERE plant_id = ?" + (" AND name" + name_filter if name_filter else "")
+        p_where = "WHERE plant_id = ?" + (" AND project" + name_filter if name_filter else "")
+        projects = {}
+        has_trials = {}
+        for name, t_flag, q_flag, body in con.execute(
+                f"SELECT name, has_trials, has_qc, body FROM projects {where} ORDER BY rowid", args):
+            projects[name] = json.loads(body)
+            has_trials[name] = bool(t_flag)
+            if t_flag: projects[name]["trials"] = {}
+            if q_flag: projects[name]["qc_history"] = []
+
+        for project, name, body in con.execute(
+                f"SELECT project, name, body FROM trials {p_where} ORDER BY project, position", args):
+            if has_trials.get(project):
+                projects[project]["trials"][name] = json.loads(body)
+
+        for project, body in con.execute(
+                f"SELECT project, body FROM qc_records {p_where} ORDER BY project, seq", args):
+            if project in projects:
+                projects[project]["qc_history"].append(json.loads(body))
+        return projects
+
+    def load_projects(self, plant_id, readonly=False):
+        return self._assemble_projects(plant_id)
+
+    def load_project(self, plant_id, name, readonly=False):
+        return self._assemble_projects(plant_id, [name]).get(name)
+
+    def list_projects(self, plant_id):
+        con = self._conn()
+        trials = {}
+        for project, name in con.execute(
+                "SELECT project, name FROM trials WHERE plant_id = ? ORDER BY project, position", (plant_id,)):
+            trials.setdefault(project, []).append(name)
+        rows = con.execute(
+            "SELECT p.name, p.has_trials, p.active_trial, p.modified, "
+            "(SELECT COUNT(*) FROM qc_records q WHERE q.plant_id = p.plant_id AND q.project = p.name) "
+            "FROM projects p WHERE p.plant_id = ? ORDER BY p.rowid", (plant_id,))
+        return [{"name": name, "trials": trials.get(name, []) if t_flag else None,
+                 "active_trial": active, "qc_count": qc_count, "modified": modified}
+                for name, t_flag, active, modified, qc_count in rows]
+
+    def list_trials(self, plant_id, project):
+        con = self._conn()
+        row = con.execute("SELECT has_trials FROM projects WHERE plant_id = ? AND name = ?",
+                          (plant_id, project)).fetchone()
+        if not row or not row[0]: return None
+        return [name for (name,) in con.execute(
+            "SELECT name FROM trials WHERE plant_id = ? AND project = ? ORDER BY position", (plant_id, project))]
+
+    def _write_project(self, con, plant_id, name, data):
+        body = {k: v for k, v in data.items() if k not in ("trials", "qc_history")}
+        has_trials = "trials" in data
+        con.execute(
+            "INSERT INTO projects (plant_id, name, active_trial, has_trials, has_qc, body, modified) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(plant_id, name) DO UPDATE SET active_trial = excluded.active_trial, "
+            "has_trials = excluded.has_trials, has_qc = excluded.has_qc, body = excluded.body, "
+            "modified = excluded.modified",
+            (plant_id, name, data.get("active_trial"), int(has_trials), int("qc_history" in data),
+             _dumps(body), _now()))
+
+        con.execute("DELETE FROM trials WHERE plant_id = ? AND project = ?", (plant_id, name))
+        if has_trials:
+            con.executemany(
+                "INSERT INTO trials (plant_id, project, name, position, body) VALUES (?, ?, ?, ?, ?)",
+                [(plant_id, name, t_name, pos, _dumps(t_data))
+                 for pos, (t_name, t_data) in enumerate(data["trials"].items())])
+
+        con.execute("DELETE FROM qc_records WHERE plant_id = ? AND project = ?", (plant_id, name))
+        con.executemany(
+            "INSERT INTO qc_records (plant_id, project, seq, date, body) VALUES (?, ?, ?, ?, ?)",
+            [(plant_id, name, seq, _record_date(rec), _dumps(rec))
+             for seq, rec in enumerate(data.get("qc_history", []))])
+
+    def save_project(self, plant_id, name, data):
+        # Yalnızca bu projenin satırları değişir; santraldeki diğer projelere dokunulmaz.
+        with self._conn() as con:
+            self._write_project(con, plant_id, name, data)
+
+    def delete_project(self, plant_id, name):
+        with self._conn() as con:
+            cur = con.execute("DELETE FROM projects WHERE plant_id = ? AND name = ?", (plant_id, name))
+            con.execute("DELETE FROM trials WHERE plant_id = ? AND project = ?", (plant_id, name))
+            con.execute("DELETE FROM qc_records WHERE plant_id = ? AND project = ?", (plant_id, name))
+        return cur.rowcount > 0
+
+    def append_qc_batch(self, plant_id, records_by_project, pool_records=()):
+        # QC kayıtları ve havuz kayıtları tek işlemde: ya hepsi ya hiçbiri
+        with self._conn() as con:
+            for project, records in records_by_project.items():
+                con.execute(
+                    "INSERT INTO projects (plant_id, name, active_trial, has_trials, has_qc, body, modified) "
+                    "VALUES (?, ?, NULL, 0, 1, '{}', ?) "
+                    "ON CONFLICT(plant_id, name) DO UPDATE SET has_qc = 1, modified = excluded.modified",
+                    (plant_id, project, _now()))
+                # (plant_id, project, seq) indeksi üzerinden O(log n)
+                seq = con.execute(
+                    "SELECT COALESCE(MAX(seq), -1) + 1 FROM qc_records WHERE plant_id = ? AND project = ?",
+                    (plant_id, project)).fetchone()[0]
+                con.executemany(
+                    "INSERT INTO qc_records (plant_id, project, seq, date, body) VALUES (?, ?, ?, ?, ?)",
+                    [(plant_id, project, seq + i, _record_date(r), _dumps(r)) for i, r in enumerate(records)])
+            if pool_records:
+                con.executemany("INSERT INTO pool_records (plant_id, project, date, body) VALUES (?, ?, ?, ?)",
+                                [self._pool_row(r) for r in pool_records])
+
+    def load_qc_history(self, plant_id):
+        rows = self._conn().execute(
+            "SELECT body FROM qc_records WHERE plant_id = ? ORDER BY project, seq", (plant_id,))
+        return [json.loads(body) for (body,) in rows]
+
+    # --- SAHA FAKTÖRLERİ ---
+    def load_factor(self, plant_id, tesis_adi, default=1.0):
+        row = self._conn().execute(
+            "SELECT value FROM site_factors WHERE plant_id = ? AND tesis = ?", (plant_id, tesis_adi)).fetchone()
+        return row[0] if row else default
+
+    def save_factor(self, plant_id, tesis_adi, value):
+        with self._conn() as con:
+            con.execute(
+                "INSERT INTO site_factors (plant_id, tesis, value) VALUES (?, ?, ?) "
+                "ON CONFLICT(plant_id, tesis) DO UPDATE SET value = excluded.value",
+                (plant_id, tesis_adi, value))
+
+    # --- AI HAVUZU ---
+    def _pool_row(self, record):
+        return (record.get("plant_id"), record.get("project") or record.get("source"),
+                _record_date(record), _dumps(record))
+
+    def load_pool(self, readonly=False):
+        return [json.loads(body) for (body,) in self._conn().execute("SELECT body FROM pool_records ORDER BY id")]
+
+    def iter_pool(self):
+        # Ayrı imleç: kayıtlar satır satır okunur, liste kurulmaz
+        cur = self._conn().cursor()
+        for (body,) in cur.execute("SELECT body FROM pool_records ORDER BY id"):
+            yield json.loads(body)
+
+    def pool_columns_path(self):
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), "ai_training_pool.npz")
+
+    def read_pool_with_cursor(self):
+        rows = self._conn().execute("SELECT id, body FROM pool_records ORDER BY id").fetchall()
+        last_id = rows[-1][0] if rows else 0
+        return [json.loads(body) for _, body in rows], {"last_id": last_id, "count": len(rows)}
+
+    def read_pool_since(self, cursor):
+        con = self._conn()
+        if not cursor or "last_id" not in cursor: return None
+        # Önceki kayıtlar silinmiş/değişmişse (havuz sıfırlama) tam okumaya düş
+        count = con.execute("SELECT COUNT(*) FROM pool_records WHERE id <= ?", (cursor["last_id"],)).fetchone()[0]
+        if count != cursor["count"]: return None
+        rows = con.execute("SELECT id, body FROM pool_records WHERE id > ? ORDER BY id", (cursor["last_id"],)).fetchall()
+        if not rows: return [], cursor
+        return [json.loads(body) for _, body in rows], {"last_id": rows[-1][0], "count": count + len(rows)}
+
+    def save_pool(self, records):
+        with self._conn() as con:
+            # Kimlikler sıfırdan başlamaz: aynı sayıda kayıtla değiştirilen havuz
+            # read_pool_since'te "değişmedi" görünmesin
+            start = con.execute("SELECT COALESCE(MAX(id), 0) FROM pool_records").fetchone()[0]
+            con.execute("DELETE FROM pool_records")
+            con.executemany("INSERT INTO pool_records (id, plant_id, project, date, body) VALUES (?, ?, ?, ?, ?)",
+                            [(start + i + 1, *self._pool_row(r)) for i, r in enumerate(records)])
+
+    def append_pool(self, record):
+        with self._conn() as con:
+            con.execute("INSERT INTO pool_records (plant_id, project, date, body) VALUES (?, ?, ?, ?)",
+                        self._pool_row(record))
+
+
+def migrate_json_to_sqlite(data_dir="data", db_path=None):
+    """
+    Mevcut JSON dosyalarını (plants, projects_* dosya/klasörleri, factors_*, ai_training_pool)
+    tek seferde SQLite veritabanına aktarır. Aktarım özeti sözlük olarak döner.
+    """
+    db_path = db_path or os.path.join(data_dir, "beton.db")
+    src = ShardedJsonStorage(data_dir)
+    legacy = JsonStorage(data_dir)
+    dst = SQLiteStorage(db_path)
+    report = {"plants": 0, "projects": 0, "trials": 0, "qc_records": 0, "pool_records": 0, "factors": 0}
+
+    with dst._conn() as con:
+        if os.path.exists(src.plants_path()):
+            for p_id, p_data in src.load_plants().items():
+                con.execute("INSERT OR REPLACE INTO plants (plant_id, body) VALUES (?, ?)", (p_id, _dumps(p_data)))
+                report["plants"] += 1
+
+        for plant_id in src.known_plants():
+            # Bölünmemiş santraller yerinde okunur; aktarım kaynak dosyaları değiştirmez
+            store = src if os.path.exists(src.manifest_path(plant_id)) else legacy
+            for name, data in store.load_projects(plant_id).items():
+                if not isinstance(data, dict): continue
+                # Bölünmemiş (json) santrallerde eski düz projeler de kanonik şemaya getirilir
+                data, _ = normalize_project(data)
+                dst._write_project(con, plant_id, name, data)
+                report["projects"] += 1
+                report["trials"] += len(data.get("trials", {}))
+                report["qc_records"] += len(data.get("qc_history", []))
+
+        for path in sorted(glob.glob(os.path.join(data_dir, "factors_*.json"))):
+            plant_id = os.path.basename(path)[len("factors_"):-len(".json")]
+            with open(path, "r", encoding="utf-8") as f:
+                for tesis, value in json.load(f).items():
+                    con.execute("INSERT OR REPLACE INTO site_factors (plant_id, tesis, value) VALUES (?, ?, ?)",
+                                (plant_id, tesis, value))
+                    report["factors"] += 1
+
+        pool = src.load_pool()
+        con.execute("DELETE FROM pool_records")
+        con.executemany("INSERT INTO pool_records (plant_id, project, date, body) VALUES (?, ?, ?, ?)",
+                        [dst._pool_row(r) for r in pool])
+        report["pool_records"] = len(pool)
+
+    dst.close()
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="JSON verilerini SQLite veritabanına aktarır.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--db", default=None, help="Hedef veritabanı (varsayılan: <data-dir>/beton.db)")
+    args = parser.parse_args()
+    summary = migrate_json_to_sqlite(args.data_dir, args.db)
+    for k, v in summary.items():
+        print(f"{k}: {v}")
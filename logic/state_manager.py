@@ -75,14 +75,14 @@ class SessionStateInitializer:
         """
         Seçilen projenin (ve denemenin) verilerini okur ve session_state'e yükler.
         """
-        from logic.data_manager import veriyi_yukle
+        from logic.data_manager import load_project
         
         # 0. Verileri temizle ama seçimi bırak ki döngüye girmesin
         SessionStateInitializer.clear_all_project_state(exclude_selection=True)
         SessionStateInitializer.initialize_defaults(force=True)
 
-        all_data = veriyi_yukle(plant_id=plant_id)
-        raw_p_data = all_data.get(project_name)
+        # Yalnızca seçili proje okunur (santralin diğer projeleri değil)
+        raw_p_data = load_project(plant_id, project_name)
         
         if not raw_p_data or not isinstance(raw_p_data, dict):
             for i in range(4):
@@ -90,17 +90,10 @@ class SessionStateInitializer:
                 if ed_key in st.session_state: del st.session_state[ed_key]
             return
 
-        # 1. Yapı Analizi (Nested mu yoksa Flat mı?)
-        # Eğer 'trials' yoksa bu eski formatta bir projedir
-        if "trials" not in raw_p_data:
-            # Migration: Eski veriyi bir trial içine saralım
-            p_data = raw_p_data
-            active_trial = "Ana Reçete"
-        else:
-            # Yeni format: Trial seçimi varsa onu yükle, yoksa aktif olanı
-            trials = raw_p_data.get("trials", {})
-            active_trial = trial_name if trial_name and trial_name in trials else raw_p_data.get("active_trial", list(trials.keys())[0] if trials else "Ana Reçete")
-            p_data = trials.get(active_trial, {})
+        # 1. Deneme seçimi varsa onu yükle, yoksa aktif olanı (şema: logic.migrate)
+        trials = raw_p_data.get("trials", {})
+        active_trial = trial_name if trial_name in trials else raw_p_data.get("active_trial", "Ana Reçete")
+        p_data = trials.get(active_trial, {})
 
         # 2. Veriyi Map Et
         SessionStateInitializer._map_data_to_state(p_data)
@@ -147,23 +140,8 @@ class SessionStateInitializer:
         st.session_state["hava_yuzde"] = p_data.get("hava", 1.0)
         st.session_state["exposure_class"] = p_data.get("exp_class", "XC3")
         st.session_state["asr_status"] = p_data.get("asr_stat", "Düzeltme Gerekmiyor (İnert)")
+        # Elek sırası (40->0.063) logic.migrate ile kalıcı olarak düzeltilir (sharded bölme / json açılışı / SQLite aktarımı)
         st.session_state["computed_passing"] = p_data.get("passing", {})
-
-        # --- ELEK SIRALAMA MİGRASYONU (0.063->40'tan 40->0.063'e) ---
-        saved_elek = p_data.get("elek", [])
-        if saved_elek and len(saved_elek) > 1:
-            # Eğer kaydedilen elek listesi küçükten büyüğe ise, verileri TERSİNE ÇEVİR
-            if saved_elek[0] < saved_elek[-1]:
-                # 1. Computed Passing verilerini tersine çevir
-                for mat in st.session_state["computed_passing"]:
-                    if isinstance(st.session_state["computed_passing"][mat], list):
-                        st.session_state["computed_passing"][mat] = st.session_state["computed_passing"][mat][::-1]
-                # 2. RI (Girdi) verilerini tersine çevir (Table Editor State)
-                loaded_ri = st.session_state.get('loaded_ri', {})
-                for mat in loaded_ri:
-                    if isinstance(loaded_ri[mat], list):
-                        loaded_ri[mat] = loaded_ri[mat][::-1]
-                st.session_state['loaded_ri'] = loaded_ri
     
 
 def init_session_state(force=False):
@@ -0,0 +1,490 @@
+import glob
+import hashlib
+import logging
+import os
+import re
+from datetime import datetime
+
+from logic.atomic_io import atomic_write_json, file_lock, update_json
+from logic.file_cache import file_cache
+from logic.migrate import normalize_project
+from logic.pool_journal import PoolJournal
+
+# Depolama motoru ayarının tek kaynağı: sharded | json | sqlite
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sharded")
+# Eski projects_<santral>.json dosyaları ilk erişimde bölünsün mü? Varsayılan
+# hayır: bölme "python -m logic.migrate --backend sharded" ile açıkça yapılır.
+STORAGE_AUTO_SPLIT = os.getenv("STORAGE_AUTO_SPLIT", "0") == "1"
+
+logger = logging.getLogger("beton_tasarim")
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+def project_summary(name, data, modified=None):
+    """Proje gövdesinden manifest/özet kaydı üretir (gövde ve QC listesi taşınmaz)."""
+    if not isinstance(data, dict): data = {}
+    trials = data.get("trials")
+    return {
+        "name": name,
+        "trials": list(trials.keys()) if isinstance(trials, dict) else None,
+        "active_trial": data.get("active_trial"),
+        "qc_count": len(data.get("qc_history", [])),
+        "modified": modified,
+    }
+
+class StorageBackend:
+    """
+    data_manager fonksiyonlarının arkasındaki takılabilir depolama arayüzü.
+    Her motor santral, proje, deneme, QC kaydı, saha faktörü ve AI havuzu
+    verilerini aynı sözlük/liste şekliyle döndürmek zorundadır.
+    """
+    name = "base"
+
+    # --- SANTRALLER ---
+    def load_plants(self):
+        raise NotImplementedError
+
+    def save_plant(self, plant_id, plant_data):
+        raise NotImplementedError
+
+    def delete_plant(self, plant_id):
+        raise NotImplementedError
+
+    # --- PROJELER ---
+    def load_projects(self, plant_id, readonly=False):
+        """
+        Santraldeki tüm projeleri {isim: proje} sözlüğü olarak döner.
+        readonly=True ise önbellekteki paylaşılan nesne dönebilir; değiştirilmemelidir.
+        """
+        raise NotImplementedError
+
+    def load_project(self, plant_id, name, readonly=False):
+        """Tek projeyi döner (yoksa None). Motorlar yalnızca o projeyi okuyacak şekilde ezer."""
+        return self.load_projects(plant_id, readonly=readonly).get(name)
+
+    def save_project(self, plant_id, name, data):
+        raise NotImplementedError
+
+    def delete_project(self, plant_id, name):
+        raise NotImplementedError
+
+    def list_projects(self, plant_id):
+        """
+        Proje özetlerini kayıt sırasıyla döner:
+        [{"name", "trials", "active_trial", "qc_count", "modified"}, ...]
+        trials eski (trials'sız) projelerde None'dır.
+        """
+        return [project_summary(name, data)
+                for name, data in self.load_projects(plant_id, readonly=True).items()]
+
+    def list_trials(self, plant_id, project):
+        """Projenin deneme isimleri; proje yoksa veya eski formattaysa None."""
+        for entry in self.list_projects(plant_id):
+            if entry["name"] == project:
+                return entry["trials"]
+        return None
+
+    def append_qc_record(self, plant_id, project, record):
+        """Tek bir QC kaydını projenin qc_history listesinin sonuna ekler."""
+        self.append_qc_batch(plant_id, {project: [record]})
+
+    def append_qc_batch(self, plant_id, records_by_project, pool_records=()):
+        """
+        Toplu ekleme: {proje: [kayıt, ...]} kayıtlarını projelerin qc_history
+        listelerine, pool_records'u AI havuzuna ekler. Motorlar santral başına
+        tek bir yazma (SQLite'ta tek işlem) yapacak şekilde ezer.
+        """
+        raise NotImplementedError
+
+    def load_qc_history(self, plant_id):
+        """Santraldeki tüm projelerin QC kayıtlarını tek liste olarak döner."""
+        history = []
+        for p_data in self.load_projects(plant_id, readonly=True).values():
+            if isinstance(p_data, dict) and "qc_history" in p_data:
+                history.extend(p_data["qc_history"])
+        return history
+
+    # --- SAHA FAKTÖRLERİ ---
+    def load_factor(self, plant_id, tesis_adi, default=1.0):
+        raise NotImplementedError
+
+    def save_factor(self, plant_id, tesis_adi, value):
+        raise NotImplementedError
+
+    # --- AI HAVUZU ---
+    def load_pool(self, readonly=False):
+        raise NotImplementedError
+
+    def save_pool(self, records):
+        raise NotImplementedError
+
+    def append_pool(self, record):
+        raise NotImplementedError
+
+    def iter_pool(self):
+        """Havuz kayıtlarını tek tek döner (eğitim için listeyi bellekte kurmadan)."""
+        return iter(self.load_pool())
+
+    def compact_pool(self):
+        """Motorun havuz günlüğünü sıkıştırır; günlük tutmayan motorlarda işlem yapmaz."""
+        return 0
+
+    def pool_columns_path(self):
+        """Havuzun kolon anlık görüntüsünün (.npz) yolu; None ise diske yazılmaz."""
+        return None
+
+    def read_pool_with_cursor(self):
+        """Tüm havuz + artımlı okuma konumu (cursor). cursor None ise artımlı okuma yoktur."""
+        return self.load_pool(), None
+
+    def read_pool_since(self, cursor):
+        """cursor'dan sonra eklenen kayıtlar ve yeni cursor; geçersizse None."""
+        return None
+
+
+class JsonStorage(StorageBackend):
+    """
+    Klasik JSON dosya düzeni (data/projects_<santral>.json vb.).
+    Her yazma işlemi ilgili dosyanın tamamını atomik olarak yeniden yazar
+    (geçici dosya + fsync + yeniden adlandırma); oku-değiştir-yaz işlemleri
+    sürüm çakışmasında yeniden denenir. Okumalar file_cache'ten gelir.
+    Dosyalar kompakt (boşluksuz) JSON olarak yazılır.
+    """
+    name = "json"
+    INDENT = None
+
+    def __init__(self, data_dir="data"):
+        self.data_dir = data_dir
+        self.pool_journal = PoolJournal(self.pool_path())
+
+    # --- Dosya yolları ---
+    def plants_path(self):
+        return os.path.join(self.data_dir, "plants.json")
+
+    def project_path(self, plant_id):
+        if not plant_id: plant_id = "merkez"
+        return os.path.join(self.data_dir, f"projects_{plant_id}.json")
+
+    def factor_path(self, plant_id):
+        return os.path.join(self.data_dir, f"factors_{plant_id}.json")
+
+    def pool_path(self):
+        return os.path.join(self.data_dir, "ai_training_pool.json")
+
+    def known_plants(self):
+        """Diskte proje verisi bulunan santral ID'leri."""
+        paths = glob.glob(os.path.join(self.data_dir, "projects_*.json"))
+        return sorted(os.path.basename(p)[len("projects_"):-len(".json")] for p in paths)
+
+    # --- Yardımcılar ---
+    def _read(self, path, default, copy=True):
+        return file_cache.read_json(path, default, copy=copy)
+
+    def _write(self, path, obj):
+        atomic_write_json(path, obj, indent=self.INDENT)
+
+    def _update(self, path, default, mutate):
+        """Oku-değiştir-yaz; mutate özel kopyayı alır, None dönerse yazılmaz."""
+        return update_json(path, mutate, default, indent=self.INDENT)
+
+    # --- SANTRALLER ---
+    def load_plants(self):
+        return self._read(self.plants_path(), {"merkez": {"name": "Merkez Santral", "location": "Şanlıurfa"}})
+
+    def save_plant(self, plant_id, plant_data):
+        def mutate(plants):
+            plants[plant_id] = plant_data
+            return plants
+        self._update(self.plants_path(), self.load_plants(), mutate)
+
+    def delete_plant(self, plant_id):
+        def mutate(plants):
+            if plant_id not in plants: return None
+            del plants[plant_id]
+            return plants
+        return self._update(self.plants_path(), self.load_plants(), mutate) is not None
+
+    # --- PROJELER ---
+    def load_projects(self, plant_id, readonly=False):
+        return self._read(self.project_path(plant_id), {}, copy=not readonly)
+
+    def list_projects(self, plant_id):
+        path = self.project_path(plant_id)
+        modified = None
+        if os.path.exists(path):
+            modified = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+        return [project_summary(name, data, modified)
+                for name, data in self.load_projects(plant_id, readonly=True).items()]
+
+    def save_project(self, plant_id, name, data):
+        def mutate(projeler):
+            projeler[name] = data
+            return projeler
+        self._update(self.project_path(plant_id), {}, mutate)
+
+    def delete_project(self, plant_id, name):
+        def mutate(projeler):
+            if name not in projeler: return None
+            del projeler[name]
+            return projeler
+        return self._update(self.project_path(plant_id), {}, mutate) is not None
+
+    def append_qc_batch(self, plant_id, records_by_project, pool_records=()):
+        # Tüm projeler tek oku-değiştir-yaz ile; havuz aynı çağrıda günlüğe eklenir
+        def mutate(projeler):
+            for project, records in records_by_project.items():
+                p_data = projeler.get(project)
+                if not isinstance(p_data, dict): p_data = {}
+                p_data.setdefault("qc_history", []).extend(records)
+                projeler[project] = p_data
+            return projeler
+        if records_by_project:
+            self._update(self.project_path(plant_id), {}, mutate)
+        self.pool_journal.append_many(list(pool_records))
+
+    # --- SAHA FAKTÖRLERİ ---
+    def load_factor(self, plant_id, tesis_adi, default=1.0):
+        return self._read(self.factor_path(plant_id), {}, copy=False).get(tesis_adi, default)
+
+    def save_factor(self, plant_id, tesis_adi, value):
+        def mutate(faz):
+            faz[tesis_adi] = value
+            return faz
+        self._update(self.factor_path(plant_id), {}, mutate)
+
+    # --- AI HAVUZU (anlık görüntü + ekleme günlüğü) ---
+    def load_pool(self, readonly=False):
+        return self.pool_journal.load(copy=not readonly)
+
+    def iter_pool(self):
+        return self.pool_journal.iter_records()
+
+    def save_pool(self, records):
+        self.pool_journal.replace_all(records)
+
+    def append_pool(self, record):
+        self.pool_journal.append(record)
+
+    def compact_pool(self):
+        return self.pool_journal.compact()
+
+    def pool_columns_path(self):
+        return os.path.join(self.data_dir, "ai_training_pool.npz")
+
+    def read_pool_with_cursor(self):
+        return self.pool_journal.read_with_cursor()
+
+    def read_pool_since(self, cursor):
+        return self.pool_journal.read_since(cursor)
+
+
+def _shard_file_name(name):
+    # Okunabilir kısım + isim özeti: farklı isimler aynı dosyaya düşmez
+    slug = re.sub(r"[^\w\-]+", "_", name).strip("_")[:40] or "proje"
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}_{digest}.json"
+
+
+class ShardedJsonStorage(JsonStorage):
+    """
+    Proje başına bir dosya (data/projects_<santral>/<proje>.json) ve küçük bir
+    manifest (_manifest.json). Manifest her proje için deneme isimlerini,
+    aktif denemeyi, QC kayıt sayısını ve son değişiklik zamanını tutar; her
+    kaydet / silme işleminde yalnızca ilgili kayıt güncellenir.
+
+    Bir projeyi kaydetmek yalnızca o projenin dosyasını yazar; proje ve deneme
+    listeleri (list_projects / list_trials) manifestten gelir, gövdeler okunmaz.
+    Eski tek dosyalı düzen (projects_<santral>.json) split_plant ile bölünür
+    (projeler logic.migrate şemasına getirilerek) ve dosya
+    projects_<santral>.json.migrated olarak saklanır. auto_split kapalıyken
+    bölünmemiş santraller eski dosyadan JsonStorage olarak okunup yazılır.
+    """
+    name = "sharded"
+    MANIFEST = "_manifest.json"
+    MANIFEST_VERSION = 2
+
+    def __init__(self, data_dir="data", auto_split=False):
+        super().__init__(data_dir)
+        self.auto_split = auto_split
+        self._warned = set()
+
+    # --- Dosya yolları ---
+    def shard_dir(self, plant_id):
+        if not plant_id: plant_id = "merkez"
+        return os.path.join(self.data_dir, f"projects_{plant_id}")
+
+    def manifest_path(self, plant_id):
+        return os.path.join(self.shard_dir(plant_id), self.MANIFEST)
+
+    def known_plants(self):
+        ids = set(super().known_plants())
+        for d in glob.glob(os.path.join(self.data_dir, "projects_*", self.MANIFEST)):
+            ids.add(os.path.basename(os.path.dirname(d))[len("projects_"):])
+        return sorted(ids)
+
+    # --- Manifest ---
+    def _manifest(self, plant_id):
+        """Manifesti döner (paylaşılan nesne, değiştirilmemeli)."""
+        self._ensure_sharded(plant_id)
+        manifest = self._read(self.manifest_path(plant_id), {"projects": {}}, copy=False)
+        if manifest.get("version", 1) < self.MANIFEST_VERSION:
+            manifest = self._rebuild_manifest(plant_id, manifest["projects"])
+        # Santralin tüm proje dosyaları + manifest önbellekte yer bulur
+        file_cache.reserve(self.shard_dir(plant_id), len(manifest["projects"]) + 1)
+        return manifest
+
+    def _rebuild_manifest(self, plant_id, entries):
+        # Eski manifest yalnızca isimleri tutuyordu; özetler gövdelerden bir kez üretilir
+        rebuilt = {}
+        for name, entry in entries.items():
+            path = os.path.join(self.shard_dir(plant_id), entry["file"])
+            modified = None
+            if os.path.exists(path):
+                modified = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+            rebuilt[name] = self._manifest_entry(self._read(path, {}, copy=False), entry["file"], modified)
+        self._write_manifest(plant_id, rebuilt)
+        return {"version": self.MANIFEST_VERSION, "projects": rebuilt}
+
+    @staticmethod
+    def _manifest_entry(data, file_name, modified=None):
+        entry = project_summary(None, data, modified or _now())
+        del entry["name"]  # isim manifestte anahtar olarak durur
+        entry["file"] = file_name
+        return entry
+
+    def _write_manifest(self, plant_id, entries):
+        self._write(self.manifest_path(plant_id), {"version": self.MANIFEST_VERSION, "projects": entries})
+
+    def _sync_manifest(self, plant_id, paths):
+        """
+        {proje: dosya_yolu} projelerinin manifest kayıtlarını diskteki güncel
+        proje dosyalarından tek yazmada yeniler. Eşzamanlı iki kayıtta
+        sonuncunun özeti kazanır; sayaçlar geride kalmaz.
+        """
+        def mutate(manifest):
+            for name, path in paths.items():
+                data = self._read(path, None, copy=False)
+                if data is None:
+                    manifest["projects"].pop(name, None)
+                else:
+                    manifest["projects"][name] = self._manifest_entry(data, os.path.basename(path))
+            manifest["version"] = self.MANIFEST_VERSION
+            return manifest
+        self._update(self.manifest_path(plant_id), {"projects": {}}, mutate)
+
+    def _legacy(self, plant_id):
+        """Santral henüz bölünmemiş ve otomatik bölme kapalı mı (eski tek dosya kullanılır)?"""
+        if self.auto_split or os.path.exists(self.manifest_path(plant_id)):
+            return False
+        if not os.path.exists(self.project_path(plant_id)):
+            return False
+        if plant_id not in self._warned:
+            self._warned.add(plant_id)
+            logger.warning("projects_%s.json bölünmemiş; eski tek dosya düzeni kullanılıyor. "
+                           "Bölmek için: python -m logic.migrate --backend sharded --plant %s", plant_id, plant_id)
+        return True
+
+    def split_plant(self, plant_id):
+        """Eski tek dosyayı proje dosyalarına böler; zaten bölünmüşse bir şey yapmaz."""
+        self._ensure_sharded(plant_id)
+
+    def _ensure_sharded(self, plant_id):
+        if os.path.exists(self.manifest_path(plant_id)):
+            return
+        # Kilit eski dosyanın klasöründe (data/) alınır; parça yazmaları kendi klasörlerini kilitler
+        with file_lock(self.project_path(plant_id)):
+            if os.path.exists(self.manifest_path(plant_id)):
+                return
+            legacy = self.project_path(plant_id)
+            projeler = self._read(legacy, {}, copy=False)
+            os.makedirs(self.shard_dir(plant_id), exist_ok=True)
+            entries = {}
+            for name, data in projeler.items():
+                # Bölme zaten tek seferlik bir geçiş: veri burada kanonik şemaya da getirilir
+                data, _ = normalize_project(data)
+                file_name = _shard_file_name(name)
+                self._write(os.path.join(self.shard_dir(plant_id), file_name), data)
+                entries[name] = self._manifest_entry(data, file_name)
+            # Manifest en son yazılır: varlığı bölmenin tamamlandığını gösterir
+            self._write_manifest(plant_id, entries)
+            if os.path.exists(legacy):
+                os.replace(legacy, legacy + ".migrated")
+                file_cache.invalidate(legacy)
+                logger.info("%s %d proje dosyasına bölündü (eski dosya: %s.migrated)", legacy, len(entries), legacy)
+
+    def _shard_path(self, plant_id, name):
+        entry = self._manifest(plant_id)["projects"].get(name)
+        file_name = entry["file"] if entry else _shard_file_name(name)
+        return os.path.join(self.shard_dir(plant_id), file_name)
+
+    # --- PROJELER ---
+    def load_projects(self, plant_id, readonly=False):
+        if self._legacy(plant_id): return super().load_projects(plant_id, readonly)
+        shard_dir = self.shard_dir(plant_id)
+        return {
+            name: self._read(os.path.join(shard_dir, entry["file"]), {}, copy=not readonly)
+            for name, entry in self._manifest(plant_id)["projects"].items()
+        }
+
+    def load_project(self, plant_id, name, readonly=False):
+        if self._legacy(plant_id): return super().load_project(plant_id, name, readonly)
+        entry = self._manifest(plant_id)["projects"].get(name)
+        if entry is None: return None
+        return self._read(os.path.join(self.shard_dir(plant_id), entry["file"]), None, copy=not readonly)
+
+    def list_projects(self, plant_id):
+        if self._legacy(plant_id): return super().list_projects(plant_id)
+        return [{"name": name, "trials": None if e["trials"] is None else list(e["trials"]),
+                 "active_trial": e["active_trial"], "qc_count": e["qc_count"], "modified": e["modified"]}
+                for name, e in self._manifest(plant_id)["projects"].items()]
+
+    def list_trials(self, plant_id, project):
+        if self._legacy(plant_id): return super().list_trials(plant_id, project)
+        entry = self._manifest(plant_id)["projects"].get(project)
+        return list(entry["trials"]) if entry and entry["trials"] is not None else None
+
+    def save_project(self, plant_id, name, data):
+        if self._legacy(plant_id): return super().save_project(plant_id, name, data)
+        path = self._shard_path(plant_id, name)
+        self._write(path, data)
+        self._sync_manifest(plant_id, {name: path})
+
+    def delete_project(self, plant_id, name):
+        if self._legacy(plant_id): return super().delete_project(plant_id, name)
+        entry = self._manifest(plant_id)["projects"].get(name)
+        if entry is None: return False
+        path = os.path.join(self.shard_dir(plant_id), entry["file"])
+        with file_lock(path):
+            if os.path.exists(path): os.remove(path)
+            file_cache.invalidate(path)
+        self._sync_manifest(plant_id, {name: path})
+        return True
+
+    def append_qc_batch(self, plant_id, records_by_project, pool_records=()):
+        if self._legacy(plant_id): return super().append_qc_batch(plant_id, records_by_project, pool_records)
+        # Proje başına tek yazma + tek manifest güncellemesi
+        paths = {}
+        for project, records in records_by_project.items():
+            def mutate(p_data, records=records):
+                if not isinstance(p_data, dict): p_data = {}
+                p_data.setdefault("qc_history", []).extend(records)
+                return p_data
+            paths[project] = self._shard_path(plant_id, project)
+            self._update(paths[project], {}, mutate)
+        if paths:
+            self._sync_manifest(plant_id, paths)
+        self.pool_journal.append_many(list(pool_records))
+
+
+def create_storage(backend=None, data_dir="data"):
+    """Depolama motorunu oluşturur (backend verilmezse STORAGE_BACKEND ayarı)."""
+    backend = (backend or STORAGE_BACKEND).lower()
+    if backend == "sharded":
+        return ShardedJsonStorage(data_dir, auto_split=STORAGE_AUTO_SPLIT)
+    if backend == "json":
+        return JsonStorage(data_dir)
+    if backend == "sqlite":
+        from logic.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(os.path.join(data_dir, "beton.db"))
+    raise ValueError(f"Bilinmeyen depolama motoru: {backend}")
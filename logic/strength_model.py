@@ -0,0 +1,274 @@
+"""
+Türetilmiş özellikli, düzenlileştirilmiş (ridge / elastic-net) dayanım modeli.
+
+Özellikler: çimento, su, kül, hava, katkı + efektif S/Ç, Ç/S (Abrams/Bolomey:
+dayanım S/Ç'nin tersiyle yaklaşık doğrusal), bağlayıcı (çimento + kül),
+agrega oranları p1..p4 ve litoloji (one-hot, eğitimde görülen sınıflar).
+Özellikler eğitim verisiyle standartlaştırılır, y merkezlenir.
+
+Amaç (glmnet biçimi): 1/(2n)·||y − Xw||² + λ·[(1 − α)/2·||w||² + α·||w||₁]
+    * α = 0 (ridge): kapalı biçim (G + λI) w = c, G = XᵀX/n, c = Xᵀy/n
+    * α > 0: Gram matrisi üzerinde koordinat inişi (satır sayısından bağımsız,
+      kayıt başına değil özellik² başına maliyet), λ yolu boyunca sıcak başlangıç
+
+Hiperparametreler (α, λ) k-katlı çapraz doğrulamayla seçilir; katlar büyük
+havuzlarda işlem havuzunda paralel çalışır. Aynı katlarda 5 özellikli sade
+EKK da değerlendirilir, örneklem dışı RMSE'ler karşılaştırılabilir. Yalnızca
+NumPy kullanır.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from logic.ai_model import FEATURES, MIN_SAMPLES, predict_batch
+from logic.pool_columns import RATIO_COLUMNS, PoolColumns
+
+ASH_K = 0.35
+ENGINEERED = ("wc", "cw", "binder")
+DEFAULT_ALPHAS = (0.0, 0.5, 0.9)
+DEFAULT_LAMBDAS = tuple(np.logspace(1, -4, 16))  # büyükten küçüğe: sıcak başlangıç
+# Kat maliyeti satırdan çok koordinat inişinde (özellik², ~0.1 s/kat); işlem
+# havuzunun açılış maliyeti bin satır civarında amorti olur
+POOL_MIN_ROWS = 1_000
+CD_TOL = 1e-7
+CD_MAX_ITER = 500
+
+def _columns(data):
+    return data if isinstance(data, PoolColumns) else PoolColumns.from_records(data)
+
+def training_mask(cols):
+    """ai_model.design_matrix ile aynı eleme: d28 > 0, çimento >= 100, su >= 50."""
+    return (cols["d28"] > 0) & (cols["cement"] >= 100) & (cols["water"] >= 50)
+
+def _subset(cols, rows):
+    return PoolColumns({name: col[rows] for name, col in cols.columns.items()})
+
+def fit_preprocessing(cols):
+    """
+    Verilen satırlardan öğrenilen ön işleme: (lithologies, fill). Litoloji
+    one-hot sınıfları ve eksik oranların ortalamayla doldurulması yalnızca
+    eğitim satırlarından hesaplanır (CV'de her katın kendi eğitim kısmı).
+    """
+    lithologies = sorted({str(v) for v in cols["lithology"] if v})
+    fill = {name: float(np.nanmean(cols[name])) if np.isfinite(cols[name]).any() else 25.0
+            for name in RATIO_COLUMNS}
+    return lithologies, fill
+
+def feature_matrix(cols, lithologies=(), fill=None):
+    """
+    (N, F) özellik matrisi ve özellik adları. lithologies: one-hot sınıfları
+    (eğitimde görülenler); fill: eksik oranlar için {p1..p4: değer}.
+    """
+    fill = fill or {}
+    cem, wat = cols["cement"], cols["water"]
+    base = [cem, wat] + [cols.filled(k) for k in FEATURES[2:]]
+    ash = base[2]
+    eff = cem + ASH_K * ash
+    wc = np.divide(wat, eff, out=np.zeros(len(cem)), where=eff > 0)
+    cw = np.divide(eff, wat, out=np.zeros(len(cem)), where=wat > 0)
+    ratios = [cols.filled(k, fill.get(k, 25.0)) for k in RATIO_COLUMNS]
+    lith = cols["lithology"]
+    onehot = [(lith == name).astype(float) for name in lithologies]
+    names = list(FEATURES) + list(ENGINEERED) + list(RATIO_COLUMNS) + [f"lit:{name}" for name in lithologies]
+    return np.column_stack(base + [wc, cw, cem + ash] + ratios + onehot), names
+
+def _soft(x, t):
+    return np.sign(x) * max(abs(x) - t, 0.0)
+
+def _polish(G, c, l1, l2, w):
+    """
+    Koordinat inişinin bulduğu işaret desenini kesinleştirir: aktif küme ve
+    işaretler sabitken çözüm kapalı biçimdir. KKT sağlanırsa kesin çözüm,
+    aksi halde None (iniş sürer).
+    """
+    active = np.flatnonzero(w)
+    out = np.zeros(len(c))
+    if len(active):
+        s = np.sign(w[active])
+        A = G[np.ix_(active, active)] + l2 * np.eye(len(active))
+        try:
+            wa = np.linalg.solve(A, c[active] - l1 * s)
+        except np.linalg.LinAlgError:
+            return None
+        if (np.sign(wa) != s).any():
+            return None
+        out[active] = wa
+    slack = np.abs(c - G @ out)
+    slack[active] = 0.0
+    return out if (slack <= l1 * (1 + 1e-9) + 1e-12).all() else None
+
+def enet_path(G, c, lambdas, alpha):
+    """
+    Standartlaştırılmış veride (G = XᵀX/n, c = Xᵀy/n) λ yolu boyunca
+    katsayılar (L, F). α = 0 kapalı biçim; aksi halde koordinat inişi, her
+    10 turda aktif küme üzerinde kapalı biçimle kesinleştirme denenir
+    (eşdoğrusal çimento/katkı/S/Ç özelliklerinde iniş yavaş yakınsar).
+    """
+    F = len(c)
+    out = np.zeros((len(lambdas), F))
+    if alpha == 0:
+        eye = np.eye(F)
+        for i, lam in enumerate(lambdas):
+            out[i] = np.linalg.lstsq(G + lam * eye, c, rcond=None)[0] if lam == 0 else np.linalg.solve(G + lam * eye, c)
+        return out
+    w = np.zeros(F)
+    diag = np.diag(G).tolist()
+    Gl = G.tolist()
+    for i, lam in enumerate(lambdas):
+        l1, l2 = lam * alpha, lam * (1 - alpha)
+        wl = w.tolist()
+        g = (c - G @ w).tolist()  # c − Gw, değişen koordinatla güncellenir
+        for it in range(CD_MAX_ITER):
+            delta = 0.0
+            for j in range(F):
+                if diag[j] == 0: continue
+                new = _soft(g[j] + diag[j] * wl[j], l1) / (diag[j] + l2)
+                step = new - wl[j]
+                if step:
+                    col = Gl[j]
+                    for k in range(F):
+                        g[k] -= col[k] * step
+                    wl[j] = new
+                    delta = max(delta, abs(step))
+            if delta < CD_TOL: break
+            if it % 10 == 9:
+                polished = _polish(G, c, l1, l2, np.array(wl))
+                if polished is not None:
+                    wl = polished.tolist()
+                    break
+        w = np.array(wl)
+        out[i] = w
+    return out
+
+def _standardize(X, y):
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Z = (X - mean) / scale
+    return Z, y - y.mean(), mean, scale
+
+def _cv_fold(X, y, test, alphas, lambdas):
+    """
+    Tek kat: (A, L) test SSE'si ve sade EKK SSE'si. X PoolColumns ise ön
+    işleme katın eğitim satırlarıyla kurulur, test satırları sızmaz.
+    """
+    train = np.ones(len(y), bool)
+    train[test] = False
+    if isinstance(X, PoolColumns):
+        X, _ = feature_matrix(X, *fit_preprocessing(_subset(X, train)))
+    Z, yc, mean, scale = _standardize(X[train], y[train])
+    n = len(yc)
+    G, c = Z.T @ Z / n, Z.T @ yc / n
+    Zt = (X[test] - mean) / scale
+    sse = np.zeros((len(alphas), len(lambdas)))
+    for a, alpha in enumerate(alphas):
+        W = enet_path(G, c, lambdas, alpha)
+        pred = Zt @ W.T + y[train].mean()  # (n_test, L)
+        sse[a] = ((pred - y[test][:, None]) ** 2).sum(axis=0)
+    base = len(FEATURES)
+    A = np.c_[X[train][:, :base], np.ones(train.sum())]
+    w = np.linalg.lstsq(A, y[train], rcond=None)[0]
+    ols_sse = float(((np.c_[X[test][:, :base], np.ones(len(test))] @ w - y[test]) ** 2).sum())
+    return sse, ols_sse
+
+def cross_validate(X, y, alphas=DEFAULT_ALPHAS, lambdas=DEFAULT_LAMBDAS, k=5, seed=0, workers=None,
+                   pool_min_rows=POOL_MIN_ROWS):
+    """
+    k-katlı CV. X hazır özellik matrisi ya da (eğitim satırlarına süzülmüş)
+    PoolColumns; ikincisinde ön işleme her katta yeniden öğrenilir.
+    {"rmse": (A, L) ortalama kat RMSE'si, "rmse_std", "ols_rmse", "folds",
+    "pooled"} döner. workers > 1 ve satır sayısı pool_min_rows üzerindeyse katlar
+    işlem havuzunda değerlendirilir.
+    """
+    if not isinstance(X, PoolColumns):
+        X = np.asarray(X, float)
+    y = np.asarray(y, float)
+    k = max(2, min(k, len(y)))
+    folds = np.array_split(np.random.default_rng(seed).permutation(len(y)), k)
+    args = [(X, y, test, tuple(alphas), tuple(lambdas)) for test in folds]
+    pooled = bool(workers and workers > 1 and len(y) >= pool_min_rows)
+    if pooled:
+        with ProcessPoolExecutor(max_workers=min(workers, k)) as pool:
+            results = list(pool.map(_cv_fold, *zip(*args)))
+    else:
+        results = [_cv_fold(*a) for a in args]
+    sizes = np.array([len(t) for t in folds], float)
+    rmse = np.sqrt(np.stack([r[0] for r in results]) / sizes[:, None, None])  # (k, A, L)
+    ols = np.sqrt(np.array([r[1] for r in results]) / sizes)
+    return {"rmse": rmse.mean(axis=0), "rmse_std": rmse.std(axis=0), "ols_rmse": float(ols.mean()), "folds": k,
+            "pooled": pooled}
+
+def _coef_covariance(G, w_std, l2, rss, n, mean, scale):
+    """
+    Ham ölçekte [coeffs, intercept] kovaryansı (ai_model.predict_batch için),
+    σ² ve serbestlik derecesi. Ridge sandviçi σ²/n·H⁻¹GH⁻¹ (H = G + l2·I),
+    elastic-net'te seçilen aktif küme üzerinde (sıfır katsayılar sabit kabul).
+    """
+    F = len(w_std)
+    active = np.flatnonzero(w_std)
+    dof = n - len(active) - 1
+    sigma2 = rss / dof if dof > 0 else 0.0
+    cov_std = np.zeros((F, F))
+    if len(active):
+        Ga = G[np.ix_(active, active)]
+        Hinv = np.linalg.pinv(Ga + l2 * np.eye(len(active)))
+        cov_std[np.ix_(active, active)] = sigma2 / n * Hinv @ Ga @ Hinv
+    cov_c = cov_std / np.outer(scale, scale)
+    cov = np.zeros((F + 1, F + 1))
+    cov[:F, :F] = cov_c
+    # intercept = ȳ − mean·coeffs; ȳ merkezlenmiş katsayılardan bağımsız
+    cov[:F, F] = cov[F, :F] = -cov_c @ mean
+    cov[F, F] = sigma2 / n + mean @ cov_c @ mean
+    return cov, float(sigma2), int(dof)
+
+def fit_strength_model(data, alphas=DEFAULT_ALPHAS, lambdas=DEFAULT_LAMBDAS, k=5, seed=0, workers=None,
+                       pool_min_rows=POOL_MIN_ROWS):
+    """
+    data: kayıt listesi ya da PoolColumns. (α, λ) CV ile seçilir (ön işleme
+    her katın eğitim satırlarından), model tüm geçerli veriyle yeniden kurulur. Yetersiz veride None; aksi halde dict:
+    features, lithologies, fill, coeffs / intercept (ham ölçekte), alpha,
+    lambda, cv_rmse (± cv_rmse_std), ols_cv_rmse, train_rmse, r2, n, folds,
+    cov / sigma2 / dof (tahmin aralığı), grid (alphas, lambdas, rmse tablosu).
+    """
+    cols = _columns(data)
+    mask = training_mask(cols)
+    n = int(mask.sum())
+    if n < max(MIN_SAMPLES, 2 * k):
+        return None
+    cols = _subset(cols, mask)
+    y = cols["d28"]
+
+    cv = cross_validate(cols, y, alphas, lambdas, k, seed, workers, pool_min_rows)
+    lithologies, fill = fit_preprocessing(cols)
+    X, names = feature_matrix(cols, lithologies, fill)
+    a, l = np.unravel_index(np.argmin(cv["rmse"]), cv["rmse"].shape)
+    alpha, lam = float(alphas[a]), float(lambdas[l])
+
+    Z, yc, mean, scale = _standardize(X, y)
+    G, c = Z.T @ Z / n, Z.T @ yc / n
+    # Seçilen λ'ya yol boyunca gelinir (koordinat inişinde sıcak başlangıç)
+    w_std = enet_path(G, c, lambdas[:l + 1], alpha)[-1]
+    coeffs = w_std / scale
+    intercept = float(y.mean() - coeffs @ mean)
+    resid = y - (X @ coeffs + intercept)
+    tss = float(((y - y.mean()) ** 2).sum())
+    cov, sigma2, dof = _coef_covariance(G, w_std, lam * (1 - alpha), float(resid @ resid), n, mean, scale)
+    return {
+        "features": names, "lithologies": lithologies, "fill": fill,
+        "coeffs": coeffs.tolist(), "intercept": intercept, "alpha": alpha, "lambda": lam,
+        "cv_rmse": float(cv["rmse"][a, l]), "cv_rmse_std": float(cv["rmse_std"][a, l]),
+        "ols_cv_rmse": cv["ols_rmse"], "train_rmse": float(np.sqrt((resid ** 2).mean())),
+        "r2": 1 - float(resid @ resid) / tss if tss > 0 else 0.0, "n": n, "folds": cv["folds"],
+        "cov": cov.tolist(), "sigma2": sigma2, "dof": dof,
+        "grid": {"alphas": list(map(float, alphas)), "lambdas": list(map(float, lambdas)), "rmse": cv["rmse"].tolist()},
+    }
+
+def predict_strength_model(model, data, level=None):
+    """
+    Kayıtlar / PoolColumns için tahmin (N,) MPa; negatifler 0'a kırpılır.
+    level verilirse (pred, half): ai_model.predict_batch tahmin aralığıyla.
+    """
+    X, _ = feature_matrix(_columns(data), model["lithologies"], model["fill"])
+    if level is not None:
+        return predict_batch(model, X, level)
+    return np.maximum(0, X @ np.asarray(model["coeffs"]) + model["intercept"])
@@ -1,15 +1,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from logic.constants import MATERIALS
 from logic.engineering import calculate_passing
 
 def render_tab_1(elek_serisi):
     st.subheader("1. Fraksiyonel Deney Verileri (Tartım Esaslı)")
-    materials = ["No:2 (15-25)", "No:1 (5-15)", "K.Kum (0-5)", "D.Kum (0-7)"]
     current_rhos, current_was, current_las, current_mbs, computed_passing, active_mats, all_ri_values = [], [], [], [], {"Elek (mm)": elek_serisi}, [], {}
     
     col_f = st.columns(4)
-    for i, (col, mat) in enumerate(zip(col_f, materials)):
+    for i, (col, mat) in enumerate(zip(col_f, MATERIALS)):
         with col:
             act_k = f"act_{i}"
             is_active = st.checkbox(f"Dahil Et: {mat}", key=act_k)
@@ -28,7 +28,7 @@ def render_tab_1(elek_serisi):
             # Elek verileri
             ri_data = {"Elek": elek_serisi, "Kalan (g)": [0.0]*len(elek_serisi)}
             if 'loaded_ri' in st.session_state:
-                 saved_ri = st.session_state['loaded_ri'].get(mat) or st.session_state['loaded_ri'].get(i)
+                 saved_ri = st.session_state['loaded_ri'].get(mat)
                  if saved_ri and len(saved_ri) == len(elek_serisi): 
                      ri_data["Kalan (g)"] = saved_ri
             
@@ -1,6 +1,7 @@
 import streamlit as st
 from logic.report_generator import generate_kgm_raporu
-from logic.data_manager import veriyi_yukle
+from logic.constants import MATERIALS
+from logic.data_manager import load_project
 import datetime
 
 def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
@@ -8,8 +9,7 @@ def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
     
     # Proje verilerini yükle
     active_p = st.session_state.get('active_plant', 'merkez')
-    all_data = veriyi_yukle(plant_id=active_p)
-    project_data = all_data.get(proje, {})
+    project_data = load_project(active_p, proje) or {}
     
     # Rapor tipi seçimi
     col_r1, col_r2 = st.columns([2, 1])
@@ -127,7 +127,7 @@ def render_tab_3(proje, selected_provider, TS_STANDARDS_CONTEXT):
         
         if project_data and project_data.get("rhos"):
             # Malzeme özellikleri tablosu
-            materials = ["No:2 (15-25)", "No:1 (5-15)", "K.Kum (0-5)", "D.Kum (0-7)"]
+            materials = list(MATERIALS)
             
             material_df = pd.DataFrame({
                 "Malzeme": materials,
@@ -0,0 +1,168 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic import data_manager
+from logic.ai_model import RegressionStats, predict_batch, predict_strength_ai, train_prediction_model
+from logic.pool_columns import PoolColumns
+from logic.storage import JsonStorage
+
+def _records(n, seed=0, ash=True):
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        c, w, a = rng.uniform(250, 450), rng.uniform(150, 200), rng.uniform(0, 60) if ash else 0.0
+        air, adm = rng.uniform(1, 5), rng.uniform(0, 5)
+        d28 = 0.1 * c - 0.12 * w + 0.03 * a - 0.8 * air + 0.4 * adm + 18 + rng.normal(0, 2)
+        out.append({"id": i + 1, "cement": c, "water": w, "ash": a, "air": air, "admixture": adm, "d28": d28})
+    return out
+
+def _lstsq(records):
+    cols = PoolColumns.from_records(records)
+    mask = (cols["d28"] > 0) & (cols["cement"] >= 100) & (cols["water"] >= 50)
+    X = np.column_stack([cols["cement"][mask], cols["water"][mask]] + [cols.filled(k)[mask] for k in ("ash", "air", "admixture")])
+    A = np.c_[X, np.ones(len(X))]
+    y = cols["d28"][mask]
+    w = np.linalg.lstsq(A, y, rcond=None)[0]
+    r2 = 1 - np.sum((y - A @ w) ** 2) / np.sum((y - y.mean()) ** 2)
+    return A, w, r2
+
+def test_matches_lstsq():
+    records = _records(300) + [{"cement": 50, "water": 170, "d28": 30}, {"cement": 350, "water": 170}]
+    A, w, r2 = _lstsq(records)
+    coeffs, intercept, r2_stats = train_prediction_model(records)
+    assert np.allclose(np.append(coeffs, intercept), w, rtol=1e-8, atol=1e-8) and np.isclose(r2_stats, r2)
+    # Kayıt kayıt artımlı == toplu
+    stats = RegressionStats()
+    for r in records:
+        stats.update_records([r])
+    assert stats.seen == 302 and stats.n == 300
+    assert np.allclose(np.append(*stats.solve()[:2]), w) and np.isclose(stats.solve()[2], r2)
+    # Tekil sistem (kül hep 0): tahminler lstsq ile aynı
+    flat = _records(50, seed=1, ash=False)
+    A, w, r2 = _lstsq(flat)
+    coeffs, intercept, r2_stats = train_prediction_model(flat)
+    assert np.allclose(A @ np.append(coeffs, intercept), A @ w) and np.isclose(r2_stats, r2)
+    assert train_prediction_model(_records(4)) == (None, None, 0.0)
+
+def test_merge_and_roundtrip():
+    a, b = _records(40, seed=2), _records(25, seed=3)
+    merged = RegressionStats().update_records(a).merge(RegressionStats().update_records(b))
+    both = RegressionStats().update_records(a + b)
+    assert np.allclose(merged.xtx, both.xtx) and merged.n == both.n == 65
+    restored = RegressionStats.from_dict(merged.to_dict())
+    assert np.allclose(np.append(*restored.solve()[:2]), np.append(*both.solve()[:2]))
+    assert train_prediction_model(restored)[2] == restored.solve()[2]
+
+def test_predict_batch_intervals():
+    records = _records(200, seed=7)
+    A, w, _ = _lstsq(records)
+    y = PoolColumns.from_records(records)["d28"]
+    model = RegressionStats().update_records(records).fit()
+    # Ders kitabı EKK: s²·(AᵀA)⁻¹, t(0.975, n − p)
+    s2 = np.sum((y - A @ w) ** 2) / (len(y) - 6)
+    assert model["dof"] == 194 and np.isclose(model["sigma2"], s2)
+    assert np.allclose(model["cov"], s2 * np.linalg.inv(A.T @ A), rtol=1e-6)
+    X = A[:20, :5]
+    pred, half = predict_batch(model, X)
+    from scipy.stats import t
+    expected = t.ppf(0.975, 194) * np.sqrt(s2 * (1 + np.einsum("ij,jk,ik->i", A[:20], np.linalg.inv(A.T @ A), A[:20])))
+    assert np.allclose(half, expected, rtol=1e-6)
+    assert np.allclose(pred, [predict_strength_ai(model["coeffs"], model["intercept"], x) for x in X])
+    assert (predict_batch(model, X, level=0.8)[1] < half).all()
+    # Yeni dökümlerde ~%95 kapsama
+    fresh = _records(2000, seed=8)
+    cols = PoolColumns.from_records(fresh)
+    Xf = np.column_stack([cols.filled(k) for k in ("cement", "water", "ash", "air", "admixture")])
+    pred, half = predict_batch(model, Xf)
+    assert 0.9 < np.mean(np.abs(cols["d28"] - pred) <= half) < 0.99
+    # Kovaryanssız model: aralık NaN
+    assert np.isnan(predict_batch({"coeffs": model["coeffs"], "intercept": 0.0}, X)[1]).all()
+    assert RegressionStats().update_records(_records(4)).fit() is None
+
+def test_scopes_persisted():
+    previous = data_manager._storage  # varsayılan motoru (data/) oluşturma
+    tmp = tempfile.mkdtemp()
+    try:
+        store = JsonStorage(tmp)
+        data_manager.set_storage(store)
+        recs = _records(30, seed=4)
+        data_manager.veriyi_kaydet("A", {"trials": {}, "qc_history": recs[:10]})
+        data_manager.veriyi_kaydet("B", {"trials": {}, "qc_history": recs[10:20]})
+        proj = data_manager.proje_model_istatistikleri("A")
+        assert proj.n == 10 and os.path.exists(data_manager.get_model_stats_path("merkez"))
+
+        # QC eklemesi kayıtlı istatistiği artımlı günceller
+        for r in recs[20:25]:
+            data_manager.qc_kaydi_ekle("A", r)
+        entries = data_manager.file_cache.read_json(data_manager.get_model_stats_path("merkez"), {})
+        assert entries["A"]["stats"]["n"] == 15
+        history = data_manager.load_project("merkez", "A")["qc_history"]
+        assert np.allclose(data_manager.proje_model_istatistikleri("A").xtx, RegressionStats().update_records(history).xtx)
+
+        # Kayıt silme (veriyi_kaydet): geçmişten yeniden kurulur
+        data_manager.veriyi_kaydet("A", {"trials": {}, "qc_history": history[:-1]})
+        assert data_manager.proje_model_istatistikleri("A").n == 14
+
+        plant = data_manager.santral_model_istatistikleri()
+        assert plant.n == 24 and np.allclose(plant.xty, RegressionStats().update_records(history[:-1] + recs[10:20]).xty)
+
+        # Küresel kapsam: havuzla birlikte artımlı ve diskte
+        store.save_pool(recs[:8])
+        assert data_manager.havuz_istatistikleri().n == 8
+        store.append_pool(recs[8])
+        pool_stats = data_manager.havuz_istatistikleri()
+        assert pool_stats.n == 9 and np.allclose(pool_stats.xtx, RegressionStats().update_records(recs[:9]).xtx)
+        assert os.path.exists(os.path.join(tmp, "ai_training_pool_stats.json"))
+        data_manager._pool_columns = None  # yeni süreç: .npz + istatistik dosyasından
+        assert data_manager.havuz_istatistikleri().n == 9
+    finally:
+        data_manager.set_storage(previous)
+        data_manager._pool_columns = None
+        shutil.rmtree(tmp)
+
+def test_benchmark():
+    records = _records(5000, seed=5)
+    cols = PoolColumns.from_records(records)
+    start = time.perf_counter()
+    train_prediction_model(cols)
+    full = time.perf_counter() - start
+    stats = RegressionStats.from_columns(cols)
+    X = np.random.default_rng(6).uniform(0, 1, (1, 5))
+    start = time.perf_counter()
+    for _ in range(1000):
+        stats.update(X, [30.0])
+    update = (time.perf_counter() - start) / 1000
+    start = time.perf_counter()
+    for _ in range(1000):
+        stats.solve()
+    solve = (time.perf_counter() - start) / 1000
+    print(f"\nModel: tam eğitim (5k) {full * 1e3:.2f} ms | kayıt ekleme {update * 1e6:.1f} µs | çözüm {solve * 1e6:.1f} µs")
+
+    model = stats.fit()
+    recipes = np.random.default_rng(7).uniform([250, 150, 0, 1, 0], [450, 200, 60, 5, 5], (10_000, 5))
+    predict_batch(model, recipes[:1])
+    start = time.perf_counter()
+    for _ in range(20):
+        predict_batch(model, recipes)
+    batch = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for x in recipes[:1000]:
+        predict_strength_ai(model["coeffs"], model["intercept"], x)
+    loop = (time.perf_counter() - start) * 10
+    print(f"Toplu tahmin (10k reçete, aralıklı): {batch * 1e3:.2f} ms ({len(recipes) / batch / 1e3:.0f} reçete/ms) | döngü {loop * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    test_matches_lstsq()
+    test_merge_and_roundtrip()
+    test_predict_batch_intervals()
+    test_scopes_persisted()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
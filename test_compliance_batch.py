@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic.engineering import (
+    CONCRETE_RULES, EXPOSURE_CLASSES, STATUS_NAMES, STATUS_RED, V_EXP_CEM, V_GRADING, W_ASR,
+    compliance_details, compliance_labels, evaluate_compliance_batch, evaluate_mix_compliance,
+)
+
+def _candidates(n, seed=5):
+    rng = np.random.default_rng(seed)
+    classes = list(CONCRETE_RULES) + ["C99/99"]  # tablo dışı sınıf varsayılana düşer
+    exposures = list(EXPOSURE_CLASSES) + ["XZ"]
+    return pd.DataFrame({
+        "class": rng.choice(classes, n),
+        "exposure_class": rng.choice(exposures, n),
+        "wc": rng.uniform(0.35, 0.70, n).round(3),
+        "cement": rng.integers(240, 420, n),
+        "pred_mpa": rng.uniform(20, 65, n).round(1),
+        "asr_status": rng.choice(["Düzeltme Gerekmiyor", "Reaktif (Potansiyel)", "Zararsız"], n),
+        "grading_violation": rng.random(n) < 0.3,
+        "grading_dev": rng.uniform(0, 12, n),
+        "avg_la": rng.uniform(15, 45, n),
+        "avg_mb": rng.uniform(0.2, 2.5, n),
+    })
+
+def test_matches_single_evaluation():
+    df = _candidates(400)
+    batch = evaluate_compliance_batch(df)
+    for i, row in enumerate(df.to_dict("records")):
+        single = evaluate_mix_compliance(row)
+        assert STATUS_NAMES[batch["status"][i]] == single["status"], (i, row)
+        assert bool(batch["flags"][i] & W_ASR) == bool(single["warnings"])
+        n_violations = bin(int(batch["flags"][i]) & ~W_ASR).count("1")
+        assert n_violations == len(single["violations"]), (i, row, single["violations"])
+
+def test_defaults_and_missing_values():
+    # Eksik sütun / boş hücre tekil sürümdeki .get varsayılanı gibi davranır
+    df = pd.DataFrame({"wc": [0.50, np.nan], "cement": [np.nan, 300], "grading_violation": [None, True],
+                       "grading_dev": [8.0, 8.0]})
+    batch = evaluate_compliance_batch(df)
+    assert batch["flags"][0] & V_EXP_CEM and not batch["flags"][0] & V_GRADING
+    assert batch["flags"][1] & V_GRADING
+    details = compliance_details(df, [0, 1])
+    for i in (0, 1):
+        assert STATUS_NAMES[batch["status"][i]] == details[i]["status"]
+    # Sütun sözlüğü ve boş girdi
+    assert evaluate_compliance_batch({"wc": [0.9]})["status"][0] == STATUS_RED
+    empty = evaluate_compliance_batch(pd.DataFrame({"wc": []}))
+    assert len(empty["status"]) == 0 and empty["flags"].dtype == np.uint16
+
+def test_lazy_details_and_labels():
+    df = _candidates(50, seed=9)
+    batch = evaluate_compliance_batch(df)
+    red = np.flatnonzero(batch["status"] == STATUS_RED)[:5]
+    details = compliance_details(df, red)
+    assert set(details) == set(int(i) for i in red)
+    for i, decision in details.items():
+        assert decision == evaluate_mix_compliance(df.iloc[i].to_dict())
+        assert compliance_labels(batch["flags"][i])
+
+def test_benchmark():
+    df = _candidates(20000)
+    records = df.to_dict("records")
+    start = time.perf_counter()
+    for row in records:
+        evaluate_mix_compliance(row)
+    loop = time.perf_counter() - start
+    start = time.perf_counter()
+    evaluate_compliance_batch(df)
+    batch = time.perf_counter() - start
+    print(f"\nUygunluk (20k reçete): tekil döngü {loop * 1e3:.0f} ms | toplu {batch * 1e3:.1f} ms ({loop / batch:.0f}x)")
+
+if __name__ == "__main__":
+    test_matches_single_evaluation()
+    test_defaults_and_missing_values()
+    test_lazy_details_and_labels()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
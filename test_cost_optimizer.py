@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic import cost_optimizer
+from logic.cost_optimizer import clear_cache, optimize_cost
+from logic.design_sweep import recipe_cost, theoretical_mpa
+from logic.engineering import SIEVE_SETS, get_std_limits, proportion_mixes
+
+ELEK = SIEVE_SETS[31.5]
+PASSING = np.array([
+    [100, 92, 40, 8, 2, 1, 1, 1, 1, 0.5, 0.5, 0.4, 0.3],
+    [100, 100, 100, 85, 30, 6, 3, 2, 1.5, 1.2, 1.0, 0.8, 0.6],
+    [100, 100, 100, 100, 100, 99, 80, 58, 40, 27, 17, 10, 6.0],
+    [100, 100, 100, 100, 100, 98, 88, 70, 52, 36, 22, 12, 4.0],
+], dtype=float)
+RHOS = (2.7, 2.7, 2.65, 2.6)
+ARGS = dict(rhos=RHOS, admixture_pct=1.0, air=2.0, ash_range=(0, 60), water_range=(160, 200))
+KEEP = [j for j, s in enumerate(ELEK) if s >= 0.1]
+LO = np.asarray(get_std_limits(31.5, "A (Alt)", ELEK)[0])[KEEP]
+HI = np.asarray(get_std_limits(31.5, "C (Üst)", ELEK)[1])[KEEP]
+
+def _feasible(p, cement, water, ash, limits):
+    blend = np.asarray(p) @ PASSING[:, KEEP] / 100
+    wc = water / (cement + 0.35 * ash)
+    return (wc <= limits["wc"] + 1e-9 and cement >= limits["min_cem"] - 1e-9
+            and (blend >= LO - 1e-6).all() and (blend <= HI + 1e-6).all())
+
+def test_solution_meets_constraints():
+    clear_cache()
+    res = optimize_cost("C35/45", "XD2", PASSING, ELEK, strength_margin=2.0, **ARGS)
+    assert res["status"] == "optimal"
+    lim = res["limits"]
+    assert lim["min_cem"] == 320 and lim["wc"] <= 0.50
+    assert _feasible(res["p"], res["cement"], res["water"], res["ash"], lim)
+    assert 160 - 1e-9 <= res["water"] <= 200 + 1e-9 and res["ash"] <= 60 + 1e-9
+    assert res["pred_mpa"] >= 45 + 2.0 - 1e-6
+    assert np.isclose(res["pred_mpa"], theoretical_mpa(res["wc"], 2.0))
+    # Mutlak hacim ve maliyet dozaj çekirdeğiyle tutarlı
+    mix = proportion_mixes(res["p"], res["cement"], res["water"], res["ash"], 2.0, 1.0, rhos=RHOS)
+    assert np.allclose(mix["m_kg"][0], res["m_kg"])
+    assert np.isclose(recipe_cost(mix, res["cement"], res["water"], res["ash"])[0], res["cost"])
+
+def test_cheaper_than_random_feasible_recipes():
+    res = optimize_cost("C30/37", "XC3", PASSING, ELEK, **ARGS)
+    rng = np.random.default_rng(0)
+    checked = 0
+    for _ in range(4000):
+        p = rng.dirichlet(np.ones(4)) * 100
+        cement, water, ash = rng.uniform(300, 450), rng.uniform(160, 200), rng.uniform(0, 60)
+        if not _feasible(p, cement, water, ash, res["limits"]):
+            continue
+        mix = proportion_mixes(p, cement, water, ash, 2.0, 1.0, rhos=RHOS)
+        assert recipe_cost(mix, cement, water, ash)[0] >= res["cost"] - 1e-6
+        checked += 1
+    assert checked > 20
+
+def test_cement_types_infeasible_and_cache():
+    res = optimize_cost("C30/37", "XC3", PASSING, ELEK, cement_prices={"CEM I 42.5 R": 3.4, "CEM II/A-LL 42.5 R": 3.0}, **ARGS)
+    assert res["cement_type"] == "CEM II/A-LL 42.5 R"
+    # Yalnız iri agrega: gradasyon zarfı sağlanamaz
+    coarse = optimize_cost("C30/37", "XC3", PASSING, ELEK, active=(True, True, False, False), **ARGS)
+    assert coarse["status"] == "infeasible" and coarse["message"]
+    # Aynı girdi: önbellekten, kopya olarak
+    clear_cache()
+    start = time.perf_counter()
+    first = optimize_cost("C25/30", "XC2", PASSING, ELEK, **ARGS)
+    cold = time.perf_counter() - start
+    first["cement"] = -1
+    start = time.perf_counter()
+    again = optimize_cost("C25/30", "XC2", PASSING, ELEK, **ARGS)
+    warm = time.perf_counter() - start
+    assert again["cement"] > 0 and cost_optimizer._cache.stats()["hits"] == 1
+    print(f"\nMaliyet LP: ilk çözüm {cold * 1e3:.2f} ms | önbellek {warm * 1e3:.3f} ms")
+
+if __name__ == "__main__":
+    test_solution_meets_constraints()
+    test_cheaper_than_random_feasible_recipes()
+    test_cement_types_infeasible_and_cache()
+    print("\n✅ ALL TESTS PASSED")
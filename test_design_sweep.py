@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic import design_sweep
+from logic.ai_model import predict_strength_ai
+from logic.design_sweep import evaluate_designs, grid_designs, lhs_designs, sweep, theoretical_mpa
+from logic.engineering import (
+    LITHOLOGY_FACTORS, STATUS_NAMES, calculate_theoretical_mpa, evaluate_mix_compliance, proportion_mixes,
+)
+
+BASE = {
+    "p": (30, 25, 25, 20), "admixture_pct": 1.0, "rhos": (2.7, 2.7, 2.65, 2.6), "was": (0.5, 0.6, 1.2, 1.0),
+    "las": (25, 26, 0, 0), "mbs": (0, 0, 1.0, 0.8), "target_class": "C30/37", "exposure_class": "XC4",
+    "lithology": "Bazalt (Standart)", "site_factor": 0.97,
+    "ai_coeffs": [0.09, -0.12, 0.03, -0.8, 0.4], "ai_intercept": 18.0,
+}
+
+def test_designs():
+    grid = grid_designs({"cement": (300, 400), "water": (160, 180), "ash": 0, "air": 2.0}, steps=11)
+    assert len(grid) == 121 and grid["ash"].eq(0).all() and grid["air"].eq(2.0).all()
+    lhs = lhs_designs(500, seed=3)
+    # Latin hiperküp: her değişkende her katmanda tam bir nokta
+    for var, (lo, hi) in (("cement", (250, 450)), ("water", (140, 200))):
+        strata = np.floor((lhs[var] - lo) / (hi - lo) * 500).astype(int)
+        assert sorted(strata) == list(range(500))
+    assert lhs.equals(lhs_designs(500, seed=3))
+
+def test_matches_single_recipe_functions():
+    df = sweep(BASE, method="lhs", n=200, seed=1)
+    lith = LITHOLOGY_FACTORS[BASE["lithology"]]
+    for row in df.itertuples():
+        wc = row.water / (row.cement + 0.35 * row.ash)
+        assert np.isclose(row.wc, wc)
+        assert np.isclose(row.pred_mpa, calculate_theoretical_mpa(wc, row.air) * BASE["site_factor"] * lith)
+        adm = row.cement * BASE["admixture_pct"] / 100
+        ai = predict_strength_ai(np.array(BASE["ai_coeffs"]), BASE["ai_intercept"],
+                                 np.array([row.cement, row.water, row.ash, row.air, adm]))
+        assert np.isclose(row.ai_mpa, ai)
+        mix = proportion_mixes(BASE["p"], row.cement, row.water, row.ash, row.air, BASE["admixture_pct"],
+                               rhos=BASE["rhos"], las=BASE["las"], mbs=BASE["mbs"])[0]
+        decision = evaluate_mix_compliance({
+            "class": "C30/37", "exposure_class": "XC4", "wc": wc, "cement": row.cement, "pred_mpa": row.pred_mpa,
+            "avg_la": mix["w_la"], "avg_mb": mix["w_mb"],
+        })
+        assert STATUS_NAMES[row.status] == decision["status"]
+    assert np.allclose(theoretical_mpa([0.0, 0.5], [1.0, 3.0]), [0.0, calculate_theoretical_mpa(0.5, 3.0)])
+
+def test_cost_and_pool():
+    df = sweep(BASE, bounds={"cement": (300, 400), "water": 170, "ash": 0, "air": 1.5}, steps=3)
+    # Daha fazla çimento: agrega hacmi azalır ama çimento daha pahalı -> maliyet artar
+    assert df["cost"].is_monotonic_increasing
+    designs = lhs_designs(3000, seed=2)
+    single = evaluate_designs(designs, BASE)
+    limit, design_sweep.POOL_MIN_ROWS = design_sweep.POOL_MIN_ROWS, 0  # küçük girdide de havuzu zorla
+    try:
+        pooled = evaluate_designs(designs, BASE, workers=2, chunk_size=1000)
+    finally:
+        design_sweep.POOL_MIN_ROWS = limit
+    assert single.equals(pooled)
+
+def test_benchmark():
+    sweep(BASE, method="lhs", n=100)
+    start = time.perf_counter()
+    df = sweep(BASE, method="lhs", n=10_000)
+    elapsed = time.perf_counter() - start
+    print(f"\nTarama (10k reçete, tek çekirdek): {elapsed * 1e3:.1f} ms")
+    assert len(df) == 10_000
+
+if __name__ == "__main__":
+    test_designs()
+    test_matches_single_recipe_functions()
+    test_cost_and_pool()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
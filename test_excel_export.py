@@ -0,0 +1,73 @@
+import os
+import sys
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from openpyxl import load_workbook
+
+from logic.storage import ShardedJsonStorage
+from logic.pool_columns import PoolColumns
+from logic.excel_export import export_workbook, build_workbook, trial_gradation
+
+TRIAL = {
+    "cim": 350, "su": 175, "p": [30, 20, 30, 20], "active": [True, True, True, True],
+    "elek": [31.5, 16.0, 4.0, 0.5, 0.063], "m1s": [1000, 1000, 1000, 1000],
+    "ri": {"No:2 (15-25)": [0, 600, 400, 0, 0], "No:1 (5-15)": [0, 100, 800, 100, 0],
+           "K.Kum (0-5)": [0, 0, 100, 600, 250], "D.Kum (0-7)": [0, 0, 200, 500, 250]},
+}
+
+def _project(n_qc):
+    return {"trials": {"Ana Reçete": TRIAL}, "active_trial": "Ana Reçete",
+            "qc_history": [{"date": "2025-09-01", "no": f"N-{i}", "cement": 350, "water": 175,
+                            "d28": 35.0 + i % 5, "predicted_mpa": 37.0} for i in range(n_qc)]}
+
+def test_trial_gradation():
+    elek, fractions, combined = trial_gradation(TRIAL)
+    assert elek == TRIAL["elek"] and list(fractions["No:2 (15-25)"]) == [100, 40, 0, 0, 0]
+    assert combined[0] == 100.0 and abs(combined[1] - (30 * 40 + 20 * 90 + 50 * 100) / 100) < 1e-9
+
+def test_export_workbook_sheets_and_cache():
+    tmp = tempfile.mkdtemp()
+    try:
+        store = ShardedJsonStorage(tmp)
+        store.save_project("merkez", "BETON YOL", _project(3000))
+        store.save_project("merkez", "DİĞER", _project(2))
+        pool = PoolColumns.from_records([{"cement": 350, "water": 170, "d28": 40.0, "date": "2025-09-02"}] * 10)
+        snapshot = {"project_name": "BETON YOL",
+                    "decision": {"status": "GREEN", "title": "UYGUNDUR (KABUL)", "main_msg": "-",
+                                 "violations": [], "warnings": ["ASR"], "rationales": []}}
+
+        data = export_workbook("merkez", "BETON YOL", snapshot=snapshot, pool_cols=pool, store=store)
+        assert export_workbook("merkez", "BETON YOL", snapshot=snapshot, pool_cols=pool, store=store) is data
+        wb = load_workbook(BytesIO(data), read_only=True)
+        assert wb.sheetnames == ["Özet", "Reçete", "Elek Analizi", "Karışım Geçen", "QC Geçmişi", "Havuz", "Uygunluk"]
+        assert len(list(wb["QC Geçmişi"].iter_rows())) == 3001
+        assert len(list(wb["Elek Analizi"].iter_rows())) == 1 + len(TRIAL["elek"])
+        assert len(list(wb["Havuz"].iter_rows())) == 11
+        decision = dict(r for r in wb["Uygunluk"].iter_rows(values_only=True))
+        assert decision["Durum"] == "GREEN" and decision["Uyarı"] == "ASR"
+
+        # Tüm santral: iki proje; veri değişince önbellek yeni dosya üretir
+        plant = load_workbook(BytesIO(export_workbook("merkez", store=store)), read_only=True)
+        assert len(list(plant["QC Geçmişi"].iter_rows())) == 3003
+        store.append_qc_record("merkez", "DİĞER", {"date": "2025-09-03", "no": "X", "d28": 30.0})
+        assert export_workbook("merkez", "BETON YOL", snapshot=snapshot, pool_cols=pool, store=store) is data
+        plant = load_workbook(BytesIO(export_workbook("merkez", store=store)), read_only=True)
+        assert len(list(plant["QC Geçmişi"].iter_rows())) == 3004
+
+        # Native grafikler
+        raw = build_workbook(store, "merkez", pool=pool.columns)
+        charts = [n for n in zipfile.ZipFile(BytesIO(raw)).namelist() if n.startswith("xl/charts/chart")]
+        assert len(charts) == 3
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    test_trial_gradation()
+    test_export_workbook_sheets_and_cache()
+    print("\n✅ ALL TESTS PASSED")
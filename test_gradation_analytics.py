@@ -0,0 +1,143 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic.engineering import SIEVE_SETS, evaluate_mix_compliance
+from logic.gradation_analytics import (
+    compare_trials, gradation_metrics, pad_curves, passing_at, resample_passing, retained_percent, snapshot_gradation,
+    trial_gradation,
+)
+from logic.report_generator import generate_kgm_raporu
+
+ELEK = SIEVE_SETS[31.5]
+
+def _curves(n, sieves, seed=1):
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.uniform(0, 100, (n, len(sieves))), axis=1)[:, ::-1]
+
+def _loop_reference(passing, sieves, cement):
+    # Eski döngülü hesap (elek serisinde 8, 4, 2 ve 0.063 bulunduğunda)
+    retained, prev = [], 100.0
+    for p in passing:
+        retained.append(max(0, prev - p)); prev = p
+    ret_8, ret_2 = 100 - passing[sieves.index(8)], 100 - passing[sieves.index(2)]
+    return {
+        "retained": retained, "filler": passing[sieves.index(0.063)], "sand": passing[sieves.index(4)],
+        "cf": ret_8 / ret_2 * 100 if ret_2 > 0 else 0, "wf": passing[sieves.index(2)] + ((cement - 335) / 55) * 2.5,
+    }
+
+def test_matrix_matches_loop():
+    curves = _curves(200, ELEK)
+    cements = np.linspace(280, 420, 200)
+    metrics = gradation_metrics(curves, ELEK, cements)
+    for i, curve in enumerate(curves):
+        ref = _loop_reference(list(curve), ELEK, cements[i])
+        for key, value in ref.items():
+            assert np.allclose(metrics[key][i], value), key
+
+def test_keyed_by_sieve_value():
+    # 16 mm serisinde 4 mm 3. konumda: eski sabit indeks (6) 0.5 mm'yi okuyordu
+    elek16 = SIEVE_SETS[16.0]
+    curve = _curves(1, elek16, seed=3)
+    assert passing_at(curve, elek16, 4.0)[0] == curve[0, elek16.index(4)]
+    assert passing_at(curve, elek16, 0.063)[0] == curve[0, -1]
+    # Seride olmayan elek: log-doğrusal ara değer; seri dışı uçlar 100 / 0
+    short = [16.0, 4.0, 1.0]
+    p = np.array([[100.0, 50.0, 20.0]])
+    assert np.isclose(passing_at(p, short, 8.0)[0], 75.0)
+    assert np.isclose(passing_at(p, short, 2.0)[0], 35.0)
+    assert passing_at(p, short, 31.5)[0] == 100.0 and passing_at(p, short, 0.063)[0] == 0.0
+    assert np.allclose(retained_percent(p), [[0.0, 50.0, 30.0]])
+
+def test_snapshot_cache():
+    curve = _curves(1, ELEK, seed=4)[0]
+    snap = {"sieves": list(ELEK), "passing": curve.tolist(), "recipe": {"çimento": 350}}
+    first = snapshot_gradation(snap)
+    assert snap["gradation"] is first
+    assert snapshot_gradation(snap) is first  # aynı görüntü: yeniden hesap yok
+    snap["recipe"]["çimento"] = 400
+    second = snapshot_gradation(snap)
+    assert second is not first and np.isclose(second["wf"] - first["wf"], 50 / 55 * 2.5)
+    empty = snapshot_gradation({})
+    assert empty["retained"] == [] and empty["cf"] == 0.0
+
+def test_report_uses_shared_numbers():
+    curve = _curves(1, ELEK, seed=6)[0]
+    mix_data = {"class": "C30/37", "wc": 0.45, "cement": 350, "pred_mpa": 40.0}
+    snap = {"sieves": list(ELEK), "passing": curve.tolist(), "recipe": {"çimento": 350},
+            "mix_data": mix_data, "decision": evaluate_mix_compliance(mix_data)}
+    html = generate_kgm_raporu(snap)
+    grad = snap["gradation"]
+    assert f"%{grad['filler']:.2f}" in html and f"CF: <b>{grad['cf']:.0f}</b>" in html
+
+def _trial(elek, seed):
+    rng = np.random.default_rng(seed)
+    ri = {m: list(rng.uniform(0, 300, len(elek))) for m in ("No:2 (15-25)", "No:1 (5-15)", "K.Kum (0-5)", "D.Kum (0-7)")}
+    return {"elek": list(elek), "p": [30, 20, 30, 20], "m1s": [4000, 4000, 4000, 4000], "ri": ri, "cim": 350}
+
+def test_resample_passing():
+    curves = _curves(50, ELEK, seed=7)
+    # Aynı seri: birebir aynı değerler; alt küme seri: ortak eleklerde birebir
+    assert np.array_equal(resample_passing(curves, ELEK, ELEK), curves)
+    sub = ELEK[2:-2]
+    assert np.array_equal(resample_passing(curves[:, 2:-2], sub, ELEK)[:, 2:-2], curves[:, 2:-2])
+    # Seride olmayan elek: passing_at ile aynı log-doğrusal değer; üstte 100, ölçülmemiş altta NaN
+    short = [16.0, 4.0, 1.0]
+    p = np.array([[100.0, 50.0, 20.0]])
+    out = resample_passing(p, short, [31.5, 8.0, 2.0, 0.063])[0]
+    assert out[0] == 100.0 and np.allclose(out[1:3], [passing_at(p, short, 8.0)[0], passing_at(p, short, 2.0)[0]])
+    assert np.isnan(out[3]) and resample_passing(p, short, [0.063], below=0.0)[0, 0] == 0.0
+    # Ters sıralı seri ve gürültülü (monoton olmayan) ölçüm
+    noisy = np.array([[20.0, 55.0, 50.0, 100.0]])
+    res = resample_passing(noisy, [1.0, 4.0, 8.0, 16.0], ELEK)[0]
+    finite = res[~np.isnan(res)]
+    assert (np.diff(finite) <= 1e-12).all() and res[ELEK.index(8)] == 55.0
+    # Farklı serili eğriler tek çağrıda (NaN dolgulu)
+    sieves, passing = pad_curves([(short, p[0]), (ELEK, curves[0])])
+    both = resample_passing(passing, sieves, ELEK)
+    assert np.array_equal(both[1], curves[0]) and np.allclose(both[0], resample_passing(p, short, ELEK)[0], equal_nan=True)
+
+def test_compare_trials():
+    elek16 = SIEVE_SETS[16.0]
+    trials = {"A": _trial(ELEK, 1), "B": _trial(elek16, 2), "Boş": {"p": [0, 0, 0, 0]}}
+    names, matrix = compare_trials(trials, ELEK)
+    assert names == ["A", "B"] and matrix.shape == (2, len(ELEK))
+    assert np.array_equal(matrix[0], trial_gradation(trials["A"])[2])
+    # 16 mm serisinin tüm elekleri 31.5 serisinde var: birebir eşleşir, büyük elekler 100
+    combined = trial_gradation(trials["B"])[2]
+    assert np.array_equal(matrix[1, 3:], combined) and (matrix[1, :3] == 100.0).all()
+    # Elek serisi olmayan eski deneme hedef seriyi kullanır
+    legacy = dict(_trial(ELEK, 3)); legacy.pop("elek")
+    assert np.array_equal(compare_trials({"L": legacy}, ELEK)[1][0], trial_gradation(_trial(ELEK, 3))[2])
+    # Reçete alanı değişse de gradasyon önbellekten gelir; ri değişirse yeniden hesaplanır
+    trials["A"]["cim"] = 400
+    assert np.array_equal(compare_trials(trials, ELEK)[1], matrix)
+    trials["A"]["ri"]["No:2 (15-25)"][3] += 500
+    assert not np.array_equal(compare_trials(trials, ELEK)[1][0], matrix[0])
+
+def test_resample_benchmark():
+    trials = {f"T{i}": _trial(ELEK if i % 2 else SIEVE_SETS[16.0], i) for i in range(200)}
+    compare_trials(trials, ELEK)
+    start = time.perf_counter()
+    compare_trials(trials, ELEK)
+    warm = time.perf_counter() - start
+    curves = _curves(200, ELEK, seed=8)
+    start = time.perf_counter()
+    resample_passing(curves, ELEK, SIEVE_SETS[16.0])
+    vec = time.perf_counter() - start
+    print(f"\nKarşılaştırma (200 deneme, önbellekli): {warm * 1e3:.2f} ms | yeniden örnekleme {vec * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    test_matrix_matches_loop()
+    test_keyed_by_sieve_value()
+    test_snapshot_cache()
+    test_report_uses_shared_numbers()
+    test_resample_passing()
+    test_compare_trials()
+    test_resample_benchmark()
+    print("\n✅ ALL TESTS PASSED")
@@ -0,0 +1,133 @@
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic.constants import MATERIALS
+from logic.engineering import SIEVE_SETS, optimize_mix
+from logic.gradation_solver import project_feasible, solve_gradation
+
+
+def _random_problem(rng, m=15, n=4):
+    A = np.sort(rng.uniform(0, 100, (m, n)), axis=0)[::-1]
+    t = np.sort(rng.uniform(0, 100, m))[::-1]
+    lo = np.where(rng.random(n) < 0.3, rng.uniform(0, 30, n), 0.0)
+    hi = np.where(rng.random(n) < 0.3, rng.uniform(40, 100, n), 100.0)
+    return A, t, lo, hi, rng.uniform(0.1, 5.0, m)
+
+def _brute_force(A, t, lo, hi, w, total=100.0):
+    # Her değişken için {alt, üst, serbest} durumlarını dene; en iyi uygun KKT noktası
+    n = A.shape[1]
+    Aw = A / total
+    best = (np.inf, None)
+    for states in itertools.product((-1, 0, 1), repeat=n):
+        free = [i for i in range(n) if states[i] == 0]
+        x = np.where(np.array(states) < 0, lo, hi).astype(float)
+        if free:
+            fixed_sum = sum(x[i] for i in range(n) if states[i])
+            H = Aw[:, free].T @ (Aw[:, free] * w[:, None])
+            r = t - Aw @ np.where(np.array(states) == 0, 0.0, x)
+            g = Aw[:, free].T @ (w * r)
+            k = len(free)
+            kkt = np.ones((k + 1, k + 1)); kkt[:k, :k] = H; kkt[k, k] = 0.0
+            try:
+                sol = np.linalg.solve(kkt, np.append(g, total - fixed_sum))
+            except np.linalg.LinAlgError:
+                continue
+            x[free] = sol[:k]
+        if abs(x.sum() - total) > 1e-6 or (x < lo - 1e-7).any() or (x > hi + 1e-7).any():
+            continue
+        cost = float(w @ (A @ x / total - t) ** 2)
+        if cost < best[0]:
+            best = (cost, x)
+    return best
+
+def test_projection():
+    lo, hi = np.array([0.0, 0.0, 0.25, 0.0]), np.ones(4)
+    x = project_feasible([2.0, -1.0, 0.0, 0.3], lo, hi)
+    assert abs(x.sum() - 1.0) < 1e-12 and (x >= lo).all() and (x <= hi).all()
+    assert x[2] == 0.25 and x[1] == 0.0
+    try:
+        project_feasible([0.5, 0.5], [0.6, 0.6], [1, 1])
+        assert False, "uygun olmayan sınırlar ValueError vermeli"
+    except ValueError:
+        pass
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(7)
+    checked = 0
+    for _ in range(200):
+        A, t, lo, hi, w = _random_problem(rng)
+        if lo.sum() > 100 or hi.sum() < 100:
+            continue
+        res = solve_gradation(A, t, lo, hi, weights=w)
+        ref_cost, _ = _brute_force(A, t, lo, hi, w)
+        x = res["x"]
+        assert res["method"] == "active-set"
+        assert abs(x.sum() - 100.0) < 1e-8 and (x >= lo - 1e-9).all() and (x <= hi + 1e-9).all()
+        assert res["cost"] <= ref_cost * (1 + 1e-9) + 1e-9, (res["cost"], ref_cost)
+        checked += 1
+    assert checked > 100
+
+def test_deterministic_and_warm_start():
+    rng = np.random.default_rng(3)
+    A, t, _, _, w = _random_problem(rng)
+    lo, hi = [0, 0, 25, 0], [100] * 4
+    cold = solve_gradation(A, t, lo, hi, weights=w)
+    again = solve_gradation(A, t, lo, hi, weights=w)
+    assert np.array_equal(cold["x"], again["x"])
+    for start in ([40, 30, 20, 10], [0, 0, 0, 0], [100, 0, 0, 0], cold["x"]):
+        warm = solve_gradation(A, t, lo, hi, weights=w, x0=start)
+        assert np.allclose(warm["x"], cold["x"], atol=1e-7)
+    # Optimumdan başlayınca tek iterasyonda durur
+    assert solve_gradation(A, t, lo, hi, weights=w, x0=cold["x"])["iterations"] <= 2
+
+def test_sieve_weights():
+    # İki elek, iki malzeme: ağırlığı büyük eleğin hedefi tutturulur
+    A = np.array([[100.0, 0.0], [100.0, 100.0]])
+    t = np.array([70.0, 50.0])
+    heavy_first = solve_gradation(A, t, [0, 0], [100, 100], weights=[100.0, 1.0])["x"]
+    heavy_second = solve_gradation(A, t, [0, 0], [100, 100], weights=[1.0, 100.0])["x"]
+    assert abs(heavy_first[0] - 70.0) < 1.0
+    assert heavy_second[0] < heavy_first[0]
+
+def test_optimize_mix():
+    elek = SIEVE_SETS[31.5]
+    rng = np.random.default_rng(11)
+    passing = {m: list(np.sort(rng.uniform(0, 100, len(elek)))[::-1]) for m in MATERIALS}
+    passing[MATERIALS[0]][0] = 100.0
+    p = optimize_mix("B (İdeal)", 31.5, [True] * 4, passing, elek, MATERIALS)
+    assert abs(sum(p) - 100.0) < 1e-8 and p[2] >= 25.0 and p[3] >= 25.0
+    warm = optimize_mix("B (İdeal)", 31.5, [True] * 4, passing, elek, MATERIALS, warm_start=[30, 20, 25, 25])
+    assert np.allclose(p, warm, atol=1e-7)
+    assert optimize_mix("B (İdeal)", 31.5, [False] * 4, passing, elek, MATERIALS) is None
+
+def test_benchmark():
+    rng = np.random.default_rng(0)
+    problems = [_random_problem(rng)[:2] for _ in range(200)]
+    lo, hi = np.array([0, 0, 25, 0.0]), np.full(4, 100.0)
+    start = time.perf_counter()
+    for A, t in problems:
+        solve_gradation(A, t, lo, hi)
+    fast = (time.perf_counter() - start) / len(problems) * 1e6
+    start = time.perf_counter()
+    for A, t in problems:
+        minimize(lambda x: np.sum((A @ x / 100 - t) ** 2), np.full(4, 25.0), method="SLSQP",
+                 bounds=list(zip(lo, hi)), constraints=[{"type": "eq", "fun": lambda x: x.sum() - 100}])
+    slsqp = (time.perf_counter() - start) / len(problems) * 1e6
+    print(f"\nGradasyon çözücü: aktif küme {fast:.0f} µs | SLSQP {slsqp:.0f} µs ({slsqp / fast:.1f}x)")
+
+if __name__ == "__main__":
+    test_projection()
+    test_matches_brute_force()
+    test_deterministic_and_warm_start()
+    test_sieve_weights()
+    test_optimize_mix()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic.constants import MATERIALS
+from logic.engineering import SIEVE_SETS, optimize_mix, proportion_mixes, proportion_mixes_cached
+from logic.memo import LRUMemo, memo_stats, memoize, stable_hash
+
+ELEK = SIEVE_SETS[31.5]
+
+def test_stable_hash():
+    a = stable_hash(active=[True, False], passing={"x": [1.0, 2.0], "y": [3.0]}, dmax=31.5)
+    b = stable_hash(dmax=31.5, passing={"y": [3.0], "x": [1.0, 2.0]}, active=(True, False))
+    assert a == b
+    assert stable_hash(np.float64(2.5), np.int64(3)) == stable_hash(2.5, 3)
+    arr = np.arange(12, dtype=float).reshape(3, 4)
+    assert stable_hash(arr) == stable_hash(arr.copy())
+    assert stable_hash(arr) != stable_hash(arr.reshape(4, 3))
+    assert stable_hash(arr) != stable_hash(arr.astype(np.float32))
+    assert stable_hash(dmax=31.5) != stable_hash(dmax=22.4)
+
+def test_lru_bound_and_stats():
+    memo = LRUMemo("test_lru", maxsize=3)
+    for k in "abc":
+        memo.put(k, k.upper())
+    assert memo.get("a") == "A"  # a en yeni olur
+    memo.put("d", "D")
+    assert "b" not in memo and len(memo) == 3
+    assert memo.get("zz") is None
+    stats = memo_stats()["test_lru"]
+    assert stats == {"hits": 1, "misses": 1, "entries": 3, "max_entries": 3, "hit_rate": 0.5}
+
+def test_memoize_copies_and_threads():
+    calls = []
+
+    @memoize("test_fn", maxsize=8)
+    def f(x, scale=1.0):
+        calls.append(x)
+        return {"values": np.asarray(x, float) * scale}
+
+    first = f([1, 2, 3])
+    first["values"][0] = -1
+    assert f([1, 2, 3])["values"].tolist() == [1.0, 2.0, 3.0]
+    assert f([1, 2, 3], scale=2.0)["values"].tolist() == [2.0, 4.0, 6.0]
+    assert len(calls) == 2
+
+    # Oturumlar (thread'ler) aynı süreç önbelleğini paylaşır
+    threads = [threading.Thread(target=lambda: [f([1, 2, 3]) for _ in range(50)]) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(calls) == 2 and f.memo.stats()["hits"] == 201
+
+def test_optimize_mix_and_proportioning_memo():
+    rng = np.random.default_rng(11)
+    passing = {m: list(np.sort(rng.uniform(0, 100, len(ELEK)))[::-1]) for m in MATERIALS}
+    optimize_mix.memo.clear()
+    p = optimize_mix("B (İdeal)", 31.5, [True] * 4, passing, ELEK, MATERIALS)
+    p[0] = -1
+    again = optimize_mix("B (İdeal)", 31.5, [True] * 4, passing, ELEK, MATERIALS)
+    assert again[0] >= 0 and optimize_mix.memo.stats()["hits"] == 1
+    assert optimize_mix("B (İdeal)", 31.5, [False] * 4, passing, ELEK, MATERIALS) is None
+    assert optimize_mix("B (İdeal)", 31.5, [False] * 4, passing, ELEK, MATERIALS) is None
+
+    matrix = np.array([passing[m] for m in MATERIALS])
+    args = ([30, 25, 25, 20], 350, 180, 0, 1.5, 1.0)
+    kw = dict(rhos=[2.7, 2.7, 2.65, 2.6], active=[True] * 4, passing=matrix, sieves=ELEK)
+    cached = proportion_mixes_cached(*args, **kw)
+    assert cached.dtype == proportion_mixes(*args, **kw).dtype
+    assert np.array_equal(cached, proportion_mixes(*args, **kw))
+    assert np.array_equal(proportion_mixes_cached(*args, **kw), cached)
+
+def test_benchmark():
+    rng = np.random.default_rng(0)
+    passing = {m: list(np.sort(rng.uniform(0, 100, len(ELEK)))[::-1]) for m in MATERIALS}
+    optimize_mix.memo.clear()
+    start = time.perf_counter()
+    optimize_mix("A (Alt)", 31.5, [True] * 4, passing, ELEK, MATERIALS)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(100):
+        optimize_mix("A (Alt)", 31.5, [True] * 4, passing, ELEK, MATERIALS)
+    warm = (time.perf_counter() - start) / 100
+    print(f"\noptimize_mix: ilk çağrı {cold * 1e6:.0f} µs | önbellek {warm * 1e6:.0f} µs "
+          f"| isabet oranı {optimize_mix.memo.stats()['hit_rate']:.2f}")
+    assert optimize_mix.memo.stats()["misses"] == 1 and optimize_mix.memo.stats()["hits"] == 100
+
+if __name__ == "__main__":
+    test_stable_hash()
+    test_lru_bound_and_stats()
+    test_memoize_copies_and_threads()
+    test_optimize_mix_and_proportioning_memo()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
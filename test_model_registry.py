@@ -0,0 +1,135 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic import data_manager, model_registry
+from logic.ai_model import FEATURES, RegressionStats, train_prediction_model
+from logic.sqlite_storage import SQLiteStorage
+from logic.storage import JsonStorage
+
+def _records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"cement": float(c), "water": float(w), "ash": 0.0, "air": float(a), "admixture": 2.0,
+             "d28": float(0.1 * c - 0.15 * w - a + 20 + rng.normal(0, 1))}
+            for c, w, a in zip(rng.uniform(250, 450, n), rng.uniform(150, 200, n), rng.uniform(1, 4, n))]
+
+def registry_file(model):
+    return f"model_{model['fingerprint']['hash'][:16]}_{model['fingerprint']['count']}.json"
+
+def _with_store(make, body):
+    previous = data_manager._storage  # varsayılan motoru (data/) oluşturma
+    tmp = tempfile.mkdtemp()
+    try:
+        store = make(tmp)
+        data_manager.set_storage(store)
+        data_manager._pool_columns = None
+        body(store, tmp)
+        if isinstance(store, SQLiteStorage): store.close()
+    finally:
+        data_manager.set_storage(previous)
+        data_manager._pool_columns = None
+        shutil.rmtree(tmp)
+
+def test_fingerprint_incremental_equals_full():
+    def body(store, tmp):
+        recs = _records(12)
+        store.save_pool(recs[:10])
+        first = data_manager.havuz_parmak_izi()
+        assert first["count"] == 10 and data_manager.havuz_parmak_izi() == first
+        for r in recs[10:]:
+            store.append_pool(r)
+        incremental = data_manager.havuz_parmak_izi()
+        data_manager._pool_columns = None
+        os.remove(os.path.join(os.path.dirname(store.pool_columns_path()), "ai_training_pool_stats.json"))
+        assert data_manager.havuz_parmak_izi() == incremental != first
+        # Aynı sayıda ama farklı içerik: farklı özet
+        store.save_pool(recs[:11] + [dict(recs[11], d28=1.0)])
+        changed = data_manager.havuz_parmak_izi()
+        assert changed["count"] == 12 and changed["hash"] != incremental["hash"]
+    _with_store(JsonStorage, body)
+    _with_store(lambda d: SQLiteStorage(os.path.join(d, "beton.db")), body)
+
+def test_registry_versions_and_rollback():
+    def body(store, tmp):
+        store.save_pool(_records(20))
+        m1 = data_manager.havuz_modeli()
+        assert m1["version"] == 1 and m1["features"] == list(FEATURES) and m1["fingerprint"]["count"] == 20
+        c, i, r2 = train_prediction_model(store.load_pool())
+        assert np.allclose(m1["coeffs"], c) and np.isclose(m1["intercept"], i) and np.isclose(m1["r2"], r2)
+        assert os.path.exists(os.path.join(tmp, "models", "index.json"))
+        assert np.allclose(m1["cov"], RegressionStats().update_records(store.load_pool()).fit()["cov"])
+        # Kovaryanssız eski biçim: aynı sürüm dosyası yerinde yükseltilir
+        path = os.path.join(tmp, "models", registry_file(m1))
+        legacy = {k: v for k, v in data_manager.file_cache.read_json(path, {}).items() if k not in ("cov", "sigma2", "dof")}
+        model_registry.atomic_write_json(path, legacy)
+        upgraded = data_manager.havuz_modeli()
+        assert upgraded["version"] == 1 and "cov" in upgraded
+        # Havuz değişmedi: yeniden eğitim yok
+        assert data_manager.havuz_modeli()["version"] == 1
+        store.append_pool(_records(1, seed=9)[0])
+        m2 = data_manager.havuz_modeli()
+        assert m2["version"] == 2 and m2["n"] == 21
+
+        registry = data_manager.model_registry()
+        assert [v["version"] for v in registry.versions()] == [1, 2]
+        assert registry.rollback(1) and not registry.rollback(99)
+        store.append_pool(_records(1, seed=10)[0])
+        pinned = data_manager.havuz_modeli()
+        assert pinned["version"] == 1 and pinned["pinned"] and len(registry.versions()) == 2
+        registry.unpin()
+        assert data_manager.havuz_modeli()["version"] == 3
+        # Aynı veriye dönülürse eski sürüm yeniden kullanılır (kopya sürüm yok)
+        registry.rollback(2)
+        registry.unpin()
+        store.save_pool(_records(20))
+        assert data_manager.havuz_modeli()["version"] == 1 and len(registry.versions()) == 3
+
+        # Yetersiz veri: model yok, kayıt defteri değişmez
+        store.save_pool(_records(3))
+        assert data_manager.havuz_modeli()["version"] == 1
+    _with_store(JsonStorage, body)
+
+def test_version_cap():
+    tmp = tempfile.mkdtemp()
+    limit, model_registry.MAX_VERSIONS = model_registry.MAX_VERSIONS, 3
+    try:
+        registry = model_registry.ModelRegistry(tmp)
+        recs = _records(30)
+        for k in range(5):
+            registry.register(RegressionStats().update_records(recs[:10 + k]), {"hash": f"{k:040x}", "count": 10 + k})
+        assert [v["version"] for v in registry.versions()] == [3, 4, 5]
+        assert len([f for f in os.listdir(tmp) if f.startswith("model_")]) == 3
+        assert registry.load(1) is None and registry.load()["n"] == 14
+    finally:
+        model_registry.MAX_VERSIONS = limit
+        shutil.rmtree(tmp)
+
+def test_benchmark():
+    def body(store, tmp):
+        store.save_pool(_records(5000))
+        data_manager.havuz_modeli()
+        start = time.perf_counter()
+        for _ in range(100):
+            data_manager.havuz_modeli()
+        cached = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        train_prediction_model(store.load_pool())
+        retrain = time.perf_counter() - start
+        print(f"\nHavuz modeli (5k kayıt): kayıt defterinden {cached * 1e3:.3f} ms | yeniden eğitim {retrain * 1e3:.1f} ms")
+        # Tekrarlı çağrılar kayıt defterindeki sürümü kullanır, yeniden kaydetmez
+        assert [v["version"] for v in data_manager.model_registry().versions()] == [1]
+    _with_store(JsonStorage, body)
+
+if __name__ == "__main__":
+    test_fingerprint_incremental_equals_full()
+    test_registry_versions_and_rollback()
+    test_version_cap()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
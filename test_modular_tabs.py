@@ -0,0 +1,87 @@
+import ast
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic import data_manager, modular_tabs
+from logic.pool_columns import PoolColumns
+from logic.storage import JsonStorage
+
+POOL = [{"cement": 350 + i, "water": 170 + i % 5, "ash": 0, "air": 1.5, "admixture": 3.0, "d28": 35.0 + i * 0.1}
+        for i in range(30)]
+
+def _fake_st():
+    """Düğmeler basılmamış, kolonlar istenen sayıda dönen sahte streamlit."""
+    st = mock.MagicMock()
+    st.columns.side_effect = lambda spec, **kw: [mock.MagicMock() for _ in range(spec if isinstance(spec, int) else len(spec))]
+    st.button.return_value = False
+    st.checkbox.return_value = False
+    return st
+
+def _render_tab_5(calls):
+    st = _fake_st()
+    with mock.patch.object(modular_tabs, "st", st), \
+         mock.patch.object(modular_tabs, "havuz_sutunlari", lambda: calls.append("havuz_sutunlari") or PoolColumns.from_records(POOL)), \
+         mock.patch.object(modular_tabs, "havuz_yukle", lambda readonly=False: calls.append("havuz_yukle") or POOL), \
+         mock.patch.object(modular_tabs, "get_corp_performance_stats", pd.DataFrame):
+        modular_tabs.render_tab_5(is_admin=True)
+    return st
+
+def test_no_shadowed_definitions():
+    # Aynı adla ikinci tanım ilkini sessizce gölgeler (eski render_tab_5 hatası)
+    with open(modular_tabs.__file__, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = [n.name for n in tree.body if isinstance(n, ast.FunctionDef)]
+    assert sorted(n for n in set(names) if names.count(n) > 1) == []
+
+def test_tab_5_pool_panel_reads_columns():
+    calls = []
+    with mock.patch.object(modular_tabs, "havuz_modeli", lambda: None):
+        st = _render_tab_5(calls)
+    # İstatistikler kolon görünümünden; tam liste yalnızca tablo için bir kez okunur
+    assert calls == ["havuz_sutunlari", "havuz_yukle"]
+    assert mock.call("Toplam Tecrübe", 30) in st.metric.call_args_list
+
+def test_tab_5_pool_panel_uses_regression_model():
+    calls = []
+    model = {"r2": 0.8123, "version": 3, "n": 30}
+    with mock.patch.object(modular_tabs, "havuz_modeli", lambda: calls.append("havuz_modeli") or model):
+        st = _render_tab_5(calls)
+    assert calls.count("havuz_modeli") == 1
+    assert mock.call("AI Tahmin Hassasiyeti (R²)", "%81.2") in st.metric.call_args_list
+
+def test_tab_5_pool_model_from_registry():
+    previous = data_manager._storage  # varsayılan motoru (data/) oluşturma
+    tmp = tempfile.mkdtemp()
+    try:
+        data_manager.set_storage(JsonStorage(tmp))
+        data_manager._pool_columns = None
+        data_manager.havuz_kaydet(POOL)
+        st = _fake_st()
+        with mock.patch.object(modular_tabs, "st", st), \
+             mock.patch.object(modular_tabs, "get_corp_performance_stats", pd.DataFrame):
+            modular_tabs.render_tab_5(is_admin=True)
+            modular_tabs.render_tab_5(is_admin=True)
+        # Sekme kayıt defterindeki modeli gösterir; tekrar çizim yeniden kaydetmez
+        registry = data_manager.model_registry()
+        assert [v["version"] for v in registry.versions()] == [1]
+        shown = f"%{registry.load()['r2'] * 100:.1f}"
+        assert st.metric.call_args_list.count(mock.call("AI Tahmin Hassasiyeti (R²)", shown)) == 2
+    finally:
+        data_manager.set_storage(previous)
+        data_manager._pool_columns = None
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    test_no_shadowed_definitions()
+    test_tab_5_pool_panel_reads_columns()
+    test_tab_5_pool_panel_uses_regression_model()
+    test_tab_5_pool_model_from_registry()
+    print("\n✅ ALL TESTS PASSED")
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic.engineering import SIEVE_SETS, blend_passing, proportion_mixes
+
+ELEK = SIEVE_SETS[31.5]
+PASSING = np.array([
+    [100, 92, 40, 8, 2, 1, 1, 1, 1, 0.5, 0.5, 0.4, 0.3],
+    [100, 100, 100, 85, 30, 6, 3, 2, 1.5, 1.2, 1.0, 0.8, 0.6],
+    [100, 100, 100, 100, 100, 99, 80, 58, 40, 27, 17, 10, 6.0],
+    [100, 100, 100, 100, 100, 98, 88, 70, 52, 36, 22, 12, 4.0],
+], dtype=float)
+
+def _legacy(p, cimento, su_hedef, ucucu_kul, hava_yuzde, katki, rhos, was, moists, las, mbs, active, passing, elek_serisi):
+    # render_tab_2 içindeki eski satır içi hesap (altın referans)
+    p1, p2, p3, p4 = p
+    karisim_gecen = np.zeros(len(elek_serisi))
+    for i, pp in enumerate(p):
+        if active[i]: karisim_gecen += passing[i] * pp / 100.0
+    total_ratio = 100
+    w_la = (las[0]*p1 + las[1]*p2 + las[2]*p3 + las[3]*p4) / total_ratio
+    w_mb = (mbs[0]*p1 + mbs[1]*p2 + mbs[2]*p3 + mbs[3]*p4) / total_ratio
+    vol_cem = cimento / 3.15
+    vol_water = su_hedef / 1.0
+    vol_ash = ucucu_kul / 2.25
+    vol_air = hava_yuzde * 10
+    vol_chem = (cimento * katki / 100) / 1.12
+    V_agg_tot = 1000 - (vol_cem + vol_water + vol_ash + vol_air + vol_chem)
+    m_kgs = [V_agg_tot * (pp/100) * r for pp, r in zip(p, rhos)]
+    total_agg_kg = sum(m_kgs)
+    weighted_wa = (was[0]*p1 + was[1]*p2 + was[2]*p3 + was[3]*p4) / total_ratio
+    wa_liters = (weighted_wa / 100) * total_agg_kg
+    idx_filler = elek_serisi.index(0.063) if 0.063 in elek_serisi else (12 if len(karisim_gecen) > 12 else -1)
+    idx_sand = elek_serisi.index(4.0) if 4.0 in elek_serisi else (6 if len(karisim_gecen) > 6 else -1)
+    filler_val = karisim_gecen[idx_filler] if idx_filler != -1 else 0.0
+    sand_val = karisim_gecen[idx_sand] if idx_sand != -1 else 0.0
+    retained = []
+    prev_p = 100.0
+    for pp in karisim_gecen:
+        retained.append(max(0, prev_p - pp))
+        prev_p = pp
+    idx_8 = elek_serisi.index(8.0) if 8.0 in elek_serisi else 4
+    idx_2 = elek_serisi.index(2.0) if 2.0 in elek_serisi else 7
+    ret_above_8 = 100 - (karisim_gecen[idx_8] if len(karisim_gecen) > idx_8 else 0)
+    ret_above_2 = 100 - (karisim_gecen[idx_2] if len(karisim_gecen) > idx_2 else 0)
+    cf = (ret_above_8 / ret_above_2 * 100) if ret_above_2 > 0 else 0
+    wf = (karisim_gecen[idx_2] + ((cimento - 335) / 55) * 2.5) if len(karisim_gecen) > idx_2 else 0
+    su_farklar = [m_kgs[i] * (was[i] - moists[i]) / 100.0 for i in range(4) if active[i]]
+    m_kantar = [m_kgs[i] * (1 + (moists[i] - was[i]) / 100.0) if active[i] else 0.0 for i in range(4)]
+    return {
+        "vol_agg": V_agg_tot, "m_kg": m_kgs, "total_agg_kg": total_agg_kg, "weighted_wa": weighted_wa,
+        "wa_liters": wa_liters, "water_correction": sum(su_farklar), "batch_water": su_hedef + sum(su_farklar),
+        "m_batch": m_kantar, "moist_water": sum(m_kgs[i] * (moists[i] / 100.0) for i in range(4) if active[i]),
+        "w_la": w_la, "w_mb": w_mb, "passing": karisim_gecen, "retained": retained,
+        "filler": filler_val, "sand": sand_val, "cf": cf, "wf": wf,
+    }
+
+def _random_inputs(rng):
+    p = rng.dirichlet(np.ones(4)) * 100
+    active = rng.random(4) < 0.85
+    return dict(
+        p=p, cimento=rng.uniform(250, 450), su_hedef=rng.uniform(150, 200), ucucu_kul=rng.choice([0.0, 40.0]),
+        hava_yuzde=rng.uniform(1, 6), katki=rng.uniform(0, 2), rhos=rng.uniform(2.5, 2.8, 4),
+        was=rng.uniform(0.3, 2.0, 4), moists=rng.uniform(0, 5, 4), las=rng.uniform(15, 40, 4),
+        mbs=rng.uniform(0.2, 2.0, 4), active=active, passing=PASSING, elek_serisi=ELEK,
+    )
+
+def _kernel(inp):
+    return proportion_mixes(
+        inp["p"], inp["cimento"], inp["su_hedef"], inp["ucucu_kul"], inp["hava_yuzde"], inp["katki"],
+        rhos=inp["rhos"], was=inp["was"], moists=inp["moists"], las=inp["las"], mbs=inp["mbs"],
+        active=inp["active"], passing=np.where(np.asarray(inp["active"])[:, None], inp["passing"], 0.0),
+        sieves=inp["elek_serisi"],
+    )[0]
+
+def test_golden_single_recipe():
+    out = proportion_mixes([30, 25, 25, 20], 350, 180, 0, 1.5, 1.0, rhos=[2.7, 2.7, 2.65, 2.6],
+                           was=[0.5, 0.6, 1.2, 1.0], moists=[0.2, 0.3, 3.0, 2.0], las=[25, 26, 0, 0],
+                           mbs=[0, 0, 1.0, 0.8], passing=PASSING, sieves=ELEK)[0]
+    assert abs(out["vol_agg"] - 690.7638888888889) < 1e-9
+    assert np.allclose(out["m_kg"], [559.51875, 466.265625, 457.63107639, 359.19722222])
+    assert abs(out["batch_water"] - 171.24802152777778) < 1e-9
+    assert abs(out["wa_liters"] - 14.74090138888889) < 1e-9
+    assert abs(out["wc_eff"] - 180 / 350) < 1e-12
+    assert abs(out["w_la"] - 14.0) < 1e-12 and abs(out["w_mb"] - 0.41) < 1e-12
+
+def test_matches_legacy_inline_code():
+    rng = np.random.default_rng(2)
+    for _ in range(300):
+        inp = _random_inputs(rng)
+        ref, out = _legacy(**inp), _kernel(inp)
+        for key, value in ref.items():
+            assert np.allclose(out[key], value, rtol=1e-12, atol=1e-9), (key, out[key], value)
+
+def test_short_series_and_batch():
+    # Kısa seri: sabit indeks düşüşleri (filler yok, CF/WF eski varsayılanlar)
+    short = [16.0, 8.0, 4.0, 2.0, 1.0]
+    inp = _random_inputs(np.random.default_rng(4))
+    inp.update(passing=PASSING[:, [4, 5, 6, 7, 8]], elek_serisi=short)
+    ref, out = _legacy(**inp), _kernel(inp)
+    for key, value in ref.items():
+        assert np.allclose(out[key], value), key
+    # N reçete tek çağrıda; bağlayıcı vektör, malzeme özellikleri ortak
+    fractions = np.random.default_rng(5).dirichlet(np.ones(4), 1000) * 100
+    batch = proportion_mixes(fractions, np.linspace(250, 450, 1000), 180, passing=PASSING, sieves=ELEK)
+    assert batch.shape == (1000,) and batch["passing"].shape == (1000, len(ELEK))
+    assert np.allclose(batch["passing"], blend_passing(fractions, PASSING))
+    assert proportion_mixes(fractions[:2], 300, 180)["passing"].shape == (2, 0)
+
+def test_benchmark():
+    rng = np.random.default_rng(0)
+    inputs = [_random_inputs(rng) for _ in range(2000)]
+    start = time.perf_counter()
+    for inp in inputs:
+        _legacy(**inp)
+    loop = time.perf_counter() - start
+    fractions = np.array([inp["p"] for inp in inputs])
+    start = time.perf_counter()
+    proportion_mixes(fractions, 350, 180, 0, 1.5, 1.0, passing=PASSING, sieves=ELEK)
+    batch = time.perf_counter() - start
+    print(f"\nDozaj (2000 reçete): döngü {loop * 1e3:.1f} ms | toplu {batch * 1e3:.2f} ms ({loop / batch:.0f}x)")
+
+if __name__ == "__main__":
+    test_golden_single_recipe()
+    test_matches_legacy_inline_code()
+    test_short_series_and_batch()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic.engineering import STD_GRADING_DB, SIEVE_SETS, get_std_limits, get_std_limits_batch, _std_limits_cached
+
+SERIES = [
+    SIEVE_SETS[31.5],
+    [31.5, 22.4, 16.0, 11.2, 8.0, 5.6, 4.0, 2.0, 1.0, 0.5, 0.25, 0.125, 0.063],
+    SIEVE_SETS[16.0],
+    [63, 50, 45, 0.0, -1, 0.01, 0.07, 3, 100],  # tablo dışı uçlar
+]
+CURVES = ["A (Alt)", "B (İdeal)", "C (Üst)"]
+
+def _legacy_std_limits(dmax, curve_type, elek_serisi):
+    # Eski döngülü sürüm (karşılaştırma ve kıyaslama için)
+    limits_dict = STD_GRADING_DB.get(dmax, {}).get(curve_type, {})
+    std_sieves = sorted(list(limits_dict.keys()), reverse=True)
+    alt_points, ust_points = [], []
+    for e in elek_serisi:
+        if e in limits_dict:
+            alt_points.append(limits_dict[e][0]); ust_points.append(limits_dict[e][1])
+            continue
+        s1, s2 = None, None
+        for s in std_sieves:
+            if s > e: s1 = s
+            else: s2 = s; break
+        if s1 is not None and s2 is not None:
+            if s2 <= 0:  # log(0) = -inf -> oran 0 -> s1 değeri
+                alt_points.append(limits_dict[s1][0]); ust_points.append(limits_dict[s1][1])
+                continue
+            log_e, log_s1, log_s2 = np.log(e), np.log(s1), np.log(s2)
+            ratio = (log_e - log_s1) / (log_s2 - log_s1)
+            alt_points.append(limits_dict[s1][0] + ratio * (limits_dict[s2][0] - limits_dict[s1][0]))
+            ust_points.append(limits_dict[s1][1] + ratio * (limits_dict[s2][1] - limits_dict[s1][1]))
+        elif s1 is None:
+            alt_points.append(100.0); ust_points.append(100.0)
+        else:
+            alt_points.append(limits_dict[s1][0]); ust_points.append(limits_dict[s1][1])
+    return alt_points, ust_points
+
+def test_matches_legacy():
+    for dmax in list(STD_GRADING_DB) + [8.0]:
+        for curve in CURVES + ["Yok"]:
+            for series in SERIES:
+                alt, ust = get_std_limits(dmax, curve, series)
+                ref_alt, ref_ust = _legacy_std_limits(dmax, curve, series)
+                assert np.allclose(alt, ref_alt) and np.allclose(ust, ref_ust), (dmax, curve, series)
+
+def test_edge_cases_and_batch():
+    alt, ust = get_std_limits(31.5, "B (İdeal)", [63, 0.01, 0.0, -1])
+    assert alt == [100.0, 3.0, 0.0, 0.0] and ust == [100.0, 3.0, 1.0, 1.0]
+    assert get_std_limits(8.0, "B (İdeal)", [4.0, 2.0]) == ([100.0, 100.0], [100.0, 100.0])
+
+    # Önbellekteki diziler paylaşılır ama dönen listeler çağırana aittir
+    a1, _ = get_std_limits(31.5, "A (Alt)", SERIES[0])
+    a1[0] = -5
+    assert get_std_limits(31.5, "A (Alt)", SERIES[0])[0][0] == 100.0
+
+    batch = get_std_limits_batch(31.5, "C (Üst)", SERIES)
+    assert len(batch) == len(SERIES)
+    for (alt, ust), series in zip(batch, SERIES):
+        ref = get_std_limits(31.5, "C (Üst)", series)
+        assert np.allclose(alt, ref[0]) and np.allclose(ust, ref[1])
+    assert get_std_limits_batch(31.5, "C (Üst)", []) == []
+
+def _bench(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(31.5, CURVES[i % 3], SERIES[i % 2])
+    return (time.perf_counter() - start) / n * 1e6
+
+def test_benchmark():
+    n = 3000
+    legacy = _bench(_legacy_std_limits, n)
+    _std_limits_cached.cache_clear()
+    cached = _bench(get_std_limits, n)
+    start = time.perf_counter()
+    get_std_limits_batch(31.5, "B (İdeal)", [SERIES[i % 2] for i in range(n)])
+    batch = (time.perf_counter() - start) / n * 1e6
+    print(f"\nget_std_limits: döngü {legacy:.1f} µs | önbellekli {cached:.1f} µs "
+          f"({legacy / cached:.0f}x) | toplu {batch:.2f} µs/seri")
+
+if __name__ == "__main__":
+    test_matches_legacy()
+    test_edge_cases_and_batch()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
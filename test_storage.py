@@ -0,0 +1,539 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import time
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic.storage import JsonStorage, ShardedJsonStorage
+from logic.sqlite_storage import SQLiteStorage, migrate_json_to_sqlite
+from logic.pool_journal import PoolJournal
+from logic.file_cache import FileCache
+from logic.pool_columns import PoolColumns
+import numpy as np
+
+SAMPLE_PROJECT = {
+    "trials": {
+        "Ana Reçete": {"cim": 350, "su": 180, "p": [22, 16, 28, 34], "elek": [31.5, 16.0, 4.0]},
+        "oçb-8": {"cim": 380, "su": 175, "p": [20, 20, 30, 30], "elek": [31.5, 16.0, 4.0]}
+    },
+    "qc_history": [
+        {"id": 1, "date": "2025-09-01", "no": "N-1", "cement": 350, "water": 180, "d28": 38.5},
+        {"id": 2, "date": "2025-09-08", "no": "N-2", "cement": 350, "water": 182, "d28": 37.1}
+    ],
+    "active_trial": "oçb-8"
+}
+
+def _exercise_backend(store):
+    store.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+    store.save_project("merkez", "ESKİ PROJE", {"cim": 300, "su": 170})
+    store.save_project("beton1", "DİĞER", {"trials": {}, "qc_history": []})
+
+    projects = store.load_projects("merkez")
+    assert list(projects.keys()) == ["BETON YOL", "ESKİ PROJE"]
+    assert projects["BETON YOL"] == SAMPLE_PROJECT
+    assert projects["ESKİ PROJE"] == {"cim": 300, "su": 170}
+
+    store.append_qc_record("merkez", "BETON YOL", {"id": 3, "date": "2025-09-15", "d28": 40.0})
+    store.append_qc_record("merkez", "YENİ", {"id": 1, "date": "2025-09-16", "d28": 35.0})
+    summary = {p["name"]: p for p in store.list_projects("merkez")}
+    assert list(summary) == ["BETON YOL", "ESKİ PROJE", "YENİ"]
+    assert summary["BETON YOL"]["trials"] == ["Ana Reçete", "oçb-8"]
+    assert summary["BETON YOL"]["active_trial"] == "oçb-8"
+    assert summary["BETON YOL"]["qc_count"] == 3 and summary["YENİ"]["qc_count"] == 1
+    assert summary["ESKİ PROJE"]["trials"] is None and summary["BETON YOL"]["modified"]
+    assert store.list_trials("merkez", "BETON YOL") == ["Ana Reçete", "oçb-8"]
+    assert store.list_trials("merkez", "YOK") is None
+    projects = store.load_projects("merkez")
+    assert [r["id"] for r in projects["BETON YOL"]["qc_history"]] == [1, 2, 3]
+    assert projects["YENİ"]["qc_history"][0]["d28"] == 35.0
+    assert len(store.load_qc_history("merkez")) == 4
+    assert store.load_qc_history("beton1") == []
+
+    assert store.delete_project("merkez", "ESKİ PROJE") is True
+    assert store.delete_project("merkez", "ESKİ PROJE") is False
+    assert "ESKİ PROJE" not in store.load_projects("merkez")
+
+    assert store.load_factor("merkez", "KGM-91 Santral") == 1.0
+    store.save_factor("merkez", "KGM-91 Santral", 1.04)
+    assert store.load_factor("merkez", "KGM-91 Santral") == 1.04
+
+    store.save_pool([{"cement": 390, "water": 160, "d28": 41.98}])
+    store.append_pool({"cement": 400, "water": 165, "d28": 43.0, "source": "Control-Tab-BETON YOL"})
+    assert [r["cement"] for r in store.load_pool()] == [390, 400]
+
+    assert store.load_project("merkez", "BETON YOL")["active_trial"] == "oçb-8"
+    assert store.load_project("merkez", "YOK") is None
+
+    store.save_plant("beton1", {"name": "Samedin Lab.", "location": "diyarbakır"})
+    assert store.load_plants()["beton1"]["name"] == "Samedin Lab."
+    assert store.delete_plant("beton1") is True
+
+def test_json_backend():
+    tmp = tempfile.mkdtemp()
+    try:
+        _exercise_backend(JsonStorage(tmp))
+    finally:
+        shutil.rmtree(tmp)
+
+def test_sharded_backend():
+    tmp = tempfile.mkdtemp()
+    try:
+        _exercise_backend(ShardedJsonStorage(tmp))
+    finally:
+        shutil.rmtree(tmp)
+
+def test_sharded_migration_and_manifest():
+    tmp = tempfile.mkdtemp()
+    try:
+        legacy = JsonStorage(tmp)
+        legacy.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+        legacy.save_project("merkez", "ESKİ/PROJE", {"cim": 300, "su": 170})
+
+        # Bölme açıkça istenmedikçe eski dosya yerinde kullanılır
+        store = ShardedJsonStorage(tmp)
+        assert store.list_trials("merkez", "BETON YOL") == ["Ana Reçete", "oçb-8"]
+        store.append_qc_record("merkez", "BETON YOL", {"id": 3, "d28": 40.0})
+        assert len(legacy.load_project("merkez", "BETON YOL")["qc_history"]) == 3
+        store.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+        assert not os.path.exists(store.manifest_path("merkez"))
+        assert not os.path.exists(legacy.project_path("merkez") + ".migrated")
+
+        store.split_plant("merkez")
+        assert [p["name"] for p in store.list_projects("merkez")] == ["BETON YOL", "ESKİ/PROJE"]
+        assert store.list_trials("merkez", "BETON YOL") == ["Ana Reçete", "oçb-8"]
+        # Bölme sırasında düz proje kanonik şemaya sarılır
+        assert store.list_trials("merkez", "ESKİ/PROJE") == ["Ana Reçete"]
+        assert os.path.exists(legacy.project_path("merkez") + ".migrated")
+        assert store.load_projects("merkez") == {
+            "BETON YOL": SAMPLE_PROJECT,
+            "ESKİ/PROJE": {"trials": {"Ana Reçete": {"cim": 300, "su": 170}}, "qc_history": [],
+                           "active_trial": "Ana Reçete"}}
+
+        # Tek proje kaydı diğer proje dosyalarına dokunmaz
+        shard_dir = store.shard_dir("merkez")
+        other = os.path.join(shard_dir, store._manifest("merkez")["projects"]["BETON YOL"]["file"])
+        before = os.stat(other).st_mtime_ns
+        store.save_project("merkez", "ESKİ/PROJE", {"trials": {"T1": {"cim": 310}}, "active_trial": "T1"})
+        assert os.stat(other).st_mtime_ns == before
+        assert store.list_trials("merkez", "ESKİ/PROJE") == ["T1"]
+
+        # Manifest özetleri gövde okumadan gelir
+        store.append_qc_record("merkez", "BETON YOL", {"id": 3, "d28": 40.0})
+        os.remove(other)
+        summary = store.list_projects("merkez")[0]
+        assert summary["qc_count"] == 3 and summary["active_trial"] == "oçb-8" and summary["modified"]
+        store.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+
+        assert store.delete_project("merkez", "ESKİ/PROJE") is True
+        assert sorted(f for f in os.listdir(shard_dir) if f.endswith(".json")) == \
+            sorted(["_manifest.json", os.path.basename(other)])
+    finally:
+        shutil.rmtree(tmp)
+
+def test_sharded_split_opt_in():
+    from logic.migrate import main
+    tmp = tempfile.mkdtemp()
+    try:
+        for plant in ("merkez", "beton1"):
+            JsonStorage(tmp).save_project(plant, "BETON YOL", SAMPLE_PROJECT)
+        # STORAGE_AUTO_SPLIT=1 karşılığı: ilk erişimde bölünür
+        auto = ShardedJsonStorage(tmp, auto_split=True)
+        assert auto.list_trials("beton1", "BETON YOL") == ["Ana Reçete", "oçb-8"]
+        assert os.path.exists(auto.manifest_path("beton1"))
+        # Bakım komutu kalan santralleri açıkça böler
+        assert main(["--data-dir", tmp, "--backend", "sharded"]) == 0
+        assert os.path.exists(auto.manifest_path("merkez"))
+        assert os.path.exists(JsonStorage(tmp).project_path("merkez") + ".migrated")
+        assert ShardedJsonStorage(tmp).load_project("merkez", "BETON YOL") == SAMPLE_PROJECT
+    finally:
+        shutil.rmtree(tmp)
+
+def test_migrate_canonical_schema():
+    from logic.migrate import normalize_project, migrate_plant, main
+    tmp = tempfile.mkdtemp()
+    try:
+        store = ShardedJsonStorage(tmp)
+        old_trial = {"elek": [0.063, 4.0, 31.5], "ri": {"0": [10, 20, 30]}, "passing": {"Mıcır": [5, 50, 100]}}
+        store.save_project("merkez", "ESKİ", {"trials": {"Ana Reçete": old_trial}, "active_trial": "Ana Reçete",
+                                              "qc_history": [{"id": 1, "measured_mpa": 36.0}]})
+        store.save_project("merkez", "DÜZ", {"cim": 300, "qc_history": [{"id": 1, "d28": 30.0, "measured_mpa": 0.0}]})
+        store.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+
+        assert migrate_plant(store, "merkez", dry_run=True)
+        assert store.load_project("merkez", "ESKİ")["trials"]["Ana Reçete"] == old_trial
+
+        report = migrate_plant(store, "merkez")
+        assert sorted(report) == ["DÜZ", "ESKİ"]
+        trial = store.load_project("merkez", "ESKİ")["trials"]["Ana Reçete"]
+        assert trial["elek"] == [31.5, 4.0, 0.063]
+        assert trial["ri"] == {"No:2 (15-25)": [30, 20, 10]} and trial["passing"]["Mıcır"] == [100, 50, 5]
+        assert store.load_project("merkez", "ESKİ")["qc_history"] == [{"id": 1, "d28": 36.0}]
+        flat = store.load_project("merkez", "DÜZ")
+        assert flat == {"trials": {"Ana Reçete": {"cim": 300}}, "active_trial": "Ana Reçete",
+                        "qc_history": [{"id": 1, "d28": 30.0}]}
+        assert store.list_trials("merkez", "DÜZ") == ["Ana Reçete"]
+
+        # İdempotent ve kompakt: ikinci çalıştırma değişiklik bulmaz
+        assert migrate_plant(store, "merkez") == {}
+        assert normalize_project(SAMPLE_PROJECT) == (SAMPLE_PROJECT, [])
+        with open(store._shard_path("merkez", "ESKİ"), encoding="utf-8") as f:
+            assert "\n" not in f.read()
+        assert main(["--data-dir", tmp, "--backend", "sharded"]) == 0
+    finally:
+        shutil.rmtree(tmp)
+
+def _pool_record(i):
+    return {"id": f"POOL-{i}", "date": "2025-09-02", "cement": 350 + i, "water": 160 + (i % 7),
+            "ash": 0, "air": 1.0, "admixture": 0.3, "d28": 30.0 + i * 0.5, "lithology": "Kalker"}
+
+def test_pool_columns_incremental():
+    from logic import data_manager
+    from logic.ai_model import train_prediction_model
+    from logic.engineering import best_wc_estimate
+    previous = data_manager._storage  # varsayılan motoru (data/) oluşturma
+    for make in (JsonStorage, lambda d: SQLiteStorage(os.path.join(d, "beton.db"))):
+        tmp = tempfile.mkdtemp()
+        try:
+            store = make(tmp)
+            data_manager.set_storage(store)
+            store.save_pool([_pool_record(i) for i in range(6)])
+            cols = data_manager.havuz_sutunlari()
+            assert cols.n == 6 and cols["lithology"][0] == "Kalker"
+            assert str(cols["date"][0]) == "2025-09-02"
+
+            store.append_pool(_pool_record(6))
+            store.append_pool({"cement": "yok", "water": 170, "d28": 35.0, "timestamp": "2025-10-01 10:00"})
+            cols = data_manager.havuz_sutunlari()
+            assert cols.n == 8 and np.isnan(cols["cement"][7]) and np.isnan(cols["ash"][7])
+
+            # Kolonlardan eğitim == kayıtlardan eğitim
+            c1, i1, r1 = train_prediction_model(cols)
+            c2, i2, r2 = train_prediction_model(store.load_pool())
+            assert np.allclose(c1, c2) and np.isclose(i1, i2) and np.isclose(r1, r2)
+            assert best_wc_estimate(cols, "C30/37") == best_wc_estimate(store.load_pool(), "C30/37")
+
+            # Disk görünümü: yeni süreç .npz'den başlar, yalnızca kuyruğu okur
+            loaded, cursor = PoolColumns.load(store.pool_columns_path())
+            assert loaded.n == 8 and store.read_pool_since(cursor) == ([], cursor)
+
+            store.save_pool([_pool_record(1)])
+            assert data_manager.havuz_sutunlari().n == 1
+            if isinstance(store, SQLiteStorage): store.close()
+        finally:
+            data_manager.set_storage(previous)
+            shutil.rmtree(tmp)
+
+QC_CSV = """Proje;Numune No;Döküm Tarihi;Çimento (kg);Su;7 Günlük (MPa);28 Günlük (MPa)
+BETON YOL;N-1;2025-09-01;350;180;25,1;38,5
+BETON YOL;N-7;03.09.2025;360;178;;41
+BETON YOL;N-7;03.09.2025;360;178;;41
+;N-8;03.09.2025;360;178;;41
+BETON YOL;N-9;xx;360;178;;41
+BETON YOL;N-10;04.09.2025;360;178;;
+YOK;N-11;04.09.2025;360;178;;33
+"""
+
+def test_qc_bulk_import():
+    from logic.qc_import import import_qc_file
+    for make in (ShardedJsonStorage, lambda d: SQLiteStorage(os.path.join(d, "beton.db"))):
+        tmp = tempfile.mkdtemp()
+        try:
+            store = make(tmp)
+            store.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+            path = os.path.join(tmp, "lab.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(QC_CSV)
+
+            progress = []
+            report = import_qc_file(path, "merkez", store=store, chunk_size=3,
+                                    progress=lambda done, total: progress.append((done, total)))
+            # N-1 / 2025-09-01 zaten kayıtlı (SAMPLE_PROJECT), N-7 dosyada iki kez var
+            assert report["imported"] == 1 and report["duplicates"] == 2 and report["pool"] == 1
+            assert [msg for _, msg in report["errors"]] == \
+                ["proje adı boş", "tarih okunamadı", "d7 / d28 sonucu yok", "bilinmeyen proje: YOK"]
+            assert [row for row, _ in report["errors"]] == [4, 5, 6, 7]
+            assert progress[-1] == (7, 7) and len(progress) == 3
+
+            history = store.load_project("merkez", "BETON YOL")["qc_history"]
+            assert len(history) == 3
+            assert {k: history[-1][k] for k in ("id", "no", "date", "cement", "d28")} == \
+                {"id": 3, "no": "N-7", "date": "2025-09-03", "cement": 360, "d28": 41}
+            assert store.load_pool()[-1]["source"] == "Import-BETON YOL"
+            assert {p["name"]: p["qc_count"] for p in store.list_projects("merkez")}["BETON YOL"] == 3
+
+            # Tekrar aktarımda mevcut kayıtlar atlanır; yalnızca bilinmeyen proje oluşturulur
+            report = import_qc_file(path, "merkez", store=store, create_projects=True)
+            assert report["imported"] == 1 and report["projects"] == {"YOK": 1}
+            if isinstance(store, SQLiteStorage): store.close()
+        finally:
+            shutil.rmtree(tmp)
+
+def test_qc_import_numeric_sample_no_xlsx():
+    from unittest import mock
+    from openpyxl import Workbook
+    from logic.qc_import import import_qc_file
+    tmp = tempfile.mkdtemp()
+    try:
+        store = ShardedJsonStorage(tmp)
+        # Formdan gelen kayıt: no metin ("5"); eski kayıt: no tam sayı (0)
+        store.save_project("merkez", "BETON YOL", {"trials": {}, "qc_history": [
+            {"id": 1, "no": "5", "date": "2025-09-01", "d28": 38.0},
+            {"id": 2, "no": 0, "date": "2025-09-01", "d28": 37.0}]})
+        store.save_project("merkez", "DİĞER", SAMPLE_PROJECT)
+        path = os.path.join(tmp, "lab.xlsx")
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Proje", "Numune No", "Döküm Tarihi", "28 Günlük (MPa)"])
+        for no, date in ((5.0, "2025-09-01"), (0, "2025-09-01"), (0.0, "2025-09-02"), (7.0, "2025-09-02")):
+            ws.append(["BETON YOL", no, date, 40.0])
+        wb.save(path)
+
+        loaded = []
+        real_load = store.load_project
+        with mock.patch.object(store, "load_projects", side_effect=AssertionError("tüm santral okundu")), \
+             mock.patch.object(store, "load_project", lambda p, n, readonly=False: loaded.append(n) or real_load(p, n, readonly)):
+            report = import_qc_file(path, "merkez", store=store)
+        assert report["imported"] == 2 and report["duplicates"] == 2
+        assert loaded == ["BETON YOL"]  # dosyada geçmeyen proje okunmaz
+        history = store.load_project("merkez", "BETON YOL")["qc_history"]
+        assert [r["no"] for r in history[2:]] == ["0", "7"]
+
+        # Aynı sayfanın tekrar aktarımı kayıt çoğaltmaz
+        report = import_qc_file(path, "merkez", store=store)
+        assert report["imported"] == 0 and report["duplicates"] == 4
+    finally:
+        shutil.rmtree(tmp)
+
+def test_qc_bulk_import_updates_model_stats():
+    from logic import data_manager
+    from logic.qc_import import import_qc_file
+    previous = data_manager._storage  # varsayılan motoru (data/) oluşturma
+    tmp = tempfile.mkdtemp()
+    try:
+        data_manager.set_storage(ShardedJsonStorage(tmp))
+        data_manager.veriyi_kaydet("BETON YOL", SAMPLE_PROJECT)
+        assert data_manager.proje_model_istatistikleri("BETON YOL").n == 2
+        path = os.path.join(tmp, "lab.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(QC_CSV)
+
+        # store verilmeyen aktarım data_manager.qc_toplu_ekle'den geçer: istatistik dosyası artımlı güncellenir
+        assert import_qc_file(path, "merkez")["imported"] == 1
+        history = data_manager.load_project("merkez", "BETON YOL")["qc_history"]
+        entry = data_manager.file_cache.read_json(data_manager.get_model_stats_path("merkez"), {})["BETON YOL"]
+        assert entry["stats"]["seen"] == 3 and entry["tail"] == data_manager._tail_key(history)
+        assert data_manager.proje_model_istatistikleri("BETON YOL").n == 3
+    finally:
+        data_manager.set_storage(previous)
+        shutil.rmtree(tmp)
+
+def test_sqlite_backend():
+    tmp = tempfile.mkdtemp()
+    try:
+        store = SQLiteStorage(os.path.join(tmp, "beton.db"))
+        _exercise_backend(store)
+        store.close()
+    finally:
+        shutil.rmtree(tmp)
+
+def test_json_to_sqlite_migration():
+    tmp = tempfile.mkdtemp()
+    try:
+        src = JsonStorage(tmp)
+        src.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+        src.save_factor("merkez", "KGM-91 Santral", 0.97)
+        src.save_pool([{"cement": 390, "water": 160, "d28": 41.98, "date": "2025-09-02"}])
+        with open(src.plants_path(), "w", encoding="utf-8") as f:
+            json.dump({"merkez": {"name": "Merkez"}}, f)
+
+        report = migrate_json_to_sqlite(tmp)
+        assert report["projects"] == 1 and report["trials"] == 2 and report["qc_records"] == 2
+        assert report["pool_records"] == 1 and report["factors"] == 1
+
+        dst = SQLiteStorage(os.path.join(tmp, "beton.db"))
+        assert dst.load_projects("merkez") == src.load_projects("merkez")
+        assert dst.load_pool() == src.load_pool()
+        assert dst.load_factor("merkez", "KGM-91 Santral") == 0.97
+        dst.close()
+
+        # Bölünmemiş santraldeki eski düz proje aktarımda kanonik şemaya getirilir
+        src.save_project("beton1", "DÜZ", {"cim": 300, "qc_history": [{"id": 1, "measured_mpa": 30.0}]})
+        migrate_json_to_sqlite(tmp, os.path.join(tmp, "beton2.db"))
+        dst = SQLiteStorage(os.path.join(tmp, "beton2.db"))
+        assert dst.load_project("beton1", "DÜZ") == {"trials": {"Ana Reçete": {"cim": 300}}, "active_trial": "Ana Reçete",
+                                                     "qc_history": [{"id": 1, "d28": 30.0}]}
+        assert src.load_project("beton1", "DÜZ")["cim"] == 300
+        dst.close()
+    finally:
+        shutil.rmtree(tmp)
+
+def test_json_backend_canonical_on_startup():
+    from logic import data_manager
+    previous, data_dir = data_manager._storage, data_manager.DATA_DIR
+    backend = data_manager.STORAGE_BACKEND
+    tmp = tempfile.mkdtemp()
+    try:
+        JsonStorage(tmp).save_project("merkez", "DÜZ", {"cim": 300, "su": 170})
+        data_manager.DATA_DIR, data_manager.STORAGE_BACKEND = tmp, "json"
+        data_manager.set_storage(None)
+        assert data_manager.load_project("merkez", "DÜZ") == {
+            "trials": {"Ana Reçete": {"cim": 300, "su": 170}}, "qc_history": [], "active_trial": "Ana Reçete"}
+        with open(JsonStorage(tmp).project_path("merkez"), encoding="utf-8") as f:
+            assert json.load(f)["DÜZ"]["active_trial"] == "Ana Reçete"
+    finally:
+        data_manager.DATA_DIR, data_manager.STORAGE_BACKEND = data_dir, backend
+        data_manager.set_storage(previous)
+        shutil.rmtree(tmp)
+
+def test_pool_journal_append_and_compact():
+    tmp = tempfile.mkdtemp()
+    try:
+        snapshot = os.path.join(tmp, "ai_training_pool.json")
+        with open(snapshot, "w", encoding="utf-8") as f:
+            json.dump([{"id": "POOL-1", "d28": 41.98}], f, indent=4)
+
+        journal = PoolJournal(snapshot, fsync_every=4)
+        for i in range(2, 12):
+            journal.append({"id": f"POOL-{i}", "d28": 30.0 + i})
+        ids = [r["id"] for r in journal.iter_records()]
+        assert ids == [f"POOL-{i}" for i in range(1, 12)]
+
+        assert journal.compact() == 10
+        assert not os.path.exists(journal.journal_path)
+        with open(snapshot, "r", encoding="utf-8") as f:
+            assert [r["id"] for r in json.load(f)] == ids
+
+        journal.append({"id": "POOL-12"})
+        assert len(journal.load()) == 12
+        journal.replace_all([])
+        assert journal.load() == []
+    finally:
+        shutil.rmtree(tmp)
+
+def test_pool_journal_compact_with_second_handle():
+    import threading
+    from unittest import mock
+    from logic import pool_journal
+    tmp = tempfile.mkdtemp()
+    try:
+        snapshot = os.path.join(tmp, "ai_training_pool.json")
+        a, b = PoolJournal(snapshot), PoolJournal(snapshot)  # iki ayrı süreç gibi
+        a.append_many([{"id": f"POOL-{i}"} for i in range(1, 6)])
+
+        opened, removing = threading.Event(), threading.Event()
+        def late_write(payload):
+            # Günlük sıkıştırmadan önce açılır, anlık görüntü yazılıp artıklar okunduktan sonra yazılır
+            with open(b.journal_path, "a", encoding="utf-8") as f:
+                opened.set()
+                removing.wait(0.5)
+                f.write(payload)
+        real_remove = os.remove
+        def remove(path):
+            if path == a.compacting_path:
+                removing.set()
+                time.sleep(0.05)
+            real_remove(path)
+
+        b._write_journal = late_write
+        writer = threading.Thread(target=b.append_many, args=([{"id": "POOL-6"}],))
+        writer.start()
+        assert opened.wait(1)
+        with mock.patch.object(pool_journal.os, "remove", remove):
+            a.compact()
+        writer.join()
+        assert sorted(r["id"] for r in a.load()) == [f"POOL-{i}" for i in range(1, 7)]
+    finally:
+        shutil.rmtree(tmp)
+
+def test_file_cache():
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "ocaklar.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"OCAK-1": {"name": "Siverek"}}, f)
+
+        fc = FileCache()
+        first = fc.read_json(path, {})
+        first["OCAK-1"]["name"] = "DEĞİŞTİ"  # kopya: önbelleği bozmamalı
+        assert fc.read_json(path, {})["OCAK-1"]["name"] == "Siverek"
+        shared = fc.read_json(path, {}, copy=False)
+        assert fc.read_json(path, {}, copy=False) is shared
+        assert fc.stats()["misses"] == 1 and fc.stats()["hits"] == 3
+
+        # Dosya dışarıdan değişirse (mtime/boyut) yeniden okunur
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"OCAK-1": {"name": "Siverek"}, "OCAK-2": {"name": "Viranşehir"}}, f)
+        assert len(fc.read_json(path, {})) == 2
+        assert fc.stats()["misses"] == 2
+
+        fc.invalidate(path)
+        assert fc.stats()["entries"] == 0
+        assert fc.read_json(os.path.join(tmp, "yok.json"), []) == []
+
+        # JsonStorage: yazma sonrası okumalar güncel, readonly görünüm paylaşılır
+        store = JsonStorage(tmp)
+        store.save_project("merkez", "BETON YOL", SAMPLE_PROJECT)
+        ro = store.load_projects("merkez", readonly=True)
+        store.append_qc_record("merkez", "BETON YOL", {"id": 3, "d28": 40.0})
+        assert len(ro["BETON YOL"]["qc_history"]) == 2
+        assert len(store.load_projects("merkez")["BETON YOL"]["qc_history"]) == 3
+    finally:
+        shutil.rmtree(tmp)
+
+def test_file_cache_lru_and_reserve():
+    from logic.file_cache import file_cache
+    tmp = tempfile.mkdtemp()
+    try:
+        paths = {}
+        for name in "abc":
+            paths[name] = os.path.join(tmp, f"{name}.json")
+            with open(paths[name], "w", encoding="utf-8") as f:
+                json.dump({"name": name}, f)
+        fc = FileCache(max_entries=2)
+        fc.read_json(paths["a"]); fc.read_json(paths["b"]); fc.read_json(paths["a"])
+        fc.read_json(paths["c"])  # en uzun süredir kullanılmayan (b) çıkar, a kalır
+        fc.reset_stats()
+        fc.read_json(paths["a"]); fc.read_json(paths["c"])
+        assert fc.stats()["misses"] == 0
+        fc.read_json(paths["b"])
+        assert fc.stats()["misses"] == 1 and fc.stats()["entries"] == 2
+        fc.reserve("santral", 3)
+        assert fc.stats()["max_entries"] == 5
+        fc.reserve("santral", 0)
+        assert fc.stats()["max_entries"] == 2 and fc.stats()["entries"] == 2
+
+        # Varsayılan kapasiteden çok projeli santral: ikinci tam geçiş diskten okumaz
+        store = ShardedJsonStorage(tmp)
+        n = file_cache.base_entries + 20
+        for i in range(n):
+            store.save_project("merkez", f"P{i}", {"trials": {}, "qc_history": [{"id": i}]})
+        store.load_projects("merkez", readonly=True)
+        file_cache.reset_stats()
+        assert len(store.load_projects("merkez", readonly=True)) == n
+        assert file_cache.stats()["misses"] == 0
+        file_cache.reserve(store.shard_dir("merkez"), 0)
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    test_json_backend()
+    test_sharded_backend()
+    test_sharded_migration_and_manifest()
+    test_sharded_split_opt_in()
+    test_migrate_canonical_schema()
+    test_pool_columns_incremental()
+    test_qc_bulk_import()
+    test_qc_import_numeric_sample_no_xlsx()
+    test_qc_bulk_import_updates_model_stats()
+    test_sqlite_backend()
+    test_json_to_sqlite_migration()
+    test_json_backend_canonical_on_startup()
+    test_pool_journal_append_and_compact()
+    test_pool_journal_compact_with_second_handle()
+    test_file_cache()
+    test_file_cache_lru_and_reserve()
+    print("\n✅ ALL TESTS PASSED")
@@ -0,0 +1,148 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic import data_manager
+from logic.storage import JsonStorage
+from logic.strength_gain import (
+    PRIOR_WEIGHT, S_PRIORS, age_term, cement_class, fit_gain, forecast_d28, gain_stats, merge_gain,
+)
+
+TRUE_S = {"CEM I 42.5 R": 0.22, "CEM IV/B (P) 32.5 N": 0.36}
+
+def _records(n, seed=0, sigma=0.05):
+    rng = np.random.default_rng(seed)
+    types = list(TRUE_S)
+    out = []
+    for i in range(n):
+        ct = types[i % 2]
+        d28 = rng.uniform(28, 50)
+        rec = {"id": i + 1, "cement_type": ct, "d28": float(d28), "target_mpa": 37.0,
+               "d7": float(d28 * np.exp(-TRUE_S[ct] + rng.normal(0, sigma)))}
+        if i % 4 == 0:
+            rec["d56"] = float(d28 * np.exp(TRUE_S[ct] * age_term(56) + rng.normal(0, sigma)))
+        out.append(rec)
+    return out
+
+def _slow_s(records, cement_type):
+    # Tanım: s = Σab / Σa² (önselsiz), kayıt kayıt
+    num = den = 0.0
+    pairs = 0
+    for r in records:
+        if r["cement_type"] != cement_type: continue
+        for t, key in ((7, "d7"), (56, "d56")):
+            if r.get(key):
+                a, b = age_term(t), np.log(r[key] / r["d28"])
+                num += a * b; den += a * a; pairs += 1
+    return num, den, pairs
+
+def test_cement_class():
+    assert [cement_class(n) for n in ("CEM I 42.5 R", "CEM I 52.5 N", "CEM II/A-LL 42.5 R", "CEM I 42,5 N",
+                                      "CEM II/B-M 32.5 R", "CEM IV/B (P) 32.5 N", "SR", None)] == \
+        ["R", "R", "R", "N", "N", "S", "N", "N"]
+
+def test_fit_matches_definition_and_recovers_s():
+    recs = _records(2000, seed=1)
+    params = fit_gain(gain_stats(recs))
+    for ct, s_true in TRUE_S.items():
+        num, den, pairs = _slow_s(recs, ct)
+        p = params[ct]
+        assert np.isclose(p["s"], (num + PRIOR_WEIGHT * S_PRIORS[p["class"]]) / (den + PRIOR_WEIGHT))
+        assert abs(p["s"] - s_true) < 0.01 and p["n"] == pairs and abs(p["sigma"] - 0.05) < 0.01
+    # Veri yokken önsel; az veride önsele doğru büzülme
+    few = fit_gain(gain_stats(recs[:2]))
+    assert abs(few["CEM I 42.5 R"]["s"] - S_PRIORS["R"]) < abs(params["CEM I 42.5 R"]["s"] - S_PRIORS["R"]) + 0.05
+    assert gain_stats([{"d7": 20.0}, {"d28": 30.0}]) == {} and fit_gain({}) == {}
+
+def test_grouped_fit_and_incremental_merge():
+    a, b = _records(300, seed=2), _records(200, seed=3)
+    groups = [("p1", r["cement_type"]) for r in a] + [("p2", r["cement_type"]) for r in b]
+    together = fit_gain(gain_stats(a + b, groups=groups))
+    assert together[("p1", "CEM I 42.5 R")] == fit_gain(gain_stats(a))["CEM I 42.5 R"]
+    assert together[("p2", "CEM IV/B (P) 32.5 N")] == fit_gain(gain_stats(b))["CEM IV/B (P) 32.5 N"]
+    # Kayıt kayıt artımlı == toplu
+    stats = {}
+    for r in a:
+        stats = merge_gain(stats, gain_stats([r]))
+    assert all(np.allclose(stats[k], v) for k, v in gain_stats(a).items())
+
+def test_forecast_and_early_warning():
+    params = fit_gain(gain_stats(_records(2000, seed=4)))
+    fresh = _records(4000, seed=5)
+    types = [r["cement_type"] for r in fresh]
+    d7 = np.array([r["d7"] for r in fresh])
+    d28 = np.array([r["d28"] for r in fresh])
+    fc = forecast_d28(params, d7, types, target=37.0)
+    assert np.allclose(fc["d28"], d7 * np.exp([params[t]["s"] for t in types]))
+    assert 0.93 < np.mean((d28 >= fc["lower"]) & (d28 <= fc["upper"])) < 0.97
+    # İşaretlenenlerin çoğu gerçekten hedefin altında, kaçan düşük sonuç az
+    fail = d28 < 37.0
+    assert fail[fc["flag"]].mean() > 0.8 and fc["flag"][fail].mean() > 0.8
+    # Bilinmeyen tip önselle, eksik d7 / hedef NaN
+    out = forecast_d28({}, [20.0, 0.0], "CEM I 52.5 R", target=[0.0, 30.0])
+    assert np.isclose(out["d28"][0], 20.0 * np.exp(S_PRIORS["R"])) and np.isnan(out["d28"][1])
+    assert np.isnan(out["fail_prob"]).all() and not out["flag"].any()
+
+def test_plant_cache_incremental():
+    previous = data_manager._storage  # varsayılan motoru (data/) oluşturma
+    tmp = tempfile.mkdtemp()
+    try:
+        data_manager.set_storage(JsonStorage(tmp))
+        recs = _records(40, seed=6)
+        data_manager.veriyi_kaydet("A", {"trials": {}, "qc_history": recs[:20]})
+        data_manager.veriyi_kaydet("B", {"trials": {}, "qc_history": recs[20:30]})
+        first = data_manager.santral_dayanim_gelisimi()
+        assert all(np.isclose(first[ct]["s"], p["s"]) for ct, p in fit_gain(gain_stats(recs[:30])).items())
+        # QC eklemesi dosyadaki toplamları artımlı günceller (yeniden okuma yok)
+        for r in recs[30:]:
+            data_manager.qc_kaydi_ekle("A", r)
+        entries = data_manager.file_cache.read_json(data_manager.get_model_stats_path("merkez"), {})
+        assert entries["A"]["stats"]["seen"] == 30
+        assert all(np.allclose(entries["A"]["gain"][k], v) for k, v in gain_stats(recs[:20] + recs[30:]).items())
+        updated = data_manager.santral_dayanim_gelisimi()
+        for ct, p in fit_gain(gain_stats(recs)).items():
+            assert np.isclose(updated[ct]["s"], p["s"]) and updated[ct]["n"] == p["n"]
+        # gain alanı olmayan eski biçim: yeniden kurulur
+        data_manager.atomic_write_json(data_manager.get_model_stats_path("merkez"),
+                                       {k: {"tail": v["tail"], "stats": v["stats"]} for k, v in entries.items()})
+        assert data_manager.santral_dayanim_gelisimi().keys() == updated.keys()
+        everywhere = data_manager.dayanim_gelisimi_tum_santraller()
+        assert set(everywhere) == {("merkez", ct) for ct in TRUE_S}
+        assert np.isclose(everywhere[("merkez", "CEM I 42.5 R")]["s"], updated["CEM I 42.5 R"]["s"])
+    finally:
+        data_manager.set_storage(previous)
+        shutil.rmtree(tmp)
+
+def test_benchmark():
+    recs = _records(50_000, seed=7)
+    start = time.perf_counter()
+    stats = gain_stats(recs)
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    for ct in TRUE_S:
+        _slow_s(recs, ct)
+    loop = time.perf_counter() - start
+    params = fit_gain(stats)
+    d7 = np.array([r["d7"] for r in recs])
+    types = [r["cement_type"] for r in recs]
+    start = time.perf_counter()
+    forecast_d28(params, d7, types, target=37.0)
+    forecast = time.perf_counter() - start
+    print(f"\nDayanım gelişimi (50k kayıt): özet {vectorized * 1e3:.1f} ms | döngü {loop * 1e3:.1f} ms "
+          f"| tahmin + risk {forecast * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    test_cement_class()
+    test_fit_matches_definition_and_recovers_s()
+    test_grouped_fit_and_incremental_merge()
+    test_forecast_and_early_warning()
+    test_plant_cache_incremental()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+
+# Proje ana dizinini path'e ekle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logic import strength_model
+from logic.pool_columns import PoolColumns
+from logic.strength_model import cross_validate, enet_path, feature_matrix, fit_strength_model, predict_strength_model
+
+LITHOLOGIES = ("Bazalt (Standart)", "Kalker (Standart)", "Granit")
+
+def _records(n, seed=0):
+    """Abrams benzeri (S/Ç'de doğrusal olmayan) sentetik veri; litoloji ve ince agrega etkili."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        c, w, ash = rng.uniform(250, 450), rng.uniform(150, 200), rng.uniform(0, 60)
+        air, adm = rng.uniform(1, 4), c * rng.uniform(0.008, 0.012)
+        lith = LITHOLOGIES[rng.integers(3)]
+        p = rng.dirichlet([6, 5, 5, 4]) * 100
+        wc = w / (c + 0.35 * ash)
+        d28 = 95 * np.exp(-1.6 * wc) - 1.2 * air + (3.0 if lith == "Granit" else 0.0) - 0.08 * (p[2] - 25) + rng.normal(0, 1.5)
+        out.append({"cement": c, "water": w, "ash": ash, "air": air, "admixture": adm, "lithology": lith,
+                    "p": [float(v) for v in p], "d28": float(d28)})
+    return out
+
+def _gram(X, y):
+    Z, yc, _, _ = strength_model._standardize(X, y)
+    return Z.T @ Z / len(y), Z.T @ yc / len(y)
+
+def test_feature_matrix():
+    recs = _records(5) + [{"cement": 300, "water": 150, "d28": 30}]
+    X, names = feature_matrix(PoolColumns.from_records(recs), LITHOLOGIES, {"p1": 40.0})
+    assert X.shape == (6, len(names)) and names[5:8] == ["wc", "cw", "binder"]
+    last = dict(zip(names, X[-1]))
+    assert np.isclose(last["wc"], 0.5) and np.isclose(last["cw"], 2.0) and last["binder"] == 300
+    assert last["p1"] == 40.0 and last["p2"] == 25.0 and not any(last[f"lit:{l}"] for l in LITHOLOGIES)
+    first = dict(zip(names, X[0]))
+    assert np.allclose([first[k] for k in ("p1", "p2", "p3", "p4")], recs[0]["p"])
+    assert first[f"lit:{recs[0]['lithology']}"] == 1.0
+
+def test_ridge_closed_form_and_enet_kkt():
+    X, _ = feature_matrix(PoolColumns.from_records(_records(400, seed=1)), LITHOLOGIES)
+    y = np.array([r["d28"] for r in _records(400, seed=1)])
+    G, c = _gram(X, y)
+    lambdas = (1.0, 0.1, 0.01)
+    ridge = enet_path(G, c, lambdas, 0.0)
+    for lam, w in zip(lambdas, ridge):
+        assert np.allclose(w, np.linalg.solve(G + lam * np.eye(len(c)), c))
+    for alpha in (0.5, 1.0):
+        for lam, w in zip(lambdas, enet_path(G, c, lambdas, alpha)):
+            l1, l2 = lam * alpha, lam * (1 - alpha)
+            grad = c - G @ w - l2 * w  # KKT: aktifte = l1·sign(w), pasifte |.| <= l1
+            active = w != 0
+            assert np.allclose(grad[active], l1 * np.sign(w[active]), atol=1e-5)
+            assert (np.abs(grad[~active]) <= l1 + 1e-5).all()
+    # Büyük λ'da lasso tüm katsayıları sıfırlar
+    assert not enet_path(G, c, (1e3,), 1.0).any()
+
+def test_cv_beats_ols_and_predicts():
+    train, test = _records(1500, seed=2), _records(500, seed=3)
+    model = fit_strength_model(train)
+    assert model["cv_rmse"] < 0.85 * model["ols_cv_rmse"]
+    assert model["lithologies"] == sorted(LITHOLOGIES) and model["n"] == 1500 and model["folds"] == 5
+    assert len(model["coeffs"]) == len(model["features"])
+    y = np.array([r["d28"] for r in test])
+    oos = np.sqrt(np.mean((predict_strength_model(model, test) - y) ** 2))
+    assert oos < model["ols_cv_rmse"] and abs(oos - model["cv_rmse"]) < 0.3
+    assert np.allclose(predict_strength_model(model, PoolColumns.from_records(test)), predict_strength_model(model, test))
+    pred, half = predict_strength_model(model, test, level=0.95)
+    assert np.allclose(pred, predict_strength_model(model, test)) and 0.9 < np.mean(np.abs(y - pred) <= half) < 0.99
+    assert fit_strength_model(train[:5]) is None
+
+def test_pool_matches_serial():
+    recs = _records(300, seed=4)
+    X, _ = feature_matrix(PoolColumns.from_records(recs), LITHOLOGIES)
+    y = np.array([r["d28"] for r in recs])
+    serial = cross_validate(X, y, k=4)
+    pooled = cross_validate(X, y, k=4, workers=2, pool_min_rows=len(y))
+    assert not serial["pooled"] and pooled["pooled"]
+    assert np.allclose(serial["rmse"], pooled["rmse"]) and serial["ols_rmse"] == pooled["ols_rmse"]
+    # Varsayılan eşik: app.py'nin workers=os.cpu_count() çağrısı orta boy havuzda da paralel
+    cols = PoolColumns.from_records(_records(strength_model.POOL_MIN_ROWS, seed=4))
+    model = fit_strength_model(cols, k=4, workers=2)
+    assert model == fit_strength_model(cols, k=4)
+    assert cross_validate(cols, cols["d28"], k=4, workers=2)["pooled"]
+
+def test_fold_preprocessing_uses_train_rows():
+    recs = _records(200, seed=6)
+    for r in recs[:20]:
+        r["p"] = []  # eksik oranlar katın eğitim ortalamasıyla doldurulur
+    recs[0]["lithology"] = "Andezit"  # yalnızca tek bir katın test kısmında
+    cols = PoolColumns.from_records(recs)
+    seen = []
+    fit = strength_model.fit_preprocessing
+    with mock.patch.object(strength_model, "fit_preprocessing", lambda c: seen.append(c.n) or fit(c)):
+        cv = cross_validate(cols, cols["d28"], k=4)
+    assert seen == [150] * 4
+    # Elle kurulan kat: ön işleme test satırlarını görmez
+    test = np.array_split(np.random.default_rng(0).permutation(200), 4)
+    for fold in test:
+        train = np.setdiff1d(np.arange(200), fold)
+        lithologies, fill = fit(strength_model._subset(cols, train))
+        assert ("Andezit" in lithologies) == (0 not in fold)
+        assert np.isclose(fill["p1"], np.nanmean(cols["p1"][train]))
+    X, _ = feature_matrix(cols, *fit(cols))
+    assert not np.allclose(cv["rmse"], cross_validate(X, cols["d28"], k=4)["rmse"])
+
+def test_benchmark():
+    cols = PoolColumns.from_records(_records(2000, seed=5))
+    start = time.perf_counter()
+    model = fit_strength_model(cols)
+    elapsed = time.perf_counter() - start
+    print(f"\nGelişmiş model (2k kayıt, 5 kat, {len(model['grid']['alphas'])}x{len(model['grid']['lambdas'])} ızgara): "
+          f"{elapsed * 1e3:.0f} ms | CV RMSE {model['cv_rmse']:.2f} vs EKK {model['ols_cv_rmse']:.2f} MPa")
+    assert model["cv_rmse"] < model["ols_cv_rmse"]
+
+if __name__ == "__main__":
+    test_feature_matrix()
+    test_ridge_closed_form_and_enet_kkt()
+    test_cv_beats_ols_and_predicts()
+    test_pool_matches_serial()
+    test_fold_preprocessing_uses_train_rows()
+    test_benchmark()
+    print("\n✅ ALL TESTS PASSED")